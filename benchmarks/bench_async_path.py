@@ -0,0 +1,74 @@
+# benchmarks/bench_async_path.py
+"""Requests/sec of the sync (threadpool) and async repository paths at high concurrency.
+
+Both paths use stand-in repositories that simulate the same database round trip:
+the sync one blocks a threadpool worker, the async one yields to the event loop.
+"""
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.common import generate_keys, make_token, quiet_logs, sample_profile
+
+CLIENTS = int(os.getenv("BENCH_CLIENTS", "500"))
+REQUESTS_PER_CLIENT = int(os.getenv("BENCH_REQUESTS_PER_CLIENT", "4"))
+DB_LATENCY = float(os.getenv("BENCH_DB_LATENCY", "0.05"))
+
+# Keep the import of the app from opening a blocking psycopg2 pool
+os.environ.setdefault("DB_DRIVER", "asyncpg")
+
+
+class BlockingRepository:
+    """Stand-in for ProfileRepository: holds a worker thread for the round trip"""
+
+    def find_by_user_id(self, user_id):
+        time.sleep(DB_LATENCY)
+        return sample_profile(user_id)
+
+
+class AsyncRepository:
+    """Stand-in for AsyncProfileRepository: awaits the round trip"""
+
+    async def find_by_user_id(self, user_id):
+        await asyncio.sleep(DB_LATENCY)
+        return sample_profile(user_id)
+
+
+async def run(app, token: str) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in range(REQUESTS_PER_CLIENT):
+                response = await client.get("/api/v1/profiles/1", headers=headers)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CLIENTS)))
+        elapsed = time.perf_counter() - start
+
+    return CLIENTS * REQUESTS_PER_CLIENT / elapsed
+
+
+def main():
+    keys = generate_keys()
+    token = make_token(keys["private_pem"])
+
+    from main import app
+    from routes.profile_routes import controller
+
+    results = {}
+    for name, repository in (("sync", BlockingRepository()), ("async", AsyncRepository())):
+        controller.repository = repository
+        with quiet_logs():
+            results[name] = asyncio.run(run(app, token))
+        print(f"{name:<6} {CLIENTS} clients  {results[name]:>10.0f} req/s")
+
+    print(f"async/sync: {results['async'] / results['sync']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_json.py
+"""Micro-benchmarks for the three JSON paths: log lines, profile responses and social_links"""
+import json
+import os
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.common import measure, report, sample_profile
+from models.profile import ProfileResponse
+from serialization import BACKEND, dumps
+from serialization.responses import FastJSONResponse
+
+ITERATIONS = 20000
+
+
+def stdlib_log_line():
+    payload = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "level": "info",
+        "logger": "[ProfileRepository]",
+        "message": "Perfil encontrado",
+        "thread": str(os.getpid()),
+        "userId": 1,
+        "profileId": 1
+    }
+    return json.dumps(payload)
+
+
+def fast_log_line():
+    payload = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "level": "info",
+        "logger": "[ProfileRepository]",
+        "message": "Perfil encontrado",
+        "thread": str(os.getpid()),
+        "userId": 1,
+        "profileId": 1
+    }
+    return dumps(payload)
+
+
+def main():
+    print(f"fast backend: {BACKEND}")
+    profile = ProfileResponse(**sample_profile())
+    social_links = {f"network{i}": f"https://example.com/user/{i}" for i in range(8)}
+
+    cases = [
+        ("log line: json.dumps", stdlib_log_line),
+        ("log line: fast backend", fast_log_line),
+        ("response: jsonable_encoder+JSONResponse", lambda: JSONResponse(jsonable_encoder(profile))),
+        ("response: FastJSONResponse", lambda: FastJSONResponse(profile.model_dump())),
+        ("social_links: json.dumps", lambda: json.dumps(social_links)),
+        ("social_links: fast backend", lambda: dumps(social_links)),
+    ]
+    for name, fn in cases:
+        report(name, measure(fn, ITERATIONS))
+
+
+if __name__ == "__main__":
+    main()
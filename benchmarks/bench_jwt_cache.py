@@ -0,0 +1,34 @@
+# benchmarks/bench_jwt_cache.py
+"""Compare verify_token with and without the verified-token cache on a repeated token"""
+from fastapi.security import HTTPAuthorizationCredentials
+
+from benchmarks.common import generate_keys, make_token, measure, report
+
+ITERATIONS = 2000
+
+
+def main():
+    keys = generate_keys()
+    token = make_token(keys["private_pem"])
+
+    from middleware import jwt_middleware
+
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    cache = jwt_middleware.token_cache
+
+    original_size = cache.max_size
+    cache.max_size = 0
+    cache.clear()
+    uncached = measure(lambda: jwt_middleware.verify_token(credentials), ITERATIONS)
+    report("verify_token (cache disabled)", uncached)
+
+    cache.max_size = original_size or 1024
+    cache.clear()
+    cached = measure(lambda: jwt_middleware.verify_token(credentials), ITERATIONS)
+    report("verify_token (cache enabled)", cached)
+
+    print(f"speedup: {uncached['perCallMicros'] / cached['perCallMicros']:.1f}x  stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/bench_logger.py
+"""Per-request logging overhead on the request thread: synchronous print, AsyncLogWriter,
+and lines filtered out by LOG_LEVEL.
+
+A GET emits about five lines across ProfileController and ProfileRepository,
+so one "request" here is five log calls.
+"""
+import time
+from unittest.mock import patch
+
+from benchmarks.common import measure, quiet_logs, report
+from logger import logger as logger_module
+from logger.logger import format_record, info
+from logger.writer import AsyncLogWriter
+
+ITERATIONS = 20000
+
+
+def one_request():
+    info("[ProfileController]", "Obteniendo perfil", {"userId": 1})
+    info("[ProfileRepository]", "Buscando perfil por user_id", {"userId": 1})
+    info("[ProfileRepository]", "Perfil encontrado", {"userId": 1, "profileId": 1})
+    info("[ProfileController]", "Perfil obtenido exitosamente", {"userId": 1})
+    info("[HTTP]", "GET /api/v1/profiles/1", {"status": 200})
+
+
+def main():
+    with quiet_logs():
+        with patch.object(logger_module, '_writer', None):
+            sync = measure(one_request, ITERATIONS)
+
+        writer = AsyncLogWriter(format_record, max_queue=ITERATIONS * 5 + 100, policy="block")
+        with patch.object(logger_module, '_writer', writer):
+            queued = measure(one_request, ITERATIONS)
+            start = time.perf_counter()
+            writer.close()
+            drain = time.perf_counter() - start
+
+        original_level = logger_module._min_level
+        logger_module.set_level("warn")
+        filtered = measure(one_request, ITERATIONS)
+        logger_module._min_level = original_level
+
+    report("sync print (per request)", sync)
+    report("async writer (per request)", queued)
+    report("filtered by LOG_LEVEL=warn", filtered)
+    print(f"reduction on request thread: {sync['perCallMicros'] / queued['perCallMicros']:.1f}x  "
+          f"(background drain after run: {drain * 1000:.0f} ms, dropped: {writer.dropped})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_response_path.py
+"""Repository dict to response body: validated model vs trusted ProfileRow.
+
+Reports time and peak tracemalloc allocation per response for the old path
+(``ProfileResponse(**profile)`` + ``model_dump()`` + encode) and the new one
+(``ProfileRow.from_profile(profile)`` encoded directly).
+"""
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.common import measure, report, sample_profile
+from models.profile import ProfileResponse, ProfileRow
+from serialization import BACKEND
+from serialization.responses import FastJSONResponse
+
+ITERATIONS = 20000
+ALLOCATION_ITERATIONS = 2000
+
+
+def allocations(fn: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    """Peak bytes allocated while building one response, averaged by tracemalloc"""
+    fn()
+    total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            response = fn()
+            total += tracemalloc.get_traced_memory()[1] - baseline
+            del response
+    finally:
+        tracemalloc.stop()
+    return {"peakBytesPerCall": total / iterations}
+
+
+def main():
+    print(f"fast backend: {BACKEND}")
+    profile = sample_profile()
+
+    cases = [
+        ("FastAPI: validate+jsonable_encoder", lambda: JSONResponse(jsonable_encoder(ProfileResponse(**profile)))),
+        ("before: validate+model_dump+encode", lambda: FastJSONResponse(ProfileResponse(**profile).model_dump())),
+        ("after: ProfileRow+encode", lambda: FastJSONResponse(ProfileRow.from_profile(profile))),
+    ]
+
+    bodies = {name: fn().body for name, fn in cases}
+    assert len(set(bodies.values())) == 1, "paths must produce the same body"
+
+    results = {}
+    for name, fn in cases:
+        timing = measure(fn, ITERATIONS)
+        report(name, timing)
+        results[name] = (timing, allocations(fn, ALLOCATION_ITERATIONS))
+
+    print()
+    for name, (_, alloc) in results.items():
+        print(f"{name:<40} {alloc['peakBytesPerCall']:>10.0f} B/op peak")
+
+    before_timing, before_alloc = results[cases[1][0]]
+    after_timing, after_alloc = results[cases[2][0]]
+    print()
+    print(
+        f"saved per response: {before_timing['perCallMicros'] - after_timing['perCallMicros']:.2f} us, "
+        f"{before_alloc['peakBytesPerCall'] - after_alloc['peakBytesPerCall']:.0f} B peak allocation"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/bench_startup.py
+"""Cold start: import cost of the app and time until liveness and readiness answer.
+
+Each measurement runs in a fresh interpreter. By default the database points at
+a closed local port, so the process must serve liveness (and report not-ready)
+while the pool keeps retrying in the background. Set BENCH_STARTUP_USE_DB=true
+to keep the DB_* settings from the environment and also time readiness.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import generate_keys
+
+RUNS = int(os.getenv("BENCH_STARTUP_RUNS", "5"))
+TIMEOUT = float(os.getenv("BENCH_STARTUP_TIMEOUT", "30"))
+USE_DB = os.getenv("BENCH_STARTUP_USE_DB", "false").lower() == "true"
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def environment() -> dict:
+    env = dict(os.environ, LOG_LEVEL="error")
+    if not USE_DB:
+        # Nothing listens there: connection attempts fail fast and are retried
+        env.update(DB_HOST="127.0.0.1", DB_PORT=str(free_port()))
+    return env
+
+
+def import_seconds(module: str) -> float:
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+        env=environment(),
+        text=True
+    )
+    return float(output.strip().splitlines()[-1])
+
+
+def wait_for(url: str, deadline: float, status: int = 200) -> float:
+    """Poll url until it returns status; seconds waited, or inf past the deadline"""
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(url, timeout=0.5).status_code == status:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.005)
+    return float("inf")
+
+
+def serve_times() -> dict:
+    port = free_port()
+    env = dict(environment(), PORT=str(port))
+    base = f"http://127.0.0.1:{port}"
+
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "main.py"], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = start + TIMEOUT
+        live = wait_for(f"{base}/health/live", deadline)
+        times = {"live": (time.perf_counter() - start) if live != float("inf") else live}
+        if USE_DB:
+            ready = wait_for(f"{base}/health/ready", deadline)
+            times["ready"] = (time.perf_counter() - start) if ready != float("inf") else ready
+        else:
+            times["readyStatus"] = httpx.get(f"{base}/health/ready", timeout=1).status_code
+        return times
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def best(values):
+    return min(values) * 1000
+
+
+def main():
+    generate_keys()
+
+    for module in ("routes.profile_routes", "main"):
+        seconds = [import_seconds(module) for _ in range(RUNS)]
+        print(f"{'import ' + module:<40} {best(seconds):>10.1f} ms (best of {RUNS})")
+
+    runs = [serve_times() for _ in range(RUNS)]
+    print(f"{'spawn -> /health/live 200':<40} {best([r['live'] for r in runs]):>10.1f} ms (best of {RUNS})")
+    if USE_DB:
+        print(f"{'spawn -> /health/ready 200':<40} {best([r['ready'] for r in runs]):>10.1f} ms (best of {RUNS})")
+    else:
+        print(f"{'/health/ready with database down':<40} {runs[-1]['readyStatus']:>10}")
+
+
+if __name__ == "__main__":
+    main()
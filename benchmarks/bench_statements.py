@@ -0,0 +1,117 @@
+# benchmarks/bench_statements.py
+"""Repository SQL: per-request string building vs memoized statements, and parse/plan cost.
+
+The Python part always runs. The database part runs when BENCH_DATABASE_URL
+points at a PostgreSQL with the profiles table, e.g.
+``BENCH_DATABASE_URL=postgresql://admin_user:pw@localhost/usuariosdb``.
+"""
+import os
+import re
+
+from benchmarks.common import measure, report
+
+# Keep the import of the repository from opening a connection
+os.environ.setdefault("DB_POOL_MIN_SIZE", "0")
+
+from repositories.profile_repository import PROFILE_COLUMNS, UPDATABLE_FIELDS, update_statement
+
+ITERATIONS = 50000
+DB_ITERATIONS = 2000
+
+UPDATE_DATA = {"nickname": "bench", "country": "Colombia", "social_links": {"github": "https://github.com/bench"}}
+
+
+def built_lookup_query():
+    return f"""
+                SELECT {PROFILE_COLUMNS}
+                FROM profiles
+                WHERE user_id = %s
+            """
+
+
+def built_update_query():
+    # The per-request builder update() used before statements were memoized
+    fields = []
+    values = []
+    for field in UPDATABLE_FIELDS:
+        if field not in UPDATE_DATA:
+            continue
+        if field == "social_links":
+            fields.append("social_links = %s::jsonb")
+            values.append(UPDATE_DATA["social_links"])
+        else:
+            fields.append(f"{field} = %s")
+            values.append(UPDATE_DATA[field])
+    fields.append("updated_at = CURRENT_TIMESTAMP")
+    values.append(1)
+    return f"""
+                UPDATE profiles
+                SET {', '.join(fields)}
+                WHERE user_id = %s
+                RETURNING {PROFILE_COLUMNS}
+            """, values
+
+
+def memoized_update_query():
+    query, fields = update_statement(tuple(UPDATE_DATA))
+    values = [UPDATE_DATA[field] for field in fields]
+    values.append(1)
+    return query, values
+
+
+def planning_ms(cursor, statement: str) -> float:
+    """Planning Time reported by EXPLAIN ANALYZE"""
+    cursor.execute(f"EXPLAIN (ANALYZE, SUMMARY) {statement}")
+    plan = "\n".join(row[0] for row in cursor.fetchall())
+    match = re.search(r"Planning Time: ([\d.]+) ms", plan)
+    return float(match.group(1)) if match else 0.0
+
+
+def database_benchmark(dsn: str):
+    import psycopg2
+
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    cursor = conn.cursor()
+    cursor.execute("SELECT user_id FROM profiles LIMIT 1")
+    row = cursor.fetchone()
+    user_id = row[0] if row else 1
+
+    plain = built_lookup_query()
+    cursor.execute(f"PREPARE bench_lookup AS {plain.replace('%s', '$1')}")
+
+    def run_plain():
+        cursor.execute(plain, (user_id,))
+        cursor.fetchone()
+
+    def run_prepared():
+        cursor.execute("EXECUTE bench_lookup (%s)", (user_id,))
+        cursor.fetchone()
+
+    report("lookup: plain SELECT", measure(run_plain, DB_ITERATIONS))
+    report("lookup: EXECUTE prepared", measure(run_prepared, DB_ITERATIONS))
+
+    # Once warmed up the prepared statement runs a cached generic plan
+    plain_plan = planning_ms(cursor, plain.replace("%s", str(int(user_id))))
+    prepared_plan = planning_ms(cursor, f"EXECUTE bench_lookup ({int(user_id)})")
+    print(f"{'planning time: plain SELECT':<40} {plain_plan:>10.3f} ms")
+    print(f"{'planning time: EXECUTE prepared':<40} {prepared_plan:>10.3f} ms")
+
+    cursor.execute("DEALLOCATE bench_lookup")
+    conn.close()
+
+
+def main():
+    report("lookup SQL: f-string per request", measure(built_lookup_query, ITERATIONS))
+    report("update SQL+params: built per request", measure(built_update_query, ITERATIONS))
+    report("update SQL+params: memoized", measure(memoized_update_query, ITERATIONS))
+
+    dsn = os.getenv("BENCH_DATABASE_URL")
+    if dsn:
+        database_benchmark(dsn)
+    else:
+        print("BENCH_DATABASE_URL not set: skipping parse/plan benchmark")
+
+
+if __name__ == "__main__":
+    main()
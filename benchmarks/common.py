@@ -0,0 +1,114 @@
+# benchmarks/common.py
+"""Shared helpers for the local benchmark scripts.
+
+Run any benchmark from the project root, e.g. ``python -m benchmarks.bench_jwt_cache``.
+"""
+import contextlib
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ISSUER = "ingesis.uniquindio.edu.co"
+
+
+def generate_keys() -> Dict[str, Any]:
+    """Generate an RSA key pair and publish the public half via PUBLIC_KEY_PATH"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    ).decode('utf-8')
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+    fd, path = tempfile.mkstemp(prefix="bench_public_key_", suffix=".pem")
+    with os.fdopen(fd, 'wb') as f:
+        f.write(public_pem)
+    os.environ['PUBLIC_KEY_PATH'] = path
+
+    return {"private_pem": private_pem, "public_key_path": path}
+
+
+def make_token(private_pem: str, user_id: int = 1, ttl: timedelta = timedelta(hours=1),
+               extra_claims: Optional[Dict[str, Any]] = None) -> str:
+    """Sign a token the same way the users service does"""
+    payload = {
+        "userId": user_id,
+        "sub": f"user{user_id}@example.com",
+        "iss": ISSUER,
+        "exp": datetime.utcnow() + ttl,
+        "iat": datetime.utcnow()
+    }
+    if extra_claims:
+        payload.update(extra_claims)
+    return jwt.encode(payload, private_pem, algorithm='RS256')
+
+
+def measure(fn: Callable[[], Any], iterations: int, warmup: int = 10) -> Dict[str, float]:
+    """Call fn repeatedly and return total and per-call timings"""
+    for _ in range(warmup):
+        fn()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "iterations": iterations,
+        "totalSeconds": elapsed,
+        "perCallMicros": elapsed / iterations * 1_000_000,
+        "opsPerSecond": iterations / elapsed if elapsed else float("inf")
+    }
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 when empty)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def report(name: str, result: Dict[str, float]):
+    """Print one benchmark line"""
+    print(f"{name:<40} {result['perCallMicros']:>10.2f} us/op  {result['opsPerSecond']:>12.0f} ops/s")
+
+
+@contextlib.contextmanager
+def quiet_logs():
+    """Send the JSON log lines to /dev/null while a benchmark runs"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def sample_profile(user_id: int = 1) -> Dict[str, Any]:
+    """Profile dict shaped like the repository output"""
+    now = datetime.utcnow()
+    return {
+        "id": user_id,
+        "user_id": user_id,
+        "personal_url": "https://example.com",
+        "nickname": f"user{user_id}",
+        "is_contact_public": True,
+        "mailing_address": "123 Test St",
+        "biography": "Bio " * 50,
+        "organization": "Test Org",
+        "country": "Colombia",
+        "social_links": {"twitter": "https://twitter.com/test"},
+        "created_at": now,
+        "updated_at": now
+    }
@@ -0,0 +1,278 @@
+# benchmarks/load.py
+"""Load test: a GET/PUT mix against the real app, reported as JSON.
+
+The app runs unchanged (middlewares, JWT verification, controller, cache
+layer); only the database and the users service are replaced by local
+stand-ins. Configured through environment variables:
+
+- ``BENCH_BACKEND``: ``fake`` (in-process dict repository, default) or
+  ``postgres`` (the DB_* database; profiles for user ids 1..BENCH_USERS must exist)
+- ``BENCH_TRANSPORT``: ``asgi`` (in-process, no sockets, default) or ``http``
+  (uvicorn on a local port, driven over TCP)
+- ``BENCH_CONCURRENCY``, ``BENCH_DURATION``, ``BENCH_WARMUP`` (seconds),
+  ``BENCH_READ_RATIO``, ``BENCH_USERS``, ``BENCH_DB_LATENCY`` (fake backend), ``BENCH_SEED``
+- ``BENCH_OUTPUT``: JSON-lines file each run is appended to, to compare runs over time
+
+Example: ``BENCH_CONCURRENCY=64 BENCH_DURATION=10 python -m benchmarks.load``
+"""
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import generate_keys, make_token, percentile, quiet_logs, sample_profile
+
+BACKEND = os.getenv("BENCH_BACKEND", "fake").lower()
+TRANSPORT = os.getenv("BENCH_TRANSPORT", "asgi").lower()
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "32"))
+DURATION = float(os.getenv("BENCH_DURATION", "10"))
+WARMUP = float(os.getenv("BENCH_WARMUP", "1"))
+READ_RATIO = float(os.getenv("BENCH_READ_RATIO", "0.9"))
+USERS = int(os.getenv("BENCH_USERS", "100"))
+DB_LATENCY = float(os.getenv("BENCH_DB_LATENCY", "0.001"))
+SEED = int(os.getenv("BENCH_SEED", "42"))
+OUTPUT = os.getenv("BENCH_OUTPUT")
+
+from repositories.profile_repository import ProfileNotFoundError, ProfileVersionMismatchError, projection_columns
+
+
+class FakeProfileRepository:
+    """Dict-backed stand-in for the profile repository, with a simulated round trip"""
+
+    def __init__(self, users: int, latency: float):
+        self.rows = {user_id: sample_profile(user_id) for user_id in range(1, users + 1)}
+        self.latency = latency
+
+    async def _round_trip(self):
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+    async def find_by_user_id(self, user_id: int, fields=None) -> Optional[Dict[str, Any]]:
+        await self._round_trip()
+        row = self.rows.get(user_id)
+        if row is None:
+            return None
+        if fields is not None:
+            return {column: row[column] for column in projection_columns(fields)}
+        return dict(row)
+
+    async def find_version(self, user_id: int):
+        await self._round_trip()
+        row = self.rows.get(user_id)
+        return (row["id"], row["updated_at"]) if row is not None else None
+
+    async def find_by_user_ids(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        await self._round_trip()
+        return {user_id: dict(self.rows[user_id]) for user_id in user_ids if user_id in self.rows}
+
+    async def update(self, user_id: int, update_data: Dict[str, Any], expected_versions=None) -> Dict[str, Any]:
+        await self._round_trip()
+        row = self.rows.get(user_id)
+        if row is None:
+            raise ProfileNotFoundError(user_id)
+        if expected_versions is not None and row["updated_at"] not in expected_versions:
+            raise ProfileVersionMismatchError(user_id)
+        row.update(update_data)
+        row["updated_at"] = datetime.utcnow()
+        return dict(row)
+
+    async def patch(self, user_id: int, update_data: Dict[str, Any], expected_versions=None) -> Dict[str, Any]:
+        links = update_data.get("social_links")
+        if links is not None:
+            merged = {**self.rows.get(user_id, {}).get("social_links", {}), **links}
+            update_data = {**update_data, "social_links": {k: v for k, v in merged.items() if v is not None}}
+        return await self.update(user_id, update_data, expected_versions)
+
+    async def bulk_update(self, updates: Dict[int, Dict[str, Any]], batch_size: int = 500):
+        await self._round_trip()
+        touched = set()
+        for user_id, update_data in updates.items():
+            if user_id in self.rows:
+                self.rows[user_id].update(update_data, updated_at=datetime.utcnow())
+                touched.add(user_id)
+        return touched
+
+
+def install_fake_repository(controller, repository):
+    """Replace the innermost repository, keeping the configured cache and coalescing layers in front of it"""
+    owner = controller
+    while hasattr(owner.repository, "repository"):
+        owner = owner.repository
+    owner.repository = repository
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": count / elapsed if elapsed else 0.0,
+        "p50Ms": percentile(latencies, 50) * 1000,
+        "p95Ms": percentile(latencies, 95) * 1000,
+        "p99Ms": percentile(latencies, 99) * 1000,
+        "maxMs": (latencies[-1] if latencies else 0.0) * 1000
+    }
+
+
+async def drive(client: httpx.AsyncClient, tokens: Dict[int, str]) -> Dict[str, Any]:
+    """Closed-loop clients issuing requests until the deadline; returns per-operation stats"""
+    rng = random.Random(SEED)
+    latencies = {"get": [], "put": []}
+    errors = {"get": 0, "put": 0}
+    start = time.perf_counter()
+    measure_from = start + WARMUP
+    deadline = measure_from + DURATION
+
+    async def worker(worker_id: int):
+        sequence = 0
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            user_id = rng.randint(1, USERS)
+            headers = {"Authorization": f"Bearer {tokens[user_id]}"}
+            if rng.random() < READ_RATIO:
+                op = "get"
+                request = client.get(f"/api/v1/profiles/{user_id}", headers=headers)
+            else:
+                op = "put"
+                sequence += 1
+                body = {"nickname": f"load-{worker_id}-{sequence}", "country": "Colombia"}
+                request = client.put(f"/api/v1/profiles/{user_id}", headers=headers, json=body)
+
+            sent = time.perf_counter()
+            try:
+                response = await request
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            finished = time.perf_counter()
+
+            if sent < measure_from:
+                continue
+            if ok:
+                latencies[op].append(finished - sent)
+            else:
+                errors[op] += 1
+
+    await asyncio.gather(*(worker(i) for i in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - measure_from
+
+    results = {op: summarize(latencies[op], errors[op], elapsed) for op in ("get", "put")}
+    results["all"] = summarize(latencies["get"] + latencies["put"], errors["get"] + errors["put"], elapsed)
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalServer:
+    """uvicorn serving the app on a local port from a background thread"""
+
+    def __init__(self, app):
+        import uvicorn
+
+        self.port = free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return f"http://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def run(app, tokens: Dict[int, str]) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+    if TRANSPORT == "http":
+        with LocalServer(app) as base_url:
+            async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+                return await drive(client, tokens)
+
+    # ASGITransport sends no lifespan events: open the pools the way the lifespan would
+    if BACKEND == "postgres":
+        from config.database import db_config
+        await db_config.connect()
+        if db_config.replicas.replicas:
+            await db_config.replicas.check()
+            asyncio.get_running_loop().create_task(db_config.replicas.run())
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+        return await drive(client, tokens)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    keys = generate_keys()
+    tokens = {user_id: make_token(keys["private_pem"], user_id) for user_id in range(1, USERS + 1)}
+
+    from main import app
+    from routes.profile_routes import controller
+
+    if BACKEND == "fake":
+        install_fake_repository(controller, FakeProfileRepository(USERS, DB_LATENCY))
+    elif BACKEND != "postgres":
+        raise SystemExit(f"Unknown BENCH_BACKEND: {BACKEND}")
+
+    with quiet_logs():
+        results = asyncio.run(run(app, tokens))
+
+    document = {
+        "benchmark": "load",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "commit": git_commit(),
+        "config": {
+            "backend": BACKEND,
+            "transport": TRANSPORT,
+            "concurrency": CONCURRENCY,
+            "durationSeconds": DURATION,
+            "readRatio": READ_RATIO,
+            "users": USERS,
+            "dbLatencySeconds": DB_LATENCY if BACKEND == "fake" else None
+        },
+        "results": results
+    }
+
+    line = json.dumps(document)
+    print(line)
+    if OUTPUT:
+        with open(OUTPUT, "a") as f:
+            f.write(line + "\n")
+
+    for op in ("get", "put", "all"):
+        r = results[op]
+        print(
+            f"{op:<4} {r['rps']:>9.0f} req/s  p50 {r['p50Ms']:>7.2f} ms  p95 {r['p95Ms']:>7.2f} ms  "
+            f"p99 {r['p99Ms']:>7.2f} ms  errors {r['errors']}",
+            file=sys.stderr
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+from .lru import LRUCache
+from .backend import CacheBackend
+from .single_flight import SingleFlight
+
+__all__ = ["LRUCache", "CacheBackend", "SingleFlight"]
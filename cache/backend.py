@@ -0,0 +1,25 @@
+from typing import Any, Optional
+
+
+class CacheBackend:
+    """Interface for a shared cache (e.g. Redis) placed behind the in-process LRU.
+
+    Implementations are async so network-backed stores never block the event
+    loop. They own serialization of the values they are given.
+    """
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None"""
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float):
+        """Store value under key for ttl seconds"""
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        """Remove key if present"""
+        raise NotImplementedError
+
+    async def size(self) -> Optional[int]:
+        """Number of stored entries, or None if the backend cannot tell cheaply"""
+        return None
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Share one in-flight call per key among concurrent callers.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs await the same task instead of starting their own, and get
+    its result or its exception. The call is shielded, so a cancelled caller
+    never cancels it for the others. Every caller, the one that started the
+    call included, stops waiting after ``timeout``; the call itself goes on
+    for whoever is still waiting.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.calls = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self._in_flight: Dict[Hashable, "asyncio.Task"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of fn(), shared with every concurrent caller using the same key"""
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    def forget(self, key: Hashable):
+        """Let later callers start a fresh call, e.g. after a write made the running one stale"""
+        self._in_flight.pop(key, None)
+
+    def _finished(self, key: Hashable, task: "asyncio.Task"):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception retrieved: every caller may have been cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls started, calls saved by joining one in flight, and waits that timed out"""
+        return {
+            "inFlight": len(self._in_flight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._in_flight
+
+    def keys(self):
+        """Keys with a call in flight"""
+        return list(self._in_flight)
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
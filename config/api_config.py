@@ -0,0 +1,23 @@
+import os
+
+
+class ApiConfig:
+    def __init__(self):
+        # Maximum user_ids accepted by POST /api/v1/profiles/batch
+        self.batch_max_ids = int(os.getenv("BATCH_MAX_IDS", "100"))
+        # POST /api/v1/profiles/bulk: max items per request, rows per UPDATE statement
+        # and the JWT scope a service token must carry to use it
+        self.bulk_max_items = int(os.getenv("BULK_MAX_ITEMS", "50000"))
+        self.bulk_batch_size = int(os.getenv("BULK_BATCH_SIZE", "500"))
+        self.bulk_scope = os.getenv("BULK_SCOPE", "profiles:bulk_write")
+        # Per-request phase timings in a Server-Timing header and the access log
+        self.server_timing = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+        # Background readiness checks: seconds between runs, SELECT 1 timeout and how
+        # many consecutive checks with every pool connection in use mark the pod not ready
+        self.readiness_interval = float(os.getenv("READINESS_INTERVAL", "5"))
+        self.readiness_timeout = float(os.getenv("READINESS_TIMEOUT", "2"))
+        self.readiness_saturation_checks = int(os.getenv("READINESS_SATURATION_CHECKS", "3"))
+
+
+# Global API config instance
+api_config = ApiConfig()
@@ -0,0 +1,21 @@
+import os
+
+
+class CacheConfig:
+    def __init__(self):
+        # In-process profile cache: max entries (0 disables the cache) and TTL in seconds
+        self.profile_cache_size = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+        self.profile_cache_ttl = float(os.getenv("PROFILE_CACHE_TTL", "30"))
+        # Worker processes (exported by the launcher). Each keeps its own in-process tier, so a
+        # write served by one would leave the others' copies stale: that tier needs a single worker
+        self.workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+        self.local_profile_cache = self.profile_cache_size > 0 and self.workers == 1
+        # TTL for entries written to an optional shared backend
+        self.shared_cache_ttl = float(os.getenv("PROFILE_SHARED_CACHE_TTL", "300"))
+        # Concurrent reads of the same profile share one query; joiners wait at most this many seconds
+        self.coalesce_reads = os.getenv("PROFILE_COALESCE_READS", "true").lower() == "true"
+        self.coalesce_timeout = float(os.getenv("PROFILE_COALESCE_TIMEOUT", "5"))
+
+
+# Global cache config instance
+cache_config = CacheConfig()
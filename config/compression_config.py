@@ -0,0 +1,23 @@
+import os
+
+
+class CompressionConfig:
+    def __init__(self):
+        self.enabled = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+        # Bodies smaller than this many bytes are sent as-is
+        self.minimum_size = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        # Server preference order; br is skipped when the brotli package is missing
+        self.encodings = tuple(
+            encoding.strip().lower()
+            for encoding in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",")
+            if encoding.strip()
+        )
+        self.gzip_level = int(os.getenv("COMPRESSION_LEVEL", "6"))
+        self.brotli_quality = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+        # Compressed bodies kept per URL + ETag + encoding (0 disables the cache)
+        self.cache_size = int(os.getenv("COMPRESSION_CACHE_SIZE", "1000"))
+        self.cache_ttl = float(os.getenv("COMPRESSION_CACHE_TTL", "300"))
+
+
+# Global compression config instance
+compression_config = CompressionConfig()
@@ -0,0 +1,230 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+from psycopg2 import extensions
+from metrics.instruments import DB_POOL_EXHAUSTED, DB_POOL_TIMEOUTS
+from logger.logger import warn
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection became available within the checkout timeout"""
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool with bounded waits.
+
+    Callers block for up to ``timeout`` seconds when every connection is
+    checked out instead of failing immediately. Connections older than
+    ``max_lifetime`` are recycled, connections idle for longer than
+    ``validate_after`` are checked with ``SELECT 1`` before reuse, and broken
+    connections are discarded on return.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 20,
+        timeout: float = 5.0,
+        max_lifetime: float = 1800.0,
+        validate_after: float = 30.0
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool sizing: min={min_size} max={max_size}")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.validate_after = validate_after
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, returned_at), most recently used on the right
+        self._created: Dict[int, float] = {}
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.exhausted_count = 0
+        self.timeout_count = 0
+        self.recycled_count = 0
+        self.discarded_count = 0
+
+        try:
+            for _ in range(min_size):
+                self._idle.append((self._open(), time.monotonic()))
+                self._size += 1
+        except Exception:
+            # Don't leak the connections opened before the failure
+            for conn, _ in self._idle:
+                self._close_quietly(conn)
+            self._idle.clear()
+            self._created.clear()
+            self._size = 0
+            raise
+
+    def getconn(self, timeout: Optional[float] = None):
+        """Check out a connection, waiting up to timeout seconds for one to free up"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            conn = None
+            returned_at = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                    if self._idle:
+                        conn, returned_at = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # Reserve the slot now, open the connection outside the lock
+                        self._size += 1
+                        break
+                    if not waited:
+                        waited = True
+                        self.exhausted_count += 1
+                        DB_POOL_EXHAUSTED.inc()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeout_count += 1
+                        DB_POOL_TIMEOUTS.inc()
+                        raise PoolTimeoutError(
+                            f"No database connection available after {timeout:.1f}s "
+                            f"(max {self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_usable(conn, returned_at):
+                self._discard(conn)
+                continue
+
+            wait = time.monotonic() - start
+            with self._cond:
+                self._in_use += 1
+                self.checkouts += 1
+                self.wait_time_total += wait
+                if wait > self.wait_time_max:
+                    self.wait_time_max = wait
+            return conn
+
+    def putconn(self, conn, close: bool = False):
+        """Return a connection, discarding it if broken, expired or asked to close"""
+        with self._cond:
+            self._in_use -= 1
+
+        if close or conn.closed or self._expired(conn):
+            self._discard(conn)
+            return
+
+        status = conn.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            self._discard(conn)
+            return
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except Exception:
+                self._discard(conn)
+                return
+
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                self._created.pop(id(conn), None)
+                self._close_quietly(conn)
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Close idle connections and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for conn, _ in idle:
+            self._created.pop(id(conn), None)
+            self._close_quietly(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool occupancy and checkout wait metrics"""
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "inUse": self._in_use,
+                "minSize": self.min_size,
+                "maxSize": self.max_size,
+                "checkouts": self.checkouts,
+                "waitTimeTotal": self.wait_time_total,
+                "waitTimeMax": self.wait_time_max,
+                "waitTimeAvg": self.wait_time_total / self.checkouts if self.checkouts else 0.0,
+                "exhausted": self.exhausted_count,
+                "timeouts": self.timeout_count,
+                "recycled": self.recycled_count,
+                "discarded": self.discarded_count
+            }
+
+    def _open(self):
+        conn = self._connect()
+        self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def _expired(self, conn) -> bool:
+        created_at = self._created.get(id(conn))
+        return created_at is not None and time.monotonic() - created_at >= self.max_lifetime
+
+    def _is_usable(self, conn, returned_at: float) -> bool:
+        if conn.closed:
+            return False
+        if self._expired(conn):
+            self.recycled_count += 1
+            return False
+        if time.monotonic() - returned_at < self.validate_after:
+            return True
+
+        # Idle long enough that the server or a proxy may have dropped it
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception as e:
+            warn("Database", "Conexión inválida descartada del pool", {"error": str(e)})
+            return False
+
+    def _discard(self, conn):
+        self._created.pop(id(conn), None)
+        self._close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self.discarded_count += 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
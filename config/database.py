@@ -1,68 +1,350 @@
 import os
+import asyncio
+import threading
+from contextlib import suppress
+import asyncpg
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import extras
+from config.connection_pool import ConnectionPool
+from config.prepared_statements import PreparedStatements
+from config.replicas import ReplicaSet, parse_hosts
+from metrics.instruments import DB_POOL_CHECKOUT_WAIT, DB_POOL_CONNECTIONS, DB_REPLICA_LAG
+from metrics.timing import record
 from logger.logger import info, error, warn
+from serialization.json_backend import dumps, loads
 import time
+from typing import Iterable, Optional
+
+
+# "psycopg2" (blocking pool, sync handlers in the threadpool) or "asyncpg" (asyncio pool)
+DB_DRIVER = os.getenv("DB_DRIVER", "psycopg2").lower()
+
+
+def split_connections(pool_max_size: int, max_connections_total: int, workers: int) -> int:
+    """Per-worker pool size keeping all workers together within max_connections_total"""
+    return max(1, min(pool_max_size, max_connections_total // max(1, workers)))
 
 
 class DatabaseConfig:
-    def __init__(self):
-        self.host = os.getenv("DB_HOST", "database")
-        self.port = os.getenv("DB_PORT", "5432")
+    def __init__(self, host=None, port=None, statements=None, replica=False):
+        self.host = host or os.getenv("DB_HOST", "database")
+        self.port = port or os.getenv("DB_PORT", "5432")
         self.user = os.getenv("DB_USER", "admin_user")
         self.password = os.getenv("DB_PASSWORD", "supersecurepassword")
         self.database = os.getenv("DB_NAME", "usuariosdb")
+        # Worker processes sharing this instance's connection budget (exported by the launcher)
+        self.workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+        self.pool_max_size = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+        # Pool connections the whole instance may open, split evenly across workers
+        self.max_connections_total = int(os.getenv("DB_MAX_CONNECTIONS_TOTAL", str(self.pool_max_size)))
+        self.max_connections = split_connections(self.pool_max_size, self.max_connections_total, self.workers)
+        self.min_connections = min(int(os.getenv("DB_POOL_MIN_SIZE", "1")), self.max_connections)
+        # Seconds to wait for a free connection before failing the request
+        self.pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+        # Recycle connections older than this many seconds
+        self.pool_max_lifetime = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+        # Run SELECT 1 before reusing a connection idle for longer than this
+        self.pool_validate_after = float(os.getenv("DB_POOL_VALIDATE_AFTER", "30"))
+        # Server-side prepared statements; disable behind a transaction-mode pgbouncer.
+        # Replicas share the primary's registry, statements are tracked per connection
+        self.statements = statements if statements is not None else PreparedStatements(
+            enabled=os.getenv("DB_PREPARED_STATEMENTS", "true").lower() == "true"
+        )
+        # Per-connection prepared statement cache of the asyncpg driver
+        self.statement_cache_size = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "300"))
+        # Startup retry backoff: first delay, doubled after each failure up to the cap
+        self.connect_retry_delay = float(os.getenv("DB_CONNECT_RETRY_DELAY", "1"))
+        self.connect_max_delay = float(os.getenv("DB_CONNECT_MAX_DELAY", "30"))
         
+        # Opened by connect() from the app lifespan, never at import time
         self.connection_pool = None
-        self._initialize_pool()
+        # Dedicated connection for readiness pings, outside the request pool
+        self._health_connection = None
+        self._health_lock = threading.Lock()
+        # id(connection) -> replica config it was borrowed from
+        self._borrowed = {}
+        
+        # Read replicas ("host[:port],..."), each with its own pool sized like this one
+        hosts = [] if replica else parse_hosts(os.getenv("DB_REPLICA_HOSTS", ""), self.port)
+        self.replicas = ReplicaSet(
+            [type(self)(host, port, self.statements, replica=True) for host, port in hosts],
+            max_lag=float(os.getenv("DB_REPLICA_MAX_LAG", "1")),
+            check_interval=float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "1")),
+            # Users that just wrote read from the primary for this many seconds
+            sticky_seconds=float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+        )
+    
+    @property
+    def is_ready(self) -> bool:
+        """Whether the pool is open"""
+        return self.connection_pool is not None
+    
+    def wrote(self, *user_ids: int):
+        """Record a committed write so these users read their own writes"""
+        self.replicas.wrote(user_ids)
     
-    def _initialize_pool(self):
-        """Initialize connection pool with retry logic"""
-        max_retries = 5
-        delay = 5
+    async def connect(self, retry: bool = True):
+        """Open the pool, retrying with exponential backoff without blocking the event loop"""
+        delay = self.connect_retry_delay
+        attempt = 0
         
-        for attempt in range(1, max_retries + 1):
+        while True:
+            attempt += 1
             try:
-                self.connection_pool = psycopg2.pool.SimpleConnectionPool(
-                    1, 20,
-                    host=self.host,
-                    port=self.port,
-                    user=self.user,
-                    password=self.password,
-                    database=self.database
-                )
-                info("Database", "✅ Conectado con PostgreSQL", {
-                    "host": self.host,
-                    "db": self.database
-                })
+                await self._open_pool()
                 return
             except Exception as err:
-                error("Database", f"❌ Intento {attempt} fallido", {"error": str(err)})
-                
-                if attempt < max_retries:
-                    warn("Database", f"🔄 Reintentando conexión en {delay} segundos...", {"attempt": attempt})
-                    time.sleep(delay)
-                else:
-                    error("Database", "❌ Todos los intentos fallidos. Cerrando aplicación...")
+                if not retry:
                     raise
+                error("Database", f"❌ Intento {attempt} fallido", {"error": str(err)})
+                warn("Database", f"🔄 Reintentando conexión en {delay:g} segundos...", {"attempt": attempt})
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.connect_max_delay)
     
-    def get_connection(self):
-        """Get a connection from the pool"""
+    async def _open_pool(self):
+        # psycopg2 connects synchronously: open the min_size connections in a worker thread
+        self.connection_pool = await asyncio.to_thread(
+            ConnectionPool,
+            self._connect,
+            min_size=self.min_connections,
+            max_size=self.max_connections,
+            timeout=self.pool_timeout,
+            max_lifetime=self.pool_max_lifetime,
+            validate_after=self.pool_validate_after
+        )
+        info("Database", "✅ Conectado con PostgreSQL", {
+            "host": self.host,
+            "db": self.database
+        })
+    
+    def _connect(self):
+        """Open a new PostgreSQL connection"""
+        conn = psycopg2.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database
+        )
+        # Decode JSONB with the same JSON backend used to encode it
+        extras.register_default_jsonb(conn, loads=loads)
+        return conn
+    
+    async def ping(self, timeout: float):
+        """SELECT 1 on the dedicated health connection; raises on failure or timeout"""
+        await self.fetch_value("SELECT 1", timeout)
+    
+    async def fetch_value(self, sql: str, timeout: float):
+        """First column of a query run on the dedicated health connection"""
+        return await asyncio.wait_for(asyncio.to_thread(self._fetch_value, sql), timeout)
+    
+    def _fetch_value(self, sql: str):
+        # A query abandoned by a timeout may still hold the connection
+        if not self._health_lock.acquire(blocking=False):
+            raise TimeoutError("Previous health query still running")
+        try:
+            conn = self._health_connection
+            if conn is None or conn.closed:
+                conn = self._health_connection = self._connect()
+                conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(sql)
+                    return cursor.fetchone()[0]
+            except Exception:
+                self._health_connection = None
+                with suppress(Exception):
+                    conn.close()
+                raise
+        finally:
+            self._health_lock.release()
+    
+    def get_connection(self, read_for: Optional[Iterable[int]] = None):
+        """Get a connection from the pool, waiting up to pool_timeout for one.
+        
+        Reads pass the user_ids they fetch in read_for and may be routed to a replica.
+        """
+        if read_for is not None and self.replicas.replicas:
+            source = self.replicas.pick(self, read_for)
+            if source is not self:
+                conn = source.get_connection()
+                self._borrowed[id(conn)] = source
+                return conn
         if self.connection_pool:
-            return self.connection_pool.getconn()
+            start = time.perf_counter()
+            conn = self.connection_pool.getconn()
+            waited = time.perf_counter() - start
+            DB_POOL_CHECKOUT_WAIT.observe(waited)
+            record("db_wait", waited)
+            self.statements.prepare(conn)
+            return conn
         raise Exception("Connection pool not initialized")
     
     def return_connection(self, conn):
-        """Return a connection to the pool"""
-        if self.connection_pool:
+        """Return a connection to the pool it came from"""
+        source = self._borrowed.pop(id(conn), None)
+        if source is not None:
+            source.return_connection(conn)
+        elif self.connection_pool:
             self.connection_pool.putconn(conn)
     
     def close_all_connections(self):
-        """Close all connections in the pool"""
+        """Close all connections in the pool and the replicas' pools"""
         if self.connection_pool:
             self.connection_pool.closeall()
+        if self._health_connection is not None:
+            with suppress(Exception):
+                self._health_connection.close()
+            self._health_connection = None
+        for replica in self.replicas.replicas:
+            replica.close_all_connections()
+    
+    def pool_stats(self):
+        """Pool occupancy, checkout wait and exhaustion counters"""
+        if self.connection_pool:
+            return self.connection_pool.stats()
+        return {}
+
+
+class AsyncDatabaseConfig(DatabaseConfig):
+    """asyncpg connection pool with the same settings and sizing as DatabaseConfig.
+    
+    asyncpg only closes connections idle for max_inactive_connection_lifetime;
+    connections older than pool_max_lifetime are retired on acquire instead.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Backend pid -> when its connection opened (monotonic)
+        self._opened = {}
+    
+    async def _open_pool(self):
+        self.connection_pool = await asyncpg.create_pool(
+            host=self.host,
+            port=int(self.port),
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            min_size=self.min_connections,
+            max_size=self.max_connections,
+            max_inactive_connection_lifetime=self.pool_max_lifetime,
+            statement_cache_size=self.statement_cache_size if self.statements.enabled else 0,
+            init=self._init_connection
+        )
+        info("Database", "✅ Conectado con PostgreSQL (asyncpg)", {
+            "host": self.host,
+            "db": self.database
+        })
+    
+    async def _init_connection(self, conn):
+        """Decode JSONB columns to dicts, like psycopg2 does, and note the connection's age"""
+        self._opened[conn.get_server_pid()] = time.monotonic()
+        await conn.set_type_codec(
+            "jsonb",
+            encoder=dumps,
+            decoder=loads,
+            schema="pg_catalog"
+        )
+    
+    async def fetch_value(self, sql: str, timeout: float):
+        """First column of a query run on the dedicated health connection"""
+        conn = self._health_connection
+        try:
+            if conn is None or conn.is_closed():
+                conn = self._health_connection = await asyncpg.connect(
+                    host=self.host,
+                    port=int(self.port),
+                    user=self.user,
+                    password=self.password,
+                    database=self.database,
+                    timeout=timeout,
+                    statement_cache_size=0
+                )
+            return await conn.fetchval(sql, timeout=timeout)
+        except Exception:
+            self._health_connection = None
+            if conn is not None:
+                conn.terminate()
+            raise
+    
+    async def get_connection(self, read_for: Optional[Iterable[int]] = None):
+        """Acquire a connection from the pool; reads may be routed to a replica (see DatabaseConfig)"""
+        if read_for is not None and self.replicas.replicas:
+            source = self.replicas.pick(self, read_for)
+            if source is not self:
+                conn = await source.get_connection()
+                self._borrowed[id(conn)] = source
+                return conn
+        if self.connection_pool:
+            start = time.perf_counter()
+            conn = await self.connection_pool.acquire(timeout=self.pool_timeout)
+            while self._expired(conn):
+                # Closed connections are reopened by the pool on their next acquire
+                self._opened.pop(conn.get_server_pid(), None)
+                await conn.close(timeout=self.pool_timeout)
+                await self.connection_pool.release(conn)
+                conn = await self.connection_pool.acquire(timeout=self.pool_timeout)
+            waited = time.perf_counter() - start
+            DB_POOL_CHECKOUT_WAIT.observe(waited)
+            record("db_wait", waited)
+            return conn
+        raise Exception("Connection pool not initialized")
+    
+    def _expired(self, conn) -> bool:
+        opened = self._opened.get(conn.get_server_pid())
+        return opened is not None and time.monotonic() - opened >= self.pool_max_lifetime
+    
+    async def return_connection(self, conn):
+        """Release a connection back to the pool it came from"""
+        source = self._borrowed.pop(id(conn), None)
+        if source is not None:
+            await source.return_connection(conn)
+        elif self.connection_pool:
+            await self.connection_pool.release(conn)
+    
+    async def close_all_connections(self):
+        """Close all connections in the pool and the replicas' pools"""
+        if self.connection_pool:
+            await self.connection_pool.close()
+        self._opened.clear()
+        if self._health_connection is not None:
+            self._health_connection.terminate()
+            self._health_connection = None
+        for replica in self.replicas.replicas:
+            await replica.close_all_connections()
+    
+    def pool_stats(self):
+        """Pool occupancy as reported by asyncpg"""
+        if self.connection_pool:
+            size = self.connection_pool.get_size()
+            idle = self.connection_pool.get_idle_size()
+            return {
+                "size": size,
+                "idle": idle,
+                "inUse": size - idle,
+                "minSize": self.min_connections,
+                "maxSize": self.max_connections
+            }
+        return {}
+
+
+# Global database instance for the configured driver
+db_config = AsyncDatabaseConfig() if DB_DRIVER == "asyncpg" else DatabaseConfig()
+
+
+def _pool_connections():
+    stats = db_config.pool_stats()
+    if not stats:
+        return {}
+    return {("idle",): stats["idle"], ("in_use",): stats["inUse"]}
+
+
+DB_POOL_CONNECTIONS.set_function(_pool_connections)
+
+
+def _replica_lags():
+    return {(name,): lag for name, lag in db_config.replicas.lags.items() if lag is not None}
 
 
-# Global database instance
-db_config = DatabaseConfig()
+DB_REPLICA_LAG.set_function(_replica_lags)
 
@@ -2,15 +2,25 @@ import os
 from pathlib import Path
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
+from jose import jwk
 
 
 class JWTConfig:
     def __init__(self):
         self.public_key_path = os.getenv("PUBLIC_KEY_PATH", "/app/keys/public-key.pem")
+        # Verified-token cache: max entries (0 disables) and fallback TTL for tokens without exp
+        self.cache_size = int(os.getenv("JWT_CACHE_SIZE", "1024"))
+        self.cache_ttl = float(os.getenv("JWT_CACHE_TTL", "300"))
+        # Read by load() from the app lifespan, or on first use
         self._public_key = None
-        self._load_public_key()
+        self._verifier = None
     
-    def _load_public_key(self):
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the public key has been read and parsed"""
+        return self._verifier is not None
+    
+    def load(self):
         """Load RSA public key from PEM file"""
         try:
             with open(self.public_key_path, 'r') as f:
@@ -20,12 +30,22 @@ class JWTConfig:
                 pem_data.encode(),
                 backend=default_backend()
             )
+            # Wrap the parsed key once in the form python-jose verifies with directly
+            self._verifier = jwk.construct(self._public_key, "RS256")
         except Exception as e:
             raise Exception(f"Error loading public key: {str(e)}")
     
     def get_public_key(self):
         """Get the public key for JWT verification"""
+        if self._public_key is None:
+            self.load()
         return self._public_key
+    
+    def get_verifier(self):
+        """Get the prepared RS256 verification key used by python-jose"""
+        if self._verifier is None:
+            self.load()
+        return self._verifier
 
 
 # Global JWT config instance
@@ -0,0 +1,102 @@
+import threading
+import weakref
+from typing import Dict, Tuple
+from logger.logger import warn
+
+# SQLSTATEs meaning the server side cannot keep prepared statements per connection, e.g. a
+# transaction-mode pgbouncer handing each transaction a different backend:
+# feature_not_supported, duplicate_prepared_statement, invalid_sql_statement_name
+UNSUPPORTED = frozenset({"0A000", "42P05", "26000"})
+
+
+class PreparedStatements:
+    """Server-side prepared statements, PREPAREd once per psycopg2 connection.
+
+    Statements are registered with ``%s`` placeholders. ``prepare(conn)`` runs
+    ``PREPARE`` for any statement the connection does not have yet, and
+    ``sql(conn, name)`` returns the matching ``EXECUTE`` text, or the plain
+    query when the statement is not prepared there (disabled, or PREPARE
+    failed). Errors with a SQLSTATE in ``UNSUPPORTED`` turn preparing off for
+    every connection, whether PREPARE raised them or EXECUTE did (``lost``); any
+    other PREPARE failure only skips the connection it hit.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._statements: Dict[str, Tuple[str, str, str]] = {}  # name -> (sql, prepare_sql, execute_sql)
+        self._prepared: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.prepare_count = 0
+
+    def register(self, name: str, sql: str):
+        """Register a query to prepare on every connection"""
+        params = sql.count("%s")
+        numbered = sql
+        for i in range(1, params + 1):
+            numbered = numbered.replace("%s", f"${i}", 1)
+        execute_sql = f"EXECUTE {name}" + (f" ({', '.join(['%s'] * params)})" if params else "")
+        with self._lock:
+            self._statements[name] = (sql, f"PREPARE {name} AS {numbered}", execute_sql)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._statements
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def prepare(self, conn):
+        """PREPARE registered statements missing on this connection"""
+        if not self.enabled:
+            return
+        with self._lock:
+            prepared = self._prepared.setdefault(conn, set())
+            missing = [(name, stmt[1]) for name, stmt in self._statements.items() if name not in prepared]
+        if not missing:
+            return
+
+        done = []
+        try:
+            cursor = conn.cursor()
+            for name, prepare_sql in missing:
+                cursor.execute(prepare_sql)
+                done.append(name)
+            cursor.close()
+            # PREPARE is not transactional; commit only to hand the connection back idle
+            conn.commit()
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            if getattr(e, "pgcode", None) in UNSUPPORTED:
+                self.enabled = False
+                warn("Database", "Sentencias preparadas desactivadas", {"error": str(e)})
+                return
+            # Keep the ones that made it so the next checkout does not PREPARE them twice
+            warn("Database", "Sentencias preparadas omitidas en esta conexión", {"error": str(e)})
+        finally:
+            with self._lock:
+                prepared.update(done)
+                self.prepare_count += len(done)
+
+    def sql(self, conn, name: str) -> str:
+        """Query text to run a registered statement on this connection"""
+        plain, _, execute_sql = self._statements[name]
+        if self.enabled and name in self._prepared.get(conn, ()):
+            return execute_sql
+        return plain
+
+
+    def lost(self, conn, error: Exception) -> bool:
+        """Whether a failed EXECUTE hit a backend without the statement; if so, stop preparing.
+
+        Behind a transaction-mode pooler EXECUTE may reach a backend that never
+        saw the PREPARE. The transaction is rolled back, so the caller can retry
+        the plain query as long as nothing earlier in it needs keeping.
+        """
+        if getattr(error, "pgcode", None) not in UNSUPPORTED:
+            return False
+        conn.rollback()
+        self.enabled = False
+        warn("Database", "Sentencias preparadas desactivadas", {"error": str(error)})
+        return True
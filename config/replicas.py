@@ -0,0 +1,147 @@
+import asyncio
+import itertools
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from cache import LRUCache
+from metrics.instruments import DB_READS
+from logger.logger import info, warn
+
+# Seconds the replica is behind the primary; 0 once it has replayed everything it received,
+# so an idle primary (no new transactions to replay) does not look like lag. NULL while the
+# WAL receiver is not streaming: a disconnected replica has replayed all it received and
+# would otherwise report 0. Reading the receiver status needs pg_read_all_stats.
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Read-your-writes state of the current request, set by ReadYourWritesMiddleware:
+# "primary" when the client wrote recently, "wrote" once this request commits a write
+_client: ContextVar[Optional[Dict[str, bool]]] = ContextVar("read_your_writes", default=None)
+
+
+def start_request(primary: bool) -> Tuple[Dict[str, bool], Any]:
+    """Track the current request's writes; primary routes all its reads to the primary"""
+    state = {"primary": primary, "wrote": False}
+    return state, _client.set(state)
+
+
+def end_request(token):
+    _client.reset(token)
+
+
+def client_wrote_recently() -> bool:
+    """Whether the current request carries a live read-your-writes cookie"""
+    client = _client.get()
+    return client is not None and client["primary"]
+
+
+def parse_hosts(value: str, default_port: str) -> List[Tuple[str, str]]:
+    """("host", "port") pairs from a "host[:port],host[:port]" list"""
+    hosts = []
+    for entry in value.split(","):
+        entry = entry.strip()
+        if entry:
+            host, _, port = entry.partition(":")
+            hosts.append((host, port or default_port))
+    return hosts
+
+
+class ReplicaSet:
+    """Read replicas of the primary with lag-aware round-robin routing.
+
+    A background loop opens each replica's pool and measures its replication
+    lag; only replicas within ``max_lag`` seconds receive reads. Users that
+    wrote in the last ``sticky_seconds`` read from the primary
+    (read-your-writes), and so does everyone when no replica is healthy.
+    That record is per process; ReadYourWritesMiddleware carries it to the
+    other workers in a cookie.
+    """
+
+    def __init__(
+        self,
+        replicas: Iterable[Any],
+        max_lag: float = 1.0,
+        check_interval: float = 1.0,
+        timeout: float = 2.0,
+        sticky_seconds: float = 5.0,
+        sticky_size: int = 100000
+    ):
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.timeout = timeout
+        self.sticky_seconds = sticky_seconds
+        self.lags: Dict[str, Optional[float]] = {replica_name(r): None for r in self.replicas}
+        self._healthy: List[Any] = []
+        self._next = itertools.count()
+        self._recent_writes = LRUCache(sticky_size if self.replicas else 0, sticky_seconds)
+        self._to_primary = DB_READS.labels("primary")
+        self._to_replica = DB_READS.labels("replica")
+
+    def pick(self, primary, user_ids: Iterable[int] = ()):
+        """Config to run a read on: a healthy replica, or the primary"""
+        healthy = self._healthy
+        if healthy and not client_wrote_recently() and not any(self._recent_writes.get(user_id) for user_id in user_ids):
+            self._to_replica.inc()
+            return healthy[next(self._next) % len(healthy)]
+        self._to_primary.inc()
+        return primary
+
+    def wrote(self, user_ids: Iterable[int]):
+        """Send these users' reads to the primary for the next sticky_seconds"""
+        if self.replicas:
+            for user_id in user_ids:
+                self._recent_writes.set(user_id, True)
+            client = _client.get()
+            if client is not None:
+                client["wrote"] = True
+
+    async def run(self):
+        """Check replicas forever; cancelled on shutdown"""
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    async def check(self):
+        """Refresh the lag of every replica and the set that receives reads"""
+        healthy = []
+        # Concurrently, so one unresponsive replica cannot hold back the others' state
+        lags = await asyncio.gather(*(self._measure(replica) for replica in self.replicas))
+        for replica, lag in zip(self.replicas, lags):
+            name = replica_name(replica)
+            usable = lag is not None and lag <= self.max_lag
+            was_usable = replica in self._healthy
+            if usable and not was_usable:
+                info("Database", "Réplica disponible para lecturas", {"replica": name, "lag": lag})
+            elif was_usable and not usable:
+                warn("Database", "Réplica retirada de las lecturas", {"replica": name, "lag": lag})
+            self.lags[name] = lag
+            if usable:
+                healthy.append(replica)
+        self._healthy = healthy
+
+    async def _measure(self, replica) -> Optional[float]:
+        # Bounded: a replica dropping packets would otherwise stall the check forever
+        try:
+            if not replica.is_ready:
+                await asyncio.wait_for(replica.connect(retry=False), self.timeout)
+            lag = await asyncio.wait_for(replica.fetch_value(LAG_QUERY, self.timeout), self.timeout)
+        except Exception:
+            return None
+        return None if lag is None else float(lag)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Lag and routing state of each replica"""
+        return [
+            {"replica": replica_name(r), "lag": self.lags[replica_name(r)], "healthy": r in self._healthy}
+            for r in self.replicas
+        ]
+
+
+def replica_name(replica) -> str:
+    return f"{replica.host}:{replica.port}"
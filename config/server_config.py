@@ -0,0 +1,57 @@
+import importlib.util
+import os
+from typing import Any, Dict
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity / cpuset limits)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class ServerConfig:
+    def __init__(self):
+        self.host = os.getenv("HOST", "0.0.0.0")
+        self.port = int(os.getenv("PORT", "8087"))
+        # Worker processes; 0 or unset uses one per available CPU
+        self.workers = int(os.getenv("WEB_CONCURRENCY", "0")) or available_cpus()
+        # "auto" picks uvloop / httptools when installed (uvicorn[standard])
+        loop = os.getenv("SERVER_LOOP", "auto").lower()
+        self.loop = ("uvloop" if _installed("uvloop") else "asyncio") if loop == "auto" else loop
+        http = os.getenv("SERVER_HTTP", "auto").lower()
+        self.http = ("httptools" if _installed("httptools") else "h11") if http == "auto" else http
+        # Pending connections queued by the kernel, idle keep-alive seconds
+        self.backlog = int(os.getenv("SERVER_BACKLOG", "2048"))
+        self.keep_alive = int(os.getenv("SERVER_KEEP_ALIVE", "5"))
+        # Per-worker limits: concurrent connections before answering 503, requests
+        # before the worker is recycled (0 disables either)
+        self.limit_concurrency = int(os.getenv("SERVER_LIMIT_CONCURRENCY", "0")) or None
+        self.limit_max_requests = int(os.getenv("SERVER_LIMIT_MAX_REQUESTS", "0")) or None
+        self.graceful_timeout = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+        self.access_log = os.getenv("SERVER_ACCESS_LOG", "true").lower() == "true"
+
+    def uvicorn_options(self) -> Dict[str, Any]:
+        """Keyword arguments for uvicorn.run"""
+        return {
+            "host": self.host,
+            "port": self.port,
+            "workers": self.workers,
+            "loop": self.loop,
+            "http": self.http,
+            "backlog": self.backlog,
+            "timeout_keep_alive": self.keep_alive,
+            "limit_concurrency": self.limit_concurrency,
+            "limit_max_requests": self.limit_max_requests,
+            "timeout_graceful_shutdown": self.graceful_timeout,
+            "access_log": self.access_log
+        }
+
+
+# Global server config instance
+server_config = ServerConfig()
@@ -1,17 +1,96 @@
+import asyncio
+from datetime import datetime
 from fastapi import HTTPException, status, Depends
-from typing import Dict, Any
-from models.profile import ProfileUpdate, ProfileResponse
-from repositories.profile_repository import ProfileRepository
-from middleware.jwt_middleware import verify_token
+from typing import Dict, Any, List, Optional, Tuple, Union
+from cache import LRUCache, SingleFlight
+from config.database import DB_DRIVER
+from config.cache_config import cache_config
+from config.api_config import api_config
+from models.profile import (
+    ProfileUpdate,
+    ProfileResponse,
+    ProfileRow,
+    ProfileBatchItem,
+    ProfileBatchResponse,
+    ProfileBulkUpdateItem,
+    ProfileBulkUpdateResult,
+    ProfileBulkUpdateResponse,
+)
+from repositories.profile_repository import (
+    PROFILE_FIELDS,
+    ProfileRepository,
+    ProfileNotFoundError,
+    ProfileVersionMismatchError,
+    projection_mask,
+)
+from repositories.async_profile_repository import AsyncProfileRepository
+from repositories.cached_profile_repository import CachedProfileRepository
+from repositories.coalescing_profile_repository import CoalescingProfileRepository
+from repositories.dispatch import call
+from middleware.jwt_middleware import verify_token, has_scope
+from metrics.timing import phase
+from middleware.etag import profile_etag, if_match_versions
 from logger.logger import info, error, warn
 
 
+def profile_version_etag(profile_id: int, updated_at: datetime, fields: Optional[Tuple[str, ...]] = None) -> str:
+    """ETag of a profile version, distinct for each ?fields= projection"""
+    return profile_etag(profile_id, updated_at, f"{projection_mask(fields):x}" if fields else None)
+
+
 class ProfileController:
     def __init__(self):
-        self.repository = ProfileRepository()
+        if DB_DRIVER == "asyncpg":
+            repository = AsyncProfileRepository()
+        else:
+            repository = ProfileRepository()
+        
+        # Under the cache, so concurrent misses for one profile share a query
+        if cache_config.coalesce_reads:
+            repository = CoalescingProfileRepository(repository, SingleFlight(cache_config.coalesce_timeout))
+        
+        if cache_config.local_profile_cache:
+            repository = CachedProfileRepository(
+                repository,
+                LRUCache(cache_config.profile_cache_size, cache_config.profile_cache_ttl),
+                shared_ttl=cache_config.shared_cache_ttl
+            )
+        elif cache_config.profile_cache_size > 0:
+            warn("[ProfileController]", "Caché de perfiles en proceso desactivada con varios workers", {
+                "workers": cache_config.workers
+            })
+        
+        self.repository = repository
+        # Reported on /metrics; None when the in-process tier is off
+        self.cache = repository if isinstance(repository, CachedProfileRepository) else None
+    
+    def parse_fields(self, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """Validated ?fields= list in response order; None means the full profile"""
+        if not fields:
+            return None
+        
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested.difference(PROFILE_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Campos no permitidos: {', '.join(sorted(unknown))}"
+            )
+        if not requested or len(requested) == len(PROFILE_FIELDS):
+            return None
+        return tuple(field for field in PROFILE_FIELDS if field in requested)
     
-    def get_profile(self, user_id: int, token_data: Dict[str, Any] = Depends(verify_token)) -> ProfileResponse:
-        """Get profile for authenticated user"""
+    async def get_profile(
+        self,
+        user_id: int,
+        token_data: Dict[str, Any] = Depends(verify_token),
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Union[ProfileRow, Dict[str, Any]]:
+        """Get profile for authenticated user.
+        
+        With fields (from parse_fields) only those columns and KEY_FIELDS are
+        read, and the repository dict is returned as is.
+        """
         controller = "[ProfileController]"
         info(controller, "Obteniendo perfil", {"userId": user_id})
         
@@ -28,7 +107,10 @@ class ProfileController:
             )
         
         try:
-            profile = self.repository.find_by_user_id(user_id)
+            if fields is None:
+                profile = await call(self.repository.find_by_user_id, user_id)
+            else:
+                profile = await call(self.repository.find_by_user_id, user_id, fields)
             
             if not profile:
                 error(controller, "Perfil no encontrado", {"userId": user_id})
@@ -38,10 +120,22 @@ class ProfileController:
                 )
             
             info(controller, "Perfil obtenido exitosamente", {"userId": user_id})
-            return ProfileResponse(**profile)
+            if fields is not None:
+                return profile
+            # Rows from the database are trusted: wrap them without revalidating
+            with phase("serialize"):
+                return ProfileRow.from_profile(profile)
             
         except HTTPException:
             raise
+        except asyncio.TimeoutError:
+            # The shared lookup outlived PROFILE_COALESCE_TIMEOUT: overload, not a bug
+            warn(controller, "Tiempo de espera agotado obteniendo perfil", {"userId": user_id})
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servicio saturado, intenta de nuevo",
+                headers={"Retry-After": "1"}
+            )
         except Exception as e:
             error(controller, "Error obteniendo perfil", {
                 "userId": user_id,
@@ -52,13 +146,154 @@ class ProfileController:
                 detail="Error interno obteniendo perfil"
             )
     
-    def update_profile(
+    async def get_profile_etag(
+        self,
+        user_id: int,
+        token_data: Dict[str, Any],
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Optional[str]:
+        """Current ETag of a profile from the cheap version lookup, None if it does not exist"""
+        token_user_id = token_data["user_id"]
+        if token_user_id != user_id:
+            warn("[ProfileController]", "Intento de acceso no autorizado", {
+                "tokenUserId": token_user_id,
+                "requestedUserId": user_id
+            })
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="No tienes permisos para acceder a este perfil"
+            )
+        
+        try:
+            version = await call(self.repository.find_version, user_id)
+        except Exception as e:
+            # Fall back to the full read, which reports the error itself
+            warn("[ProfileController]", "Error obteniendo ETag del perfil", {
+                "userId": user_id,
+                "error": str(e)
+            })
+            return None
+        
+        return profile_version_etag(*version, fields) if version else None
+    
+    async def get_profiles(self, user_ids: List[int], token_data: Dict[str, Any]) -> ProfileBatchResponse:
+        """Get several profiles with one query, returned in request order"""
+        controller = "[ProfileController]"
+        info(controller, "Obteniendo perfiles en lote", {"count": len(user_ids)})
+        
+        if len(user_ids) > api_config.batch_max_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Máximo {api_config.batch_max_ids} user_ids por solicitud"
+            )
+        
+        # Authorize every id in one pass; only allowed ids reach the database
+        token_user_id = token_data["user_id"]
+        allowed = {uid for uid in user_ids if uid == token_user_id}
+        if len(allowed) < len(set(user_ids)):
+            warn(controller, "Perfiles en lote sin permisos", {
+                "tokenUserId": token_user_id,
+                "forbidden": len(set(user_ids)) - len(allowed)
+            })
+        
+        try:
+            profiles = await call(self.repository.find_by_user_ids, list(allowed)) if allowed else {}
+        except Exception as e:
+            error(controller, "Error obteniendo perfiles en lote", {
+                "count": len(user_ids),
+                "error": str(e)
+            })
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error interno obteniendo perfiles"
+            )
+        
+        # Trusted rows: model_construct skips revalidating each profile
+        results = []
+        for uid in user_ids:
+            if uid not in allowed:
+                results.append(ProfileBatchItem(user_id=uid, status="forbidden"))
+            elif uid in profiles:
+                results.append(ProfileBatchItem(user_id=uid, status="ok", profile=ProfileResponse.model_construct(**profiles[uid])))
+            else:
+                results.append(ProfileBatchItem(user_id=uid, status="not_found"))
+        
+        info(controller, "Perfiles en lote obtenidos", {"count": len(user_ids), "found": len(profiles)})
+        return ProfileBatchResponse(results=results)
+    
+    async def bulk_update_profiles(
+        self,
+        items: List[ProfileBulkUpdateItem],
+        token_data: Dict[str, Any]
+    ) -> ProfileBulkUpdateResponse:
+        """Apply many profile updates in one transaction (service tokens only)"""
+        controller = "[ProfileController]"
+        info(controller, "Actualizando perfiles en lote", {"count": len(items)})
+        
+        if not has_scope(token_data, api_config.bulk_scope):
+            warn(controller, "Actualización en lote sin scope", {
+                "tokenUserId": token_data.get("user_id"),
+                "scope": api_config.bulk_scope
+            })
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="No tienes permisos para actualizar perfiles en lote"
+            )
+        
+        if len(items) > api_config.bulk_max_items:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Máximo {api_config.bulk_max_items} elementos por solicitud"
+            )
+        
+        # Later items for the same user win, as if applied one after another
+        updates: Dict[int, Dict[str, Any]] = {}
+        for item in items:
+            update_data = item.profile.model_dump(exclude_none=True)
+            if update_data:
+                updates.setdefault(item.user_id, {}).update(update_data)
+        
+        try:
+            updated = await call(self.repository.bulk_update, updates, api_config.bulk_batch_size) if updates else set()
+        except Exception as e:
+            error(controller, "Error actualizando perfiles en lote", {
+                "count": len(items),
+                "error": str(e)
+            })
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error interno actualizando perfiles"
+            )
+        
+        results = []
+        for item in items:
+            if item.user_id not in updates:
+                results.append(ProfileBulkUpdateResult(user_id=item.user_id, status="invalid"))
+            elif item.user_id in updated:
+                results.append(ProfileBulkUpdateResult(user_id=item.user_id, status="updated"))
+            else:
+                results.append(ProfileBulkUpdateResult(user_id=item.user_id, status="not_found"))
+        
+        counts = {"updated": 0, "not_found": 0, "invalid": 0}
+        for result in results:
+            counts[result.status] += 1
+        
+        info(controller, "Perfiles actualizados en lote", {"count": len(items), **counts})
+        return ProfileBulkUpdateResponse(results=results, **counts)
+    
+    async def update_profile(
         self,
         user_id: int,
         profile_update: ProfileUpdate,
-        token_data: Dict[str, Any] = Depends(verify_token)
-    ) -> ProfileResponse:
-        """Update profile for authenticated user"""
+        token_data: Dict[str, Any] = Depends(verify_token),
+        if_match: Optional[str] = None,
+        merge: bool = False
+    ) -> ProfileRow:
+        """Update profile for authenticated user, conditionally when If-Match is given.
+        
+        With merge (PATCH, profile_update is a ProfilePatch) social_links is
+        merged into the stored links by the database instead of replacing them.
+        """
         controller = "[ProfileController]"
         info(controller, "Actualizando perfil", {"userId": user_id})
         
@@ -75,15 +310,6 @@ class ProfileController:
             )
         
         try:
-            # Check if profile exists
-            existing_profile = self.repository.find_by_user_id(user_id)
-            if not existing_profile:
-                error(controller, "Perfil no encontrado para actualizar", {"userId": user_id})
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Perfil no encontrado"
-                )
-            
             # Prepare update data (only include non-None fields)
             update_data = {}
             if profile_update.personal_url is not None:
@@ -109,11 +335,37 @@ class ProfileController:
                     detail="No hay campos para actualizar"
                 )
             
-            # Update profile
-            updated_profile = self.repository.update(user_id, update_data)
+            # If-Match is checked by the UPDATE itself (updated_at = ANY(...)), so it cannot race
+            args = (user_id, update_data)
+            if if_match is not None:
+                expected_versions = if_match_versions(if_match)
+                if expected_versions == []:
+                    raise HTTPException(
+                        status_code=status.HTTP_412_PRECONDITION_FAILED,
+                        detail="El perfil fue modificado"
+                    )
+                if expected_versions is not None:
+                    args = (user_id, update_data, expected_versions)
+            
+            # Single UPDATE ... RETURNING; no row back means the profile does not exist
+            try:
+                updated_profile = await call(self.repository.patch if merge else self.repository.update, *args)
+            except ProfileVersionMismatchError:
+                warn(controller, "Actualización condicional rechazada", {"userId": user_id})
+                raise HTTPException(
+                    status_code=status.HTTP_412_PRECONDITION_FAILED,
+                    detail="El perfil fue modificado"
+                )
+            except ProfileNotFoundError:
+                error(controller, "Perfil no encontrado para actualizar", {"userId": user_id})
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Perfil no encontrado"
+                )
             
             info(controller, "Perfil actualizado exitosamente", {"userId": user_id})
-            return ProfileResponse(**updated_profile)
+            with phase("serialize"):
+                return ProfileRow.from_profile(updated_profile)
             
         except HTTPException:
             raise
@@ -0,0 +1,3 @@
+from .readiness import ReadinessMonitor
+
+__all__ = ["ReadinessMonitor"]
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from logger.logger import info, warn, error
+
+
+def _check(up: bool, **data) -> Dict[str, Any]:
+    return {"status": "UP" if up else "DOWN", **data}
+
+
+class ReadinessMonitor:
+    """Readiness computed in the background and served from memory.
+
+    Every ``interval`` seconds it checks that the public key is loaded, that
+    the pool is open and has not been saturated for ``saturation_checks``
+    consecutive runs, and that PostgreSQL answers ``SELECT 1`` on the config's
+    dedicated health connection. Probes only read the last result, so they
+    cost nothing and never take a connection from user requests.
+    """
+
+    def __init__(self, db_config, jwt_config, interval: float = 5.0, timeout: float = 2.0,
+                 saturation_checks: int = 3):
+        self.db_config = db_config
+        self.jwt_config = jwt_config
+        self.interval = interval
+        self.timeout = timeout
+        self.saturation_checks = saturation_checks
+        self.ready = False
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        self.checked_at: Optional[float] = None
+        self._saturated_runs = 0
+
+    async def run(self):
+        """Check forever; cancelled on shutdown"""
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                error("[Readiness]", "Error evaluando readiness", {"error": str(e)})
+                self.ready = False
+            await asyncio.sleep(self.interval)
+
+    async def check(self) -> bool:
+        """Run every check once and publish the result"""
+        checks = {
+            "publicKey": _check(self.jwt_config.is_loaded),
+            "pool": self._check_pool(),
+            "database": await self._check_database()
+        }
+        ready = all(check["status"] == "UP" for check in checks.values())
+
+        if ready != self.ready:
+            if ready:
+                info("[Readiness]", "Servicio listo para recibir tráfico")
+            else:
+                warn("[Readiness]", "Servicio no listo", {
+                    "failing": [name for name, check in checks.items() if check["status"] != "UP"]
+                })
+
+        self.checks = checks
+        self.checked_at = time.time()
+        self.ready = ready
+        return ready
+
+    def _check_pool(self) -> Dict[str, Any]:
+        if not self.db_config.is_ready:
+            self._saturated_runs = 0
+            return _check(False, reason="not initialized")
+
+        stats = self.db_config.pool_stats()
+        in_use, max_size = stats.get("inUse", 0), stats.get("maxSize", 0)
+        self._saturated_runs = self._saturated_runs + 1 if max_size and in_use >= max_size else 0
+        return _check(self._saturated_runs < self.saturation_checks, inUse=in_use, maxSize=max_size)
+
+    async def _check_database(self) -> Dict[str, Any]:
+        if not self.db_config.is_ready:
+            return _check(False, reason="pool not initialized")
+
+        start = time.perf_counter()
+        try:
+            await self.db_config.ping(self.timeout)
+        except Exception as e:
+            return _check(False, error=str(e) or type(e).__name__)
+        return _check(True, latencyMs=round((time.perf_counter() - start) * 1000, 3))
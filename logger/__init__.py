@@ -1,4 +1,3 @@
-from .logger import info, debug, warn, error
-
-__all__ = ["info", "debug", "warn", "error"]
+from .logger import info, debug, warn, error, flush, shutdown, set_level, is_enabled
 
+__all__ = ["info", "debug", "warn", "error", "flush", "shutdown", "set_level", "is_enabled"]
@@ -1,37 +1,102 @@
-import json
+import atexit
 import os
+import time
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Union
+from serialization.json_backend import dumps
+from .writer import AsyncLogWriter
 
 
-def log(level: str, logger: str, message: str, meta: Optional[Dict[str, Any]] = None):
-    """Log function that outputs JSON formatted logs"""
+LEVELS = {"debug": 10, "info": 20, "warn": 30, "error": 40}
+
+# Metadata may be passed as a zero-argument callable, evaluated only if the line is emitted
+Meta = Optional[Union[Dict[str, Any], Callable[[], Dict[str, Any]]]]
+
+_min_level = LEVELS.get(os.getenv("LOG_LEVEL", "debug").lower(), LEVELS["debug"])
+
+
+def set_level(level: str):
+    """Change the minimum level that is emitted"""
+    global _min_level
+    if level.lower() not in LEVELS:
+        raise ValueError(f"Invalid log level: {level}")
+    _min_level = LEVELS[level.lower()]
+
+
+def is_enabled(level: str) -> bool:
+    """Whether lines at this level are emitted; use to guard expensive log-only work"""
+    return LEVELS[level] >= _min_level
+
+
+def format_record(timestamp: float, level: str, logger: str, message: str,
+                  meta: Optional[Dict[str, Any]] = None) -> str:
+    """Render one log record as a JSON line"""
     if meta is None:
         meta = {}
     
     payload = {
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "timestamp": datetime.utcfromtimestamp(timestamp).isoformat() + "Z",
         "level": level,
         "logger": logger,
         "message": message,
         "thread": str(os.getpid()),
         **meta
     }
-    print(json.dumps(payload))
+    return dumps(payload)
+
+
+# LOG_ASYNC=true moves formatting and writing to a background thread
+_writer: Optional[AsyncLogWriter] = None
+if os.getenv("LOG_ASYNC", "false").lower() == "true":
+    _writer = AsyncLogWriter(
+        format_record,
+        max_queue=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+        batch_size=int(os.getenv("LOG_BATCH_SIZE", "256")),
+        policy=os.getenv("LOG_QUEUE_POLICY", "drop").lower()
+    )
+    atexit.register(_writer.close)
+    os.register_at_fork(after_in_child=_writer.reset_after_fork)
+
+
+def log(level: str, logger: str, message: str, meta: Meta = None):
+    """Log function that outputs JSON formatted logs"""
+    if LEVELS[level] < _min_level:
+        return
+    if callable(meta):
+        meta = meta()
+    if _writer is not None:
+        _writer.submit((time.time(), level, logger, message, meta))
+        return
+    print(format_record(time.time(), level, logger, message, meta))
+
+
+def flush():
+    """Wait until queued log lines have been written"""
+    if _writer is not None:
+        _writer.flush()
+
 
+def shutdown():
+    """Flush queued log lines and stop the background writer"""
+    if _writer is not None:
+        _writer.close()
 
-def info(logger: str, message: str, meta: Optional[Dict[str, Any]] = None):
-    log("info", logger, message, meta)
 
+def info(logger: str, message: str, meta: Meta = None):
+    if _min_level <= 20:
+        log("info", logger, message, meta)
 
-def debug(logger: str, message: str, meta: Optional[Dict[str, Any]] = None):
-    log("debug", logger, message, meta)
 
+def debug(logger: str, message: str, meta: Meta = None):
+    if _min_level <= 10:
+        log("debug", logger, message, meta)
 
-def warn(logger: str, message: str, meta: Optional[Dict[str, Any]] = None):
-    log("warn", logger, message, meta)
 
+def warn(logger: str, message: str, meta: Meta = None):
+    if _min_level <= 30:
+        log("warn", logger, message, meta)
 
-def error(logger: str, message: str, meta: Optional[Dict[str, Any]] = None):
-    log("error", logger, message, meta)
 
+def error(logger: str, message: str, meta: Meta = None):
+    if _min_level <= 40:
+        log("error", logger, message, meta)
@@ -0,0 +1,123 @@
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+_STOP = object()
+
+
+class AsyncLogWriter:
+    """Background thread that formats queued log records and writes them in batches.
+
+    The queue is bounded. With the "drop" policy a full queue discards new
+    records (and reports how many were lost); with "block" the caller waits
+    for room.
+    """
+
+    def __init__(
+        self,
+        formatter: Callable[..., str],
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+        policy: str = "drop"
+    ):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Invalid log queue policy: {policy}")
+
+        self.formatter = formatter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        """Start (or restart after a fork) the writer thread"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def reset_after_fork(self):
+        """Replace locks and queue inherited from the parent process, then restart"""
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.start()
+
+    def submit(self, record: Tuple[Any, ...]):
+        """Queue a record for the writer thread"""
+        if self.policy == "block":
+            self._queue.put(record)
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Block until every queued record has been written"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """Flush pending records and stop the writer thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(record is _STOP for record in batch)
+            self._write([record for record in batch if record is not _STOP])
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, records):
+        lines = []
+        dropped = self.dropped - self._reported_dropped
+        if dropped:
+            self._reported_dropped += dropped
+            lines.append(self.formatter(
+                time.time(), "warn", "[Logger]", "Registros de log descartados por cola llena",
+                {"dropped": dropped}
+            ))
+
+        for record in records:
+            try:
+                lines.append(self.formatter(*record))
+            except Exception as e:
+                lines.append(self.formatter(
+                    record[0], "error", "[Logger]", "Registro de log no serializable", {"error": str(e)}
+                ))
+
+        if not lines:
+            return
+        try:
+            stream = sys.stdout
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except Exception:
+            pass
@@ -1,17 +1,91 @@
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Response
+from serialization.responses import FastJSONResponse
+from config.database import db_config, AsyncDatabaseConfig, split_connections
+from config.jwt_config import jwt_config
+from config.compression_config import compression_config
+from cache import LRUCache
+from middleware.compression import CompressionMiddleware
+from middleware.metrics import MetricsMiddleware
+from middleware.server_timing import ServerTimingMiddleware
+from middleware.read_your_writes import ReadYourWritesMiddleware
+from config.api_config import api_config
+from health import ReadinessMonitor
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as METRICS_REGISTRY
 from routes.profile_routes import router as profile_router
-from logger.logger import info, error
+from logger.logger import info, warn, error, shutdown as shutdown_logger
 from datetime import datetime
 import os
 import time
 
+
+readiness = ReadinessMonitor(
+    db_config,
+    jwt_config,
+    interval=api_config.readiness_interval,
+    timeout=api_config.readiness_timeout,
+    saturation_checks=api_config.readiness_saturation_checks
+)
+
+
+async def initialize():
+    """Load the JWT public key and open the database pool (retrying until it is up)"""
+    try:
+        jwt_config.load()
+    except Exception as e:
+        error("[Main]", "Error cargando la clave pública", {"error": str(e)})
+    await db_config.connect()
+    # Report ready now instead of at the next periodic check
+    await readiness.check()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize in the background so liveness is served at once; close pools on shutdown"""
+    tasks = [asyncio.create_task(initialize()), asyncio.create_task(readiness.run())]
+    if db_config.replicas.replicas:
+        tasks.append(asyncio.create_task(db_config.replicas.run()))
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    if isinstance(db_config, AsyncDatabaseConfig):
+        await db_config.close_all_connections()
+    else:
+        db_config.close_all_connections()
+    shutdown_logger()
+
+
 app = FastAPI(
     title="Servicio de Perfil de Usuario",
     description="Microservicio para gestionar perfiles de usuario",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+if compression_config.enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=compression_config.minimum_size,
+        encodings=compression_config.encodings,
+        gzip_level=compression_config.gzip_level,
+        brotli_quality=compression_config.brotli_quality,
+        cache=LRUCache(compression_config.cache_size, compression_config.cache_ttl)
+        if compression_config.cache_size > 0 else None
+    )
+
+if db_config.replicas.replicas:
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=db_config.replicas.sticky_seconds)
+
+if api_config.server_timing:
+    app.add_middleware(ServerTimingMiddleware)
+
+# Added last so it wraps everything, compression included
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(profile_router)
 
@@ -40,6 +114,7 @@ def health_check():
     """Health check endpoint con formato estándar"""
     uptime_seconds = time.time() - START_TIME
     start_time_iso = datetime.fromtimestamp(START_TIME).isoformat() + "Z"
+    ready = readiness.ready
     
     return {
         "status": "UP",
@@ -47,10 +122,10 @@ def health_check():
             {
                 "data": {
                     "from": start_time_iso,
-                    "status": "READY"
+                    "status": "READY" if ready else "NOT_READY"
                 },
                 "name": "Readiness check",
-                "status": "UP"
+                "status": "UP" if ready else "DOWN"
             },
             {
                 "data": {
@@ -68,14 +143,21 @@ def health_check():
 
 @app.get("/health/ready")
 def health_ready():
-    """Readiness check endpoint"""
+    """Readiness check endpoint: last background check result, 503 when not ready"""
     uptime_seconds = time.time() - START_TIME
-    return {
-        "status": "READY",
-        "version": VERSION,
-        "uptime": format_uptime(uptime_seconds),
-        "uptimeSeconds": int(uptime_seconds)
-    }
+    ready = readiness.ready
+    checked_at = readiness.checked_at
+    return FastJSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "READY" if ready else "NOT_READY",
+            "checks": readiness.checks,
+            "checkedAt": datetime.utcfromtimestamp(checked_at).isoformat() + "Z" if checked_at else None,
+            "version": VERSION,
+            "uptime": format_uptime(uptime_seconds),
+            "uptimeSeconds": int(uptime_seconds)
+        }
+    )
 
 @app.get("/health/live")
 def health_live():
@@ -89,6 +171,12 @@ def health_live():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(METRICS_REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.exception_handler(Exception)
 def global_exception_handler(request, exc):
     """Global exception handler"""
@@ -96,7 +184,7 @@ def global_exception_handler(request, exc):
         "path": str(request.url),
         "error": str(exc)
     })
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
         content={
             "success": False,
@@ -108,7 +196,24 @@ def global_exception_handler(request, exc):
 
 if __name__ == "__main__":
     import uvicorn
-    port = int(os.getenv("PORT", "8087"))
-    info("[Main]", "Iniciando servicio de perfil", {"port": port})
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    from config.server_config import server_config
+    
+    options = server_config.uvicorn_options()
+    # Workers read it to size their share of DB_MAX_CONNECTIONS_TOTAL
+    os.environ["WEB_CONCURRENCY"] = str(server_config.workers)
+    per_worker = split_connections(db_config.pool_max_size, db_config.max_connections_total, server_config.workers)
+    if per_worker * server_config.workers > db_config.max_connections_total:
+        warn("[Main]", "Más workers que conexiones disponibles: cada worker usará 1", {
+            "workers": server_config.workers,
+            "maxConnectionsTotal": db_config.max_connections_total
+        })
+    info("[Main]", "Iniciando servicio de perfil", {
+        "port": server_config.port,
+        "workers": server_config.workers,
+        "loop": server_config.loop,
+        "http": server_config.http,
+        "dbConnectionsPerWorker": per_worker
+    })
+    # Several workers need an import string; a single one serves this module's app
+    uvicorn.run("main:app" if server_config.workers > 1 else app, **options)
 
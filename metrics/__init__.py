@@ -0,0 +1,4 @@
+from .registry import CONTENT_TYPE, Counter, Gauge, Histogram, Registry
+from .instruments import REGISTRY, observe_query
+
+__all__ = ["CONTENT_TYPE", "Counter", "Gauge", "Histogram", "Registry", "REGISTRY", "observe_query"]
@@ -0,0 +1,117 @@
+import functools
+import inspect
+import time
+from metrics.registry import Registry
+from metrics.timing import record
+
+REGISTRY = Registry()
+
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by method, route template and status",
+    ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method, route template and status",
+    ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+)
+HTTP_REQUEST_ERRORS = REGISTRY.counter(
+    "http_request_errors_total", "HTTP requests that ended in a 5xx or an unhandled exception",
+    ("method", "route")
+)
+JWT_VERIFICATION_DURATION = REGISTRY.histogram(
+    "jwt_verification_seconds", "JWT verification time by token cache result",
+    ("cache",), FAST_BUCKETS
+)
+JWT_VERIFICATION_ERRORS = REGISTRY.counter(
+    "jwt_verification_errors_total", "Rejected JWTs"
+)
+JWT_CACHE_ENTRIES = REGISTRY.gauge(
+    "jwt_cache_entries", "Verified tokens held in the token cache"
+)
+JWT_CACHE_LOOKUPS = REGISTRY.gauge(
+    "jwt_cache_lookups", "Token cache lookups since startup by result", ("result",)
+)
+DB_POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection",
+    (), FAST_BUCKETS + (0.25, 0.5, 1.0, 2.5, 5.0)
+)
+DB_POOL_CONNECTIONS = REGISTRY.gauge(
+    "db_pool_connections", "Pooled database connections by state", ("state",)
+)
+DB_POOL_EXHAUSTED = REGISTRY.counter(
+    "db_pool_exhausted_total", "Checkouts that found every pooled connection in use"
+)
+DB_POOL_TIMEOUTS = REGISTRY.counter(
+    "db_pool_timeouts_total", "Checkouts that gave up waiting for a pooled connection"
+)
+DB_QUERY_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds", "Repository method latency", ("method",), FAST_BUCKETS + (0.25, 0.5, 1.0, 2.5)
+)
+DB_QUERY_ERRORS = REGISTRY.counter(
+    "db_query_errors_total", "Repository methods that raised", ("method",)
+)
+DB_READS = REGISTRY.counter(
+    "db_reads_total", "Repository reads by the server they were routed to", ("target",)
+)
+DB_REPLICA_LAG = REGISTRY.gauge(
+    "db_replica_lag_seconds", "Replication lag measured on each read replica", ("replica",)
+)
+DB_COALESCED_READS = REGISTRY.counter(
+    "db_coalesced_reads_total", "Reads that joined an identical in-flight query instead of running their own",
+    ("method",)
+)
+DB_COALESCE_TIMEOUTS = REGISTRY.counter(
+    "db_coalesce_timeouts_total", "Reads that gave up waiting for the shared query", ("method",)
+)
+PROFILE_CACHE_ENTRIES = REGISTRY.gauge(
+    "profile_cache_entries", "Entries in the in-process profile cache"
+)
+PROFILE_CACHE_HIT_RATIO = REGISTRY.gauge(
+    "profile_cache_hit_ratio", "Share of profile cache lookups served from each tier", ("tier",)
+)
+
+
+def observe_query(method: str):
+    """Record latency and errors of a repository method, sync or async.
+
+    The time also counts towards the request's "db" phase (pool wait included).
+    """
+    duration = DB_QUERY_DURATION.labels(method)
+    errors = DB_QUERY_ERRORS.labels(method)
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception:
+                    errors.inc()
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - start
+                    duration.observe(elapsed)
+                    record("db", elapsed)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                duration.observe(elapsed)
+                record("db", elapsed)
+        return wrapper
+
+    return decorator
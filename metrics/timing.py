@@ -0,0 +1,47 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Phase durations (seconds) of the current request; None when timing is off
+_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_phases", default=None)
+
+
+def start_request(phases: Dict[str, float]):
+    """Collect phases of the current request into phases; returns a token for end_request"""
+    return _phases.set(phases)
+
+
+def end_request(token):
+    _phases.reset(token)
+
+
+def record(name: str, seconds: float):
+    """Add time to a phase of the current request (no-op outside a timed request)"""
+    phases = _phases.get()
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+class phase:
+    """Context manager timing a block into a request phase"""
+
+    __slots__ = ("name", "start", "phases")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.phases = _phases.get()
+        if self.phases is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.phases is not None:
+            self.phases[self.name] = self.phases.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+def server_timing_header(phases: Dict[str, float]) -> str:
+    """Server-Timing value with durations in milliseconds"""
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in phases.items())
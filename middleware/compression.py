@@ -0,0 +1,202 @@
+import gzip
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from cache import LRUCache
+from middleware.etag import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+
+def supported_encodings(encodings: Iterable[str]) -> Tuple[str, ...]:
+    """Configured encodings this process can actually produce"""
+    return tuple(e for e in encodings if e == "gzip" or (e == "br" and brotli is not None))
+
+
+def negotiate(accept_encoding: str, encodings: Tuple[str, ...]) -> Optional[str]:
+    """Pick the first encoding in server preference order the client accepts (q > 0)"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+
+    for encoding in encodings:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing response bodies with a negotiated encoding.
+
+    Bodies under ``minimum_size``, non-text content types, already encoded
+    responses and 204/304 are passed through untouched. When ``cache`` is set,
+    compressed bytes of GET 200 responses carrying an ETag are cached per URL,
+    ETag and encoding, so a hot profile is compressed once per version.
+    Compressed responses get their own strong ETag (see encoded_etag).
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        encodings: Iterable[str] = ("br", "gzip"),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        cache: Optional[LRUCache] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = supported_encodings(encodings)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, scope, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """Compress a complete body"""
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def compressor(self, encoding: str):
+        """Incremental compressor for streamed bodies"""
+        if encoding == "br":
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, scope, encoding: str, send):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self._send = send
+        self.start_message = None
+        self.stream = None
+        self.passthrough = False
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                message["status"] in (204, 304)
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            await self._start(start, message)
+            return
+
+        if self.stream is None:
+            await self._send(message)
+            return
+
+        body = self.stream.compress(message.get("body", b""))
+        more_body = message.get("more_body", False)
+        if not more_body:
+            body += self.stream.flush()
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def _start(self, start, message):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=start["headers"])
+
+        if self.passthrough or (not more_body and len(body) < self.middleware.minimum_size):
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # A strong validator must change with the content-coding
+        etag = headers.get("etag")
+        if etag is not None:
+            headers["ETag"] = encoded_etag(etag, self.encoding)
+
+        if more_body:
+            # Streaming response: compress chunk by chunk, length unknown up front
+            del headers["Content-Length"]
+            self.stream = self.middleware.compressor(self.encoding)
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": self.stream.compress(body), "more_body": True})
+            return
+
+        compressed = self._cached_compress(start, headers, body)
+        headers["Content-Length"] = str(len(compressed))
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    def _cached_compress(self, start, headers: MutableHeaders, body: bytes) -> bytes:
+        cache = self.middleware.cache
+        etag = headers.get("etag")
+        if cache is None or etag is None or start["status"] != 200 or self.scope["method"] != "GET":
+            return self.middleware.compress(body, self.encoding)
+
+        # A strong ETag identifies the exact body for this URL
+        key = (self.scope["path"], self.scope.get("query_string", b""), etag, self.encoding)
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = self.middleware.compress(body, self.encoding)
+            cache.set(key, compressed)
+        return compressed
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
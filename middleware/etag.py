@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+# updated_at is a TIMESTAMP (microsecond precision, no time zone): the tag round-trips exactly
+ETAG_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+# Content-codings CompressionMiddleware appends to a strong tag; not hex, so never a variant
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def profile_etag(profile_id: int, updated_at: datetime, variant: Optional[str] = None) -> str:
+    """Strong ETag for a profile version; variant tells partial representations apart"""
+    tag = f"{profile_id}-{updated_at.strftime(ETAG_TIME_FORMAT)}"
+    return f'"{tag}-{variant}"' if variant else f'"{tag}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Strong ETag of a content-coded body: the identity tag with the coding appended"""
+    if etag.startswith("W/") or len(etag) < 2 or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _identity_tag(tag: str) -> str:
+    """Opaque tag without W/ nor a content-coding suffix (weak comparison)"""
+    tag = tag[2:] if tag.startswith("W/") else tag
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(f'{suffix}"'):
+            return f'{tag[:-len(suffix) - 1]}"'
+    return tag
+
+
+def parse_etag(etag: str) -> Optional[Tuple[int, datetime]]:
+    """(id, updated_at) encoded in a strong profile ETag, None for weak or foreign tags.
+
+    Tags of partial or compressed representations carry the same version and
+    parse alike.
+    """
+    etag = etag.strip()
+    if etag.startswith("W/") or len(etag) < 2 or etag[0] != '"' or etag[-1] != '"':
+        return None
+    profile_id, _, version = etag[1:-1].partition("-")
+    version = version.partition("-")[0]
+    try:
+        return int(profile_id), datetime.strptime(version, ETAG_TIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def _tags(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def none_match(header: str, etag: str) -> bool:
+    """Whether If-None-Match matches etag (weak comparison), i.e. a 304 applies.
+
+    A tag of the same representation in another content-coding matches too.
+    """
+    opaque = _identity_tag(etag)
+    for tag in _tags(header):
+        if tag == "*" or _identity_tag(tag) == opaque:
+            return True
+    return False
+
+
+def if_match_versions(header: str) -> Optional[List[Tuple[int, datetime]]]:
+    """(id, updated_at) versions accepted by an If-Match header; None for "*" (any version).
+
+    An empty list means no tag can match and the write must fail with 412.
+    Writes match the pair, so a tag of another profile never passes.
+    """
+    versions = []
+    for tag in _tags(header):
+        if tag == "*":
+            return None
+        parsed = parse_etag(tag)
+        if parsed is not None:
+            versions.append(parsed)
+    return versions
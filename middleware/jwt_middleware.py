@@ -1,33 +1,102 @@
+import time
+from typing import Any, Dict, Set
 from fastapi import HTTPException, Security, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from config.jwt_config import jwt_config
+from middleware.token_cache import TokenCache
+from metrics.instruments import (
+    JWT_CACHE_ENTRIES,
+    JWT_CACHE_LOOKUPS,
+    JWT_VERIFICATION_DURATION,
+    JWT_VERIFICATION_ERRORS,
+)
+from metrics.timing import record
 from logger.logger import error, warn
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
 
 
 security = HTTPBearer()
+token_cache = TokenCache(max_size=jwt_config.cache_size, default_ttl=jwt_config.cache_ttl)
+
+_cache_hit_duration = JWT_VERIFICATION_DURATION.labels("hit")
+_cache_miss_duration = JWT_VERIFICATION_DURATION.labels("miss")
+
+
+def _token_cache_entries():
+    return {(): len(token_cache)}
+
+
+def _token_cache_lookups():
+    return {("hit",): token_cache.hits, ("miss",): token_cache.misses}
+
+
+JWT_CACHE_ENTRIES.set_function(_token_cache_entries)
+JWT_CACHE_LOOKUPS.set_function(_token_cache_lookups)
 
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
     """Verify JWT token and extract user information"""
-    token = credentials.credentials
+    token_data = _verified(credentials.credentials)
+    if not token_data["user_id"]:
+        JWT_VERIFICATION_ERRORS.inc()
+        warn("[JWT Middleware]", "Token sin userId", {})
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token inválido: falta userId"
+        )
+    return token_data
+
+
+def require_scope(scope: str):
+    """Dependency for service endpoints: any verified token carrying scope, userId or not"""
+    def verify_scoped_token(credentials: HTTPAuthorizationCredentials = Security(security)):
+        token_data = _verified(credentials.credentials)
+        if not has_scope(token_data, scope):
+            warn("[JWT Middleware]", "Token sin el scope requerido", {
+                "tokenUserId": token_data["user_id"],
+                "scope": scope
+            })
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="El token no tiene el scope requerido"
+            )
+        return token_data
+    return verify_scoped_token
+
+
+def _verified(token: str) -> Dict[str, Any]:
+    """Claims of a token with a valid signature, expiry and issuer, from the cache when possible"""
+    start = time.perf_counter()
+    
+    # Skip the RSA signature check for tokens we already verified
+    cache_key = None
+    if token_cache.enabled:
+        cache_key = TokenCache.digest(token)
+        cached = token_cache.get(cache_key)
+        if cached is not None:
+            elapsed = time.perf_counter() - start
+            _cache_hit_duration.observe(elapsed)
+            record("auth", elapsed)
+            return cached
     
     try:
-        # Get the public key
-        public_key = jwt_config.get_public_key()
-        
-        # Convert to PEM format for jose (python-jose expects PEM string)
-        public_key_pem = public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        ).decode('utf-8')
-        
-        # Verify and decode token
+        return _decode(token, cache_key)
+    except HTTPException:
+        JWT_VERIFICATION_ERRORS.inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _cache_miss_duration.observe(elapsed)
+        record("auth", elapsed)
+
+
+def _decode(token: str, cache_key):
+    """Check signature, expiry and issuer, then cache the claims"""
+    try:
+        # Verify and decode token with the key prepared at startup
         payload = jwt.decode(
             token,
-            public_key_pem,
+            jwt_config.get_verifier(),
             algorithms=["RS256"],
             options={"verify_signature": True, "verify_exp": True}
         )
@@ -41,21 +110,18 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Security(security))
                 detail="Token issuer inválido"
             )
         
-        # Extract user_id from claims
-        user_id = payload.get("userId")
-        if not user_id:
-            warn("[JWT Middleware]", "Token sin userId", {})
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Token inválido: falta userId"
-            )
-        
-        return {
-            "user_id": user_id,
+        # Service tokens (client credentials) carry no userId; verify_token rejects them
+        token_data = {
+            "user_id": payload.get("userId"),
             "email": payload.get("sub"),
             "claims": payload
         }
         
+        if cache_key is not None:
+            token_cache.put(cache_key, token_data, payload.get("exp"))
+        
+        return token_data
+        
     except JWTError as e:
         error("[JWT Middleware]", "Error validando token", {"error": str(e)})
         raise HTTPException(
@@ -71,3 +137,20 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Security(security))
             detail="Error interno validando token"
         )
 
+
+def token_scopes(token_data: Dict[str, Any]) -> Set[str]:
+    """Scopes granted to a verified token (space-separated "scope" or list "scopes" claim)"""
+    claims = token_data.get("claims", {})
+    scopes = set()
+    scope = claims.get("scope")
+    if isinstance(scope, str):
+        scopes.update(scope.split())
+    listed = claims.get("scopes")
+    if isinstance(listed, (list, tuple)):
+        scopes.update(str(item) for item in listed)
+    return scopes
+
+
+def has_scope(token_data: Dict[str, Any], scope: str) -> bool:
+    """Whether a verified token carries the given scope"""
+    return scope in token_scopes(token_data)
@@ -0,0 +1,49 @@
+import time
+from metrics.instruments import (
+    HTTP_REQUESTS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_REQUEST_ERRORS,
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency, in-flight requests and errors.
+
+    Series are labelled with the route template (``/api/v1/profiles/{user_id}``),
+    not the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, template, status).inc()
+            HTTP_REQUEST_DURATION.labels(method, template, status).observe(time.perf_counter() - start)
+            if status >= 500:
+                HTTP_REQUEST_ERRORS.labels(method, template).inc()
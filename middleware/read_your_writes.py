@@ -0,0 +1,51 @@
+import math
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.requests import cookie_parser
+from config.replicas import start_request, end_request
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware carrying read-your-writes across workers in a cookie.
+
+    A response to a request that committed a write sets a cookie holding the
+    time until which the client reads from the primary; requests bringing a
+    cookie that has not run out send all their reads there, whichever worker
+    serves them. Only installed when read replicas are configured.
+    """
+
+    def __init__(self, app, sticky_seconds: float, cookie: str = "last_write"):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+        self.cookie = cookie
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state, token = start_request(self._primary_until(scope) > time.time())
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and state["wrote"]:
+                until = time.time() + self.sticky_seconds
+                MutableHeaders(raw=message["headers"]).append(
+                    "Set-Cookie",
+                    f"{self.cookie}={until:.3f}; Max-Age={math.ceil(self.sticky_seconds)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_request(token)
+
+    def _primary_until(self, scope) -> float:
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                try:
+                    return float(cookie_parser(value.decode("latin-1")).get(self.cookie, 0))
+                except ValueError:
+                    return 0.0
+        return 0.0
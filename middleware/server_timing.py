@@ -0,0 +1,48 @@
+import time
+from starlette.datastructures import MutableHeaders
+from metrics.timing import start_request, end_request, server_timing_header
+from logger.logger import info
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware reporting per-request phases (auth, db_wait, db, serialize, total).
+
+    Phases go out in a Server-Timing header and on one access log line per
+    request. Only installed when SERVER_TIMING_ENABLED=true; otherwise every
+    recording point is a single ContextVar lookup.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        phases = {}
+        token = start_request(phases)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                phases["total"] = time.perf_counter() - start
+                MutableHeaders(raw=message["headers"]).append("Server-Timing", server_timing_header(phases))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_request(token)
+            phases.setdefault("total", time.perf_counter() - start)
+            route = scope.get("route")
+            info("[HTTP]", "Petición atendida", lambda: {
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": status,
+                "timingMs": {name: round(seconds * 1000, 3) for name, seconds in phases.items()}
+            })
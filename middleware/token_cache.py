@@ -0,0 +1,29 @@
+import hashlib
+import time
+from typing import Any, Dict, Optional
+from cache import LRUCache
+
+
+class TokenCache(LRUCache):
+    """Bounded LRU cache of verified JWT claims keyed by token digest"""
+
+    def __init__(self, max_size: int = 1024, default_ttl: float = 300.0):
+        super().__init__(max_size, default_ttl)
+
+    @property
+    def default_ttl(self) -> float:
+        return self.ttl
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        """Hash the raw token so the cache never holds bearer credentials"""
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def put(self, key: bytes, value: Dict[str, Any], expires_at: Optional[float] = None):
+        """Store verified claims until the token's own expiration (a Unix time)"""
+        if expires_at is None:
+            self.set(key, value)
+            return
+        ttl = expires_at - time.time()
+        if ttl > 0:
+            self.set(key, value, ttl)
@@ -1,4 +1,5 @@
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Mapping
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -14,6 +15,13 @@ class ProfileUpdate(BaseModel):
     social_links: Optional[Dict[str, str]] = Field(None, description="Links de redes sociales")
 
 
+class ProfilePatch(ProfileUpdate):
+    social_links: Optional[Dict[str, Optional[str]]] = Field(
+        None,
+        description="Links a combinar con los actuales; una clave con null se elimina"
+    )
+
+
 class ProfileResponse(BaseModel):
     id: int
     user_id: int
@@ -32,6 +40,67 @@ class ProfileResponse(BaseModel):
         from_attributes = True
 
 
+@dataclass(slots=True)
+class ProfileRow:
+    """Trusted profile read from the database, with the ProfileResponse fields.
+
+    Built without validation and encoded directly by the JSON backend, so a
+    response costs one small object and one serialization pass.
+    """
+    id: int
+    user_id: int
+    personal_url: Optional[str]
+    nickname: Optional[str]
+    is_contact_public: bool
+    mailing_address: Optional[str]
+    biography: Optional[str]
+    organization: Optional[str]
+    country: Optional[str]
+    social_links: Dict[str, str]
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_profile(cls, profile: Mapping[str, Any]) -> "ProfileRow":
+        """Wrap a repository profile dict without revalidating it"""
+        return cls(**profile)
+
+
+class ProfileBatchRequest(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1, description="user_ids a consultar, en orden")
+
+
+class ProfileBatchItem(BaseModel):
+    user_id: int
+    status: str = Field(..., description="ok, not_found o forbidden")
+    profile: Optional[ProfileResponse] = None
+
+
+class ProfileBatchResponse(BaseModel):
+    results: List[ProfileBatchItem]
+
+
+class ProfileBulkUpdateItem(BaseModel):
+    user_id: int
+    profile: ProfileUpdate
+
+
+class ProfileBulkUpdateRequest(BaseModel):
+    items: List[ProfileBulkUpdateItem] = Field(..., min_length=1, description="Cambios por usuario")
+
+
+class ProfileBulkUpdateResult(BaseModel):
+    user_id: int
+    status: str = Field(..., description="updated, not_found o invalid")
+
+
+class ProfileBulkUpdateResponse(BaseModel):
+    updated: int
+    not_found: int
+    invalid: int
+    results: List[ProfileBulkUpdateResult]
+
+
 class ErrorResponse(BaseModel):
     success: bool = False
     message: str
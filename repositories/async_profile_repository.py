@@ -0,0 +1,304 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Set, Tuple
+from config.database import db_config
+from repositories.profile_repository import (
+    FIELD_TYPES,
+    PROFILE_COLUMNS,
+    projection_columns,
+    row_to_projection,
+    UPDATABLE_FIELDS,
+    ProfileNotFoundError,
+    ProfileVersionMismatchError,
+    group_updates_by_fields,
+    row_to_profile,
+    social_links_patch,
+    version_arrays,
+)
+from serialization.json_backend import dumps
+from logger.logger import info, error, debug
+from metrics.instruments import observe_query
+
+
+# Constant query text so asyncpg's per-connection statement cache reuses one prepared plan
+FIND_BY_USER_ID_QUERY = f"""
+    SELECT {PROFILE_COLUMNS}
+    FROM profiles
+    WHERE user_id = $1
+"""
+
+FIND_VERSION_QUERY = "SELECT id, updated_at FROM profiles WHERE user_id = $1"
+
+
+@lru_cache(maxsize=1024)
+def find_fields_query(fields: Tuple[str, ...]) -> Tuple[str, Tuple[str, ...]]:
+    """Query text and columns selecting a projection by user_id; one constant text per projection"""
+    columns = projection_columns(fields)
+    return f"SELECT {', '.join(columns)} FROM profiles WHERE user_id = $1", columns
+
+
+@lru_cache(maxsize=1024)
+def update_statement(
+    keys: Tuple[str, ...],
+    conditional: bool = False,
+    merge: bool = False
+) -> Tuple[str, Tuple[str, ...]]:
+    """Like profile_repository.update_statement, with $n placeholders"""
+    fields = tuple(field for field in UPDATABLE_FIELDS if field in keys)
+    if not fields:
+        raise ValueError("No fields to update")
+    assignments = []
+    n = 0
+    for field in fields:
+        n += 1
+        if field == "social_links" and merge:
+            assignments.append(f"social_links = (COALESCE(social_links, '{{}}'::jsonb) || ${n}::jsonb) - ${n + 1}::text[]")
+            n += 1
+        else:
+            assignments.append(f"{field} = ${n}")
+    assignments.append("updated_at = CURRENT_TIMESTAMP")
+    return f"""
+        UPDATE profiles
+        SET {', '.join(assignments)}
+        WHERE user_id = ${n + 1}{f" AND (id, updated_at) IN (SELECT * FROM unnest(${n + 2}::int[], ${n + 3}::timestamp[]))" if conditional else ""}
+        RETURNING {PROFILE_COLUMNS}
+    """, fields
+
+
+class AsyncProfileRepository:
+    """Repository for profile database operations on the asyncpg pool"""
+
+    @observe_query("find_by_user_id")
+    async def find_by_user_id(self, user_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+        """Find profile by user_id; with fields, select only those plus KEY_FIELDS"""
+        info("[AsyncProfileRepository]", "Buscando perfil por user_id", {"userId": user_id})
+
+        conn = None
+        try:
+            conn = await db_config.get_connection(read_for=(user_id,))
+
+            if fields is None:
+                row = await conn.fetchrow(FIND_BY_USER_ID_QUERY, user_id)
+            else:
+                query, columns = find_fields_query(fields)
+                row = await conn.fetchrow(query, user_id)
+
+            if not row:
+                debug("[AsyncProfileRepository]", "Perfil no encontrado", {"userId": user_id})
+                return None
+
+            profile = row_to_profile(row) if fields is None else row_to_projection(row, columns)
+
+            info("[AsyncProfileRepository]", "Perfil encontrado", lambda: {
+                "userId": user_id,
+                "profileId": profile["id"]
+            })
+
+            return profile
+
+        except Exception as e:
+            error("[AsyncProfileRepository]", "Error buscando perfil", {
+                "userId": user_id,
+                "error": str(e)
+            })
+            raise
+        finally:
+            if conn:
+                await db_config.return_connection(conn)
+
+    @observe_query("find_version")
+    async def find_version(self, user_id: int) -> Optional[Tuple[int, datetime]]:
+        """(id, updated_at) of a profile without fetching the full row"""
+        conn = None
+        try:
+            conn = await db_config.get_connection(read_for=(user_id,))
+            row = await conn.fetchrow(FIND_VERSION_QUERY, user_id)
+            return (row[0], row[1]) if row else None
+
+        except Exception as e:
+            error("[AsyncProfileRepository]", "Error buscando versión del perfil", {
+                "userId": user_id,
+                "error": str(e)
+            })
+            raise
+        finally:
+            if conn:
+                await db_config.return_connection(conn)
+
+    @observe_query("find_by_user_ids")
+    async def find_by_user_ids(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Find several profiles in one query, keyed by user_id"""
+        info("[AsyncProfileRepository]", "Buscando perfiles por user_ids", {"count": len(user_ids)})
+
+        conn = None
+        try:
+            conn = await db_config.get_connection(read_for=user_ids)
+
+            query = f"""
+                SELECT {PROFILE_COLUMNS}
+                FROM profiles
+                WHERE user_id = ANY($1::int[])
+            """
+            profiles = {}
+            for row in await conn.fetch(query, list(user_ids)):
+                profile = row_to_profile(row)
+                profiles[profile["user_id"]] = profile
+
+            debug("[AsyncProfileRepository]", "Perfiles encontrados", {
+                "requested": len(user_ids),
+                "found": len(profiles)
+            })
+
+            return profiles
+
+        except Exception as e:
+            error("[AsyncProfileRepository]", "Error buscando perfiles", {
+                "count": len(user_ids),
+                "error": str(e)
+            })
+            raise
+        finally:
+            if conn:
+                await db_config.return_connection(conn)
+
+    @observe_query("update")
+    async def update(
+        self,
+        user_id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[Tuple[int, datetime]]] = None
+    ) -> Dict[str, Any]:
+        """Update profile for a user, optionally only if its (id, updated_at) is one of expected_versions"""
+        return await self._write(user_id, update_data, expected_versions, merge=False)
+
+    @observe_query("patch")
+    async def patch(
+        self,
+        user_id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[Tuple[int, datetime]]] = None
+    ) -> Dict[str, Any]:
+        """Like update, but social_links is a merge patch applied in the database (null removes a key)"""
+        return await self._write(user_id, update_data, expected_versions, merge=True)
+
+    async def _write(
+        self,
+        user_id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[Tuple[int, datetime]]],
+        merge: bool
+    ) -> Dict[str, Any]:
+        info("[AsyncProfileRepository]", "Actualizando perfil", {"userId": user_id})
+
+        conn = None
+        try:
+            conn = await db_config.get_connection()
+
+            conditional = expected_versions is not None
+            query, fields = update_statement(tuple(update_data), conditional, merge)
+            # The jsonb codec encodes social_links
+            values = []
+            for field in fields:
+                if field == "social_links" and merge:
+                    values.extend(social_links_patch(update_data[field]))
+                else:
+                    values.append(update_data[field])
+            values.append(user_id)
+            if conditional:
+                values.extend(version_arrays(expected_versions))
+
+            # A single statement runs in its own implicit transaction
+            row = await conn.fetchrow(query, *values)
+
+            if not row:
+                if conditional and await conn.fetchrow(FIND_VERSION_QUERY, user_id):
+                    raise ProfileVersionMismatchError("Profile was modified")
+                raise ProfileNotFoundError("Profile not found")
+
+            db_config.wrote(user_id)
+            profile = row_to_profile(row)
+
+            info("[AsyncProfileRepository]", "Perfil actualizado exitosamente", lambda: {
+                "userId": user_id,
+                "profileId": profile["id"]
+            })
+
+            return profile
+
+        except Exception as e:
+            error("[AsyncProfileRepository]", "Error actualizando perfil", {
+                "userId": user_id,
+                "error": str(e)
+            })
+            raise
+        finally:
+            if conn:
+                await db_config.return_connection(conn)
+
+    @observe_query("bulk_update")
+    async def bulk_update(self, updates: Dict[int, Dict[str, Any]], batch_size: int = 500) -> Set[int]:
+        """Apply many updates in batched statements inside one transaction.
+
+        Returns the user_ids that matched a profile row.
+        """
+        info("[AsyncProfileRepository]", "Actualizando perfiles en lote", {
+            "count": len(updates),
+            "batchSize": batch_size
+        })
+
+        conn = None
+        try:
+            conn = await db_config.get_connection()
+            updated = set()
+
+            async with conn.transaction():
+                for fields, user_ids in group_updates_by_fields(updates).items():
+                    # jsonb travels as text[] and is cast per row
+                    assignments = ", ".join(
+                        f"{field} = v.{field}::jsonb" if FIELD_TYPES.get(field) == "jsonb" else f"{field} = v.{field}"
+                        for field in fields
+                    )
+                    columns = ", ".join(("user_id",) + fields)
+                    arrays = ", ".join(
+                        ["$1::int[]"] + [
+                            f"${i}::{'boolean' if FIELD_TYPES.get(field) == 'boolean' else 'text'}[]"
+                            for i, field in enumerate(fields, start=2)
+                        ]
+                    )
+                    query = f"""
+                        UPDATE profiles AS p
+                        SET {assignments}, updated_at = CURRENT_TIMESTAMP
+                        FROM unnest({arrays}) AS v({columns})
+                        WHERE p.user_id = v.user_id
+                        RETURNING p.user_id
+                    """
+
+                    for start in range(0, len(user_ids), batch_size):
+                        chunk = user_ids[start:start + batch_size]
+                        params = [chunk] + [
+                            [
+                                dumps(updates[user_id][field]) if field == "social_links" else updates[user_id][field]
+                                for user_id in chunk
+                            ]
+                            for field in fields
+                        ]
+                        for row in await conn.fetch(query, *params):
+                            updated.add(row[0])
+
+            db_config.wrote(*updated)
+            info("[AsyncProfileRepository]", "Perfiles actualizados en lote", {
+                "count": len(updates),
+                "updated": len(updated)
+            })
+
+            return updated
+
+        except Exception as e:
+            error("[AsyncProfileRepository]", "Error actualizando perfiles en lote", {
+                "count": len(updates),
+                "error": str(e)
+            })
+            raise
+        finally:
+            if conn:
+                await db_config.return_connection(conn)
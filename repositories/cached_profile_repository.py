@@ -0,0 +1,253 @@
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Set, Tuple
+from cache import LRUCache, CacheBackend
+from config.replicas import client_wrote_recently
+from repositories.dispatch import call
+from logger.logger import warn
+
+
+class CachedProfileRepository:
+    """Read-through cache in front of a profile repository.
+
+    Lookups go to the in-process LRU first, then to the optional shared
+    backend, and only then to the wrapped repository. Updates write the
+    returned row through to both tiers.
+
+    Partial profiles (``fields`` projections) never share keys with full
+    rows: they live only in the local tier, all projections of a user in one
+    entry, and are dropped whenever the user's row changes. A cached full row
+    answers any projection.
+
+    A read that misses stores its row only if no write or invalidation of
+    that user happened while it ran, so a slow read never puts back a version
+    older than the one a write just cached.
+
+    Clients within the read-your-writes window (see ReadYourWritesMiddleware)
+    skip the local tier: their write may have gone through another worker.
+    What they read is stored, refreshing this worker's copy.
+    """
+
+    KEY_PREFIX = "profile:v1:"
+    PROJECTION_KEY_PREFIX = "profile:v1:fields:"
+
+    def __init__(
+        self,
+        repository,
+        local: LRUCache,
+        shared: Optional[CacheBackend] = None,
+        shared_ttl: float = 300.0
+    ):
+        self.repository = repository
+        self.local = local
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+        # user_id -> reads in flight / writes seen while they ran; only users with reads in flight
+        self._readers: Dict[int, int] = {}
+        self._generations: Dict[int, int] = {}
+
+    def _begin_read(self, user_id: int) -> int:
+        """Register a read that may store its result; returns the user's current write generation"""
+        self._readers[user_id] = self._readers.get(user_id, 0) + 1
+        return self._generations.get(user_id, 0)
+
+    def _end_read(self, user_id: int, generation: int) -> bool:
+        """Unregister a read; whether no write happened since _begin_read returned generation"""
+        unchanged = self._generations.get(user_id, 0) == generation
+        readers = self._readers[user_id] - 1
+        if readers:
+            self._readers[user_id] = readers
+        else:
+            del self._readers[user_id]
+            self._generations.pop(user_id, None)
+        return unchanged
+
+    def _wrote(self, user_id: int):
+        """Make reads in flight for user_id skip storing their now possibly stale rows"""
+        if user_id in self._readers:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def _local_get(self, key: str):
+        if client_wrote_recently():
+            return None
+        return self.local.get(key)
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.KEY_PREFIX}{user_id}"
+
+    def _projection_key(self, user_id: int) -> str:
+        return f"{self.PROJECTION_KEY_PREFIX}{user_id}"
+
+    async def find_by_user_id(self, user_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+        """Find profile by user_id, serving from cache when possible.
+
+        With fields the result may hold more than the requested fields
+        (a cached full row), never fewer.
+        """
+        key = self._key(user_id)
+
+        profile = self._local_get(key)
+        if profile is not None:
+            return profile
+
+        if self.shared is not None:
+            profile = await self._shared_get(key)
+            if profile is not None:
+                self.local.set(key, profile)
+                return profile
+
+        if fields is not None:
+            return await self._find_projection(user_id, fields)
+
+        generation = self._begin_read(user_id)
+        try:
+            profile = await call(self.repository.find_by_user_id, user_id)
+        finally:
+            fresh = self._end_read(user_id, generation)
+        if profile is not None and fresh:
+            await self._store(key, profile)
+        return profile
+
+    async def _find_projection(self, user_id: int, fields: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        key = self._projection_key(user_id)
+        projections = self._local_get(key)
+        if projections is not None and fields in projections:
+            return projections[fields]
+
+        generation = self._begin_read(user_id)
+        try:
+            profile = await call(self.repository.find_by_user_id, user_id, fields)
+        finally:
+            fresh = self._end_read(user_id, generation)
+        if profile is not None and fresh:
+            # Re-read: other projections may have been stored meanwhile. Copy on write: readers may hold the old mapping
+            projections = self.local.get(key)
+            self.local.set(key, {**(projections or {}), fields: profile})
+        return profile
+
+    async def find_version(self, user_id: int) -> Optional[Tuple[int, datetime]]:
+        """(id, updated_at) from the local cache, or from the repository's cheap lookup"""
+        profile = self._local_get(self._key(user_id))
+        if profile is not None:
+            return profile["id"], profile["updated_at"]
+        return await call(self.repository.find_version, user_id)
+
+    async def find_by_user_ids(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Find several profiles, querying the repository only for cache misses"""
+        profiles = {}
+        missing = []
+
+        for user_id in user_ids:
+            key = self._key(user_id)
+            profile = self._local_get(key)
+            if profile is None and self.shared is not None:
+                profile = await self._shared_get(key)
+                if profile is not None:
+                    self.local.set(key, profile)
+            if profile is None:
+                missing.append(user_id)
+            else:
+                profiles[user_id] = profile
+
+        if missing:
+            generations = {user_id: self._begin_read(user_id) for user_id in missing}
+            try:
+                found = await call(self.repository.find_by_user_ids, missing)
+            finally:
+                fresh = {user_id for user_id, generation in generations.items() if self._end_read(user_id, generation)}
+            for user_id, profile in found.items():
+                if user_id in fresh:
+                    await self._store(self._key(user_id), profile)
+            profiles.update(found)
+
+        return profiles
+
+    async def update(
+        self,
+        user_id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[Tuple[int, datetime]]] = None
+    ) -> Dict[str, Any]:
+        """Update profile and write the new row through to the cache"""
+        return await self._write(self.repository.update, user_id, update_data, expected_versions)
+
+    async def patch(
+        self,
+        user_id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[Tuple[int, datetime]]] = None
+    ) -> Dict[str, Any]:
+        """Merge-patch profile and write the new row through to the cache"""
+        return await self._write(self.repository.patch, user_id, update_data, expected_versions)
+
+    async def _write(self, method, user_id: int, update_data: Dict[str, Any], expected_versions) -> Dict[str, Any]:
+        try:
+            profile = await call(method, user_id, update_data, expected_versions)
+        except Exception:
+            await self.invalidate(user_id)
+            raise
+
+        self._wrote(user_id)
+        self.local.delete(self._projection_key(user_id))
+        await self._store(self._key(user_id), profile)
+        return profile
+
+    async def bulk_update(self, updates: Dict[int, Dict[str, Any]], batch_size: int = 500) -> Set[int]:
+        """Apply a bulk update and drop every touched profile from the cache"""
+        try:
+            return await call(self.repository.bulk_update, updates, batch_size)
+        finally:
+            for user_id in updates:
+                await self.invalidate(user_id)
+    
+    async def invalidate(self, user_id: int):
+        """Drop a profile from every cache tier"""
+        self._wrote(user_id)
+        key = self._key(user_id)
+        self.local.delete(key)
+        self.local.delete(self._projection_key(user_id))
+        if self.shared is not None:
+            try:
+                await self.shared.delete(key)
+            except Exception as e:
+                self.shared_errors += 1
+                warn("[CachedProfileRepository]", "Error invalidando caché compartida", {"error": str(e)})
+
+    async def _store(self, key: str, profile: Dict[str, Any]):
+        self.local.set(key, profile)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, profile, self.shared_ttl)
+            except Exception as e:
+                self.shared_errors += 1
+                warn("[CachedProfileRepository]", "Error escribiendo caché compartida", {"error": str(e)})
+
+    async def _shared_get(self, key: str) -> Optional[Dict[str, Any]]:
+        # A failing shared cache degrades to a database read, never to an error
+        try:
+            profile = await self.shared.get(key)
+        except Exception as e:
+            self.shared_errors += 1
+            warn("[CachedProfileRepository]", "Error leyendo caché compartida", {"error": str(e)})
+            return None
+
+        if profile is None:
+            self.shared_misses += 1
+        else:
+            self.shared_hits += 1
+        return profile
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and size of each cache tier"""
+        stats = {"local": self.local.stats()}
+        if self.shared is not None:
+            lookups = self.shared_hits + self.shared_misses
+            stats["shared"] = {
+                "hits": self.shared_hits,
+                "misses": self.shared_misses,
+                "errors": self.shared_errors,
+                "hitRatio": self.shared_hits / lookups if lookups else 0.0
+            }
+        return stats
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime
+from typing import Optional, Dict, Any, Iterable, List, Set, Tuple
+from cache import SingleFlight
+from config.replicas import client_wrote_recently
+from repositories.dispatch import call
+from metrics.instruments import DB_COALESCED_READS, DB_COALESCE_TIMEOUTS
+
+
+class CoalescingProfileRepository:
+    """Single-flight reads in front of a profile repository.
+
+    Concurrent find_by_user_id calls for the same user_id (and field list)
+    share one query and all get its result or its error. Writes drop the
+    user's in-flight reads from the table, so a read that started before a
+    write is never handed to callers arriving after it. Clients within the
+    read-your-writes window never join: the lookup in flight may predate a
+    write they made through another worker.
+    """
+
+    def __init__(self, repository, flight: SingleFlight):
+        self.repository = repository
+        self.flight = flight
+        self._coalesced = DB_COALESCED_READS.labels("find_by_user_id")
+        self._timeouts = DB_COALESCE_TIMEOUTS.labels("find_by_user_id")
+
+    async def find_by_user_id(self, user_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+        """Find profile by user_id, joining an identical lookup already in flight"""
+        if fields is None:
+            query = lambda: call(self.repository.find_by_user_id, user_id)
+        else:
+            query = lambda: call(self.repository.find_by_user_id, user_id, fields)
+        if client_wrote_recently():
+            return await query()
+
+        key = (user_id, fields)
+        if key in self.flight:
+            self._coalesced.inc()
+
+        try:
+            return await self.flight.do(key, query)
+        except asyncio.TimeoutError:
+            self._timeouts.inc()
+            raise
+
+    async def find_version(self, user_id: int) -> Optional[Tuple[int, datetime]]:
+        """(id, updated_at) from the wrapped repository"""
+        return await call(self.repository.find_version, user_id)
+
+    async def find_by_user_ids(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Batch lookups go straight to the wrapped repository"""
+        return await call(self.repository.find_by_user_ids, user_ids)
+
+    async def update(
+        self,
+        user_id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[Tuple[int, datetime]]] = None
+    ) -> Dict[str, Any]:
+        """Update profile; later reads do not join lookups started before it"""
+        try:
+            return await call(self.repository.update, user_id, update_data, expected_versions)
+        finally:
+            self._forget((user_id,))
+
+    async def patch(
+        self,
+        user_id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[Tuple[int, datetime]]] = None
+    ) -> Dict[str, Any]:
+        """Merge-patch profile; later reads do not join lookups started before it"""
+        try:
+            return await call(self.repository.patch, user_id, update_data, expected_versions)
+        finally:
+            self._forget((user_id,))
+
+    async def bulk_update(self, updates: Dict[int, Dict[str, Any]], batch_size: int = 500) -> Set[int]:
+        """Bulk update; later reads of any touched profile start a fresh lookup"""
+        try:
+            return await call(self.repository.bulk_update, updates, batch_size)
+        finally:
+            self._forget(updates)
+
+    def _forget(self, user_ids: Iterable[int]):
+        user_ids = set(user_ids)
+        for key in self.flight.keys():
+            if key[0] in user_ids:
+                self.flight.forget(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookups started, lookups saved and waits that timed out"""
+        return self.flight.stats()
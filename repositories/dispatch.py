@@ -0,0 +1,9 @@
+import inspect
+from fastapi.concurrency import run_in_threadpool
+
+
+async def call(method, *args):
+    """Await async repository methods; run blocking ones in the threadpool"""
+    if inspect.iscoroutinefunction(method):
+        return await method(*args)
+    return await run_in_threadpool(method, *args)
@@ -1,51 +1,243 @@
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from datetime import datetime
+from typing import Optional, Dict, Any, Iterable, List, Set, Tuple
+from psycopg2 import extras
 from config.database import db_config
 from logger.logger import info, error, debug
-import json
+from metrics.instruments import observe_query
+from serialization.json_backend import dumps
+
+
+PROFILE_COLUMNS = """id, user_id, personal_url, nickname, is_contact_public,
+                       mailing_address, biography, organization, country,
+                       social_links, created_at, updated_at"""
+
+# Columns a client may change, in the order they appear in UPDATE statements
+UPDATABLE_FIELDS = (
+    "personal_url",
+    "nickname",
+    "is_contact_public",
+    "mailing_address",
+    "biography",
+    "organization",
+    "country",
+    "social_links",
+)
+
+
+# Fields a client may request with ?fields=, in response order
+PROFILE_FIELDS = (
+    "id",
+    "user_id",
+    "personal_url",
+    "nickname",
+    "is_contact_public",
+    "mailing_address",
+    "biography",
+    "organization",
+    "country",
+    "social_links",
+    "created_at",
+    "updated_at",
+)
+
+# Always selected by projections: the ETag and the caches need identity and version
+KEY_FIELDS = ("id", "user_id", "updated_at")
+
+# Projections stop being prepared once this many statements are registered; later ones run as plain queries
+MAX_PREPARED_STATEMENTS = 32
+
+
+# SQL types for updatable columns passed through VALUES lists / unnest arrays (default text)
+FIELD_TYPES = {
+    "is_contact_public": "boolean",
+    "social_links": "jsonb",
+}
+
+
+FIND_BY_USER_ID = "profile_find_by_user_id"
+db_config.statements.register(FIND_BY_USER_ID, f"""
+    SELECT {PROFILE_COLUMNS}
+    FROM profiles
+    WHERE user_id = %s
+""")
+
+FIND_VERSION = "profile_find_version"
+db_config.statements.register(FIND_VERSION, "SELECT id, updated_at FROM profiles WHERE user_id = %s")
+
+
+class ProfileNotFoundError(ValueError):
+    """Raised when a write matches no profile row"""
+
+
+class ProfileVersionMismatchError(ValueError):
+    """Raised when a conditional write finds the profile at a different version"""
+
+
+def row_to_profile(row) -> Dict[str, Any]:
+    """Map a row selected with PROFILE_COLUMNS to a profile dict"""
+    return {
+        "id": row[0],
+        "user_id": row[1],
+        "personal_url": row[2],
+        "nickname": row[3],
+        "is_contact_public": row[4],
+        "mailing_address": row[5],
+        "biography": row[6],
+        "organization": row[7],
+        "country": row[8],
+        "social_links": row[9] if row[9] else {},
+        "created_at": row[10],
+        "updated_at": row[11]
+    }
+
+
+def projection_mask(fields: Iterable[str]) -> int:
+    """Bitmask of fields over PROFILE_FIELDS, a compact name for a projection"""
+    mask = 0
+    for field in fields:
+        mask |= 1 << PROFILE_FIELDS.index(field)
+    return mask
+
+
+def projection_columns(fields: Iterable[str]) -> Tuple[str, ...]:
+    """Columns selected for a projection: the requested fields plus KEY_FIELDS, in PROFILE_FIELDS order"""
+    wanted = set(fields).union(KEY_FIELDS)
+    return tuple(field for field in PROFILE_FIELDS if field in wanted)
+
+
+def row_to_projection(row, columns: Tuple[str, ...]) -> Dict[str, Any]:
+    """Map a row selected with projection_columns to a partial profile dict"""
+    profile = dict(zip(columns, row))
+    if "social_links" in profile and not profile["social_links"]:
+        profile["social_links"] = {}
+    return profile
+
+
+@lru_cache(maxsize=1024)
+def find_fields_statement(fields: Tuple[str, ...]) -> Tuple[str, str, Tuple[str, ...]]:
+    """Statement name, query text and columns selecting a projection by user_id"""
+    columns = projection_columns(fields)
+    sql = f"SELECT {', '.join(columns)} FROM profiles WHERE user_id = %s"
+    return f"{FIND_BY_USER_ID}_{projection_mask(columns):x}", sql, columns
+
+
+def prepare_projection(fields: Tuple[str, ...]) -> Tuple[Optional[str], str, Tuple[str, ...]]:
+    """find_fields_statement, registered as a prepared statement while under MAX_PREPARED_STATEMENTS.
+
+    The name is None once the registry is full and the plain query must run.
+    Connections PREPARE newly registered statements on their next checkout.
+    """
+    name, sql, columns = find_fields_statement(fields)
+    if name not in db_config.statements:
+        if len(db_config.statements) >= MAX_PREPARED_STATEMENTS:
+            return None, sql, columns
+        db_config.statements.register(name, sql)
+    return name, sql, columns
+
+
+def execute_statement(cursor, conn, name: str, params: Tuple[Any, ...]):
+    """Run a registered statement, once more as plain SQL if the server lost the prepared one"""
+    try:
+        cursor.execute(db_config.statements.sql(conn, name), params)
+    except Exception as e:
+        if not db_config.statements.lost(conn, e):
+            raise
+        cursor.execute(db_config.statements.sql(conn, name), params)
+
+
+# social_links in merge mode: set the given keys with ||, then drop the removed ones with -
+MERGE_SOCIAL_LINKS = "social_links = (COALESCE(social_links, '{}'::jsonb) || %s::jsonb) - %s::text[]"
+
+
+@lru_cache(maxsize=1024)
+def update_statement(
+    keys: Tuple[str, ...],
+    conditional: bool = False,
+    merge: bool = False
+) -> Tuple[str, Tuple[str, ...]]:
+    """UPDATE ... RETURNING for the updatable columns among keys, and those columns in placeholder order.
+
+    Keyed by the raw update_data keys so a cache hit skips all string building.
+    Conditional statements take two more arrays, the ids and updated_at values
+    of the accepted (id, updated_at) versions, matched pairwise.
+    With merge, social_links takes two parameters (see social_links_patch).
+    """
+    fields = tuple(field for field in UPDATABLE_FIELDS if field in keys)
+    if not fields:
+        raise ValueError("No fields to update")
+    assignments = []
+    for field in fields:
+        if field != "social_links":
+            assignments.append(f"{field} = %s")
+        elif merge:
+            assignments.append(MERGE_SOCIAL_LINKS)
+        else:
+            assignments.append("social_links = %s::jsonb")
+    assignments.append("updated_at = CURRENT_TIMESTAMP")
+    return f"""
+        UPDATE profiles
+        SET {', '.join(assignments)}
+        WHERE user_id = %s{" AND (id, updated_at) IN (SELECT * FROM unnest(%s::int[], %s::timestamp[]))" if conditional else ""}
+        RETURNING {PROFILE_COLUMNS}
+    """, fields
+
+
+def version_arrays(versions: Iterable[Tuple[int, datetime]]) -> Tuple[List[int], List[datetime]]:
+    """ids and updated_at values of (id, updated_at) versions, for a conditional UPDATE"""
+    versions = list(versions)
+    return [profile_id for profile_id, _ in versions], [updated_at for _, updated_at in versions]
+
+
+def social_links_patch(links: Dict[str, Optional[str]]) -> Tuple[Dict[str, str], List[str]]:
+    """Split a social_links merge patch into the keys to set and the keys to remove (null values)"""
+    return (
+        {key: value for key, value in links.items() if value is not None},
+        [key for key, value in links.items() if value is None]
+    )
+
+
+def group_updates_by_fields(updates: Dict[int, Dict[str, Any]]) -> Dict[Tuple[str, ...], List[int]]:
+    """Group user_ids whose updates touch the same columns, so each group shares one statement"""
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for user_id, update_data in updates.items():
+        fields = tuple(field for field in UPDATABLE_FIELDS if field in update_data)
+        if fields:
+            groups.setdefault(fields, []).append(user_id)
+    return groups
 
 
 class ProfileRepository:
     """Repository for profile database operations"""
     
-    def find_by_user_id(self, user_id: int) -> Optional[Dict[str, Any]]:
-        """Find profile by user_id"""
+    @observe_query("find_by_user_id")
+    def find_by_user_id(self, user_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+        """Find profile by user_id; with fields, select only those plus KEY_FIELDS"""
         info("[ProfileRepository]", "Buscando perfil por user_id", {"userId": user_id})
         
         conn = None
         try:
-            conn = db_config.get_connection()
+            if fields is not None:
+                # Registered before checkout so the connection prepares it
+                name, query, columns = prepare_projection(fields)
+            conn = db_config.get_connection(read_for=(user_id,))
             cursor = conn.cursor()
             
-            query = """
-                SELECT id, user_id, personal_url, nickname, is_contact_public,
-                       mailing_address, biography, organization, country,
-                       social_links, created_at, updated_at
-                FROM profiles
-                WHERE user_id = %s
-            """
-            cursor.execute(query, (user_id,))
+            if fields is None:
+                execute_statement(cursor, conn, FIND_BY_USER_ID, (user_id,))
+            elif name:
+                execute_statement(cursor, conn, name, (user_id,))
+            else:
+                cursor.execute(query, (user_id,))
             row = cursor.fetchone()
             
             if not row:
                 debug("[ProfileRepository]", "Perfil no encontrado", {"userId": user_id})
                 return None
             
-            profile = {
-                "id": row[0],
-                "user_id": row[1],
-                "personal_url": row[2],
-                "nickname": row[3],
-                "is_contact_public": row[4],
-                "mailing_address": row[5],
-                "biography": row[6],
-                "organization": row[7],
-                "country": row[8],
-                "social_links": row[9] if row[9] else {},
-                "created_at": row[10],
-                "updated_at": row[11]
-            }
-            
-            info("[ProfileRepository]", "Perfil encontrado", {
+            profile = row_to_profile(row) if fields is None else row_to_projection(row, columns)
+            
+            info("[ProfileRepository]", "Perfil encontrado", lambda: {
                 "userId": user_id,
                 "profileId": profile["id"]
             })
@@ -63,90 +255,134 @@ class ProfileRepository:
                 cursor.close()
                 db_config.return_connection(conn)
     
-    def update(self, user_id: int, update_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Update profile for a user"""
-        info("[ProfileRepository]", "Actualizando perfil", {"userId": user_id})
-        
+    @observe_query("find_version")
+    def find_version(self, user_id: int) -> Optional[Tuple[int, datetime]]:
+        """(id, updated_at) of a profile without fetching the full row"""
         conn = None
         try:
-            conn = db_config.get_connection()
+            conn = db_config.get_connection(read_for=(user_id,))
             cursor = conn.cursor()
             
-            # Build update query dynamically
-            fields = []
-            values = []
-            
-            if "personal_url" in update_data:
-                fields.append("personal_url = %s")
-                values.append(update_data["personal_url"])
-            
-            if "nickname" in update_data:
-                fields.append("nickname = %s")
-                values.append(update_data["nickname"])
-            
-            if "is_contact_public" in update_data:
-                fields.append("is_contact_public = %s")
-                values.append(update_data["is_contact_public"])
-            
-            if "mailing_address" in update_data:
-                fields.append("mailing_address = %s")
-                values.append(update_data["mailing_address"])
+            execute_statement(cursor, conn, FIND_VERSION, (user_id,))
+            row = cursor.fetchone()
+            return (row[0], row[1]) if row else None
             
-            if "biography" in update_data:
-                fields.append("biography = %s")
-                values.append(update_data["biography"])
+        except Exception as e:
+            error("[ProfileRepository]", "Error buscando versión del perfil", {
+                "userId": user_id,
+                "error": str(e)
+            })
+            raise
+        finally:
+            if conn:
+                cursor.close()
+                db_config.return_connection(conn)
+    
+    @observe_query("find_by_user_ids")
+    def find_by_user_ids(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Find several profiles in one query, keyed by user_id"""
+        info("[ProfileRepository]", "Buscando perfiles por user_ids", {"count": len(user_ids)})
+        
+        conn = None
+        try:
+            conn = db_config.get_connection(read_for=user_ids)
+            cursor = conn.cursor()
             
-            if "organization" in update_data:
-                fields.append("organization = %s")
-                values.append(update_data["organization"])
+            query = f"""
+                SELECT {PROFILE_COLUMNS}
+                FROM profiles
+                WHERE user_id = ANY(%s)
+            """
+            cursor.execute(query, (list(user_ids),))
+            profiles = {}
+            for row in cursor.fetchall():
+                profile = row_to_profile(row)
+                profiles[profile["user_id"]] = profile
             
-            if "country" in update_data:
-                fields.append("country = %s")
-                values.append(update_data["country"])
+            debug("[ProfileRepository]", "Perfiles encontrados", {
+                "requested": len(user_ids),
+                "found": len(profiles)
+            })
             
-            if "social_links" in update_data:
-                fields.append("social_links = %s::jsonb")
-                values.append(json.dumps(update_data["social_links"]))
+            return profiles
             
-            if not fields:
-                raise ValueError("No fields to update")
+        except Exception as e:
+            error("[ProfileRepository]", "Error buscando perfiles", {
+                "count": len(user_ids),
+                "error": str(e)
+            })
+            raise
+        finally:
+            if conn:
+                cursor.close()
+                db_config.return_connection(conn)
+    
+    @observe_query("update")
+    def update(
+        self,
+        user_id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[Tuple[int, datetime]]] = None
+    ) -> Dict[str, Any]:
+        """Update profile for a user, optionally only if its (id, updated_at) is one of expected_versions"""
+        return self._write(user_id, update_data, expected_versions, merge=False)
+    
+    @observe_query("patch")
+    def patch(
+        self,
+        user_id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[Tuple[int, datetime]]] = None
+    ) -> Dict[str, Any]:
+        """Like update, but social_links is a merge patch applied in the database (null removes a key)"""
+        return self._write(user_id, update_data, expected_versions, merge=True)
+    
+    def _write(
+        self,
+        user_id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[Tuple[int, datetime]]],
+        merge: bool
+    ) -> Dict[str, Any]:
+        info("[ProfileRepository]", "Actualizando perfil", {"userId": user_id})
+        
+        conn = None
+        try:
+            conn = db_config.get_connection()
+            cursor = conn.cursor()
             
-            fields.append("updated_at = CURRENT_TIMESTAMP")
+            conditional = expected_versions is not None
+            query, fields = update_statement(tuple(update_data), conditional, merge)
+            values = []
+            for field in fields:
+                if field != "social_links":
+                    values.append(update_data[field])
+                elif merge:
+                    links, removed = social_links_patch(update_data[field])
+                    values.extend((dumps(links), removed))
+                else:
+                    values.append(dumps(update_data[field]))
             values.append(user_id)
-            
-            query = f"""
-                UPDATE profiles
-                SET {', '.join(fields)}
-                WHERE user_id = %s
-                RETURNING id, user_id, personal_url, nickname, is_contact_public,
-                          mailing_address, biography, organization, country,
-                          social_links, created_at, updated_at
-            """
+            if conditional:
+                values.extend(version_arrays(expected_versions))
             
             cursor.execute(query, values)
             row = cursor.fetchone()
             
             if not row:
-                raise ValueError("Profile not found")
+                if conditional:
+                    # The UPDATE matched nothing, so a fallback rollback loses nothing
+                    execute_statement(cursor, conn, FIND_VERSION, (user_id,))
+                    if cursor.fetchone():
+                        raise ProfileVersionMismatchError("Profile was modified")
+                raise ProfileNotFoundError("Profile not found")
             
             conn.commit()
+            db_config.wrote(user_id)
             
-            profile = {
-                "id": row[0],
-                "user_id": row[1],
-                "personal_url": row[2],
-                "nickname": row[3],
-                "is_contact_public": row[4],
-                "mailing_address": row[5],
-                "biography": row[6],
-                "organization": row[7],
-                "country": row[8],
-                "social_links": row[9] if row[9] else {},
-                "created_at": row[10],
-                "updated_at": row[11]
-            }
-            
-            info("[ProfileRepository]", "Perfil actualizado exitosamente", {
+            profile = row_to_profile(row)
+            
+            info("[ProfileRepository]", "Perfil actualizado exitosamente", lambda: {
                 "userId": user_id,
                 "profileId": profile["id"]
             })
@@ -165,4 +401,69 @@ class ProfileRepository:
             if conn:
                 cursor.close()
                 db_config.return_connection(conn)
-
+    
+    @observe_query("bulk_update")
+    def bulk_update(self, updates: Dict[int, Dict[str, Any]], batch_size: int = 500) -> Set[int]:
+        """Apply many updates in batched statements inside one transaction.
+        
+        Returns the user_ids that matched a profile row.
+        """
+        info("[ProfileRepository]", "Actualizando perfiles en lote", {
+            "count": len(updates),
+            "batchSize": batch_size
+        })
+        
+        conn = None
+        try:
+            conn = db_config.get_connection()
+            cursor = conn.cursor()
+            updated = set()
+            
+            for fields, user_ids in group_updates_by_fields(updates).items():
+                assignments = ", ".join(f"{field} = v.{field}" for field in fields)
+                columns = ", ".join(("user_id",) + fields)
+                template = "(" + ", ".join(
+                    ["%s::int"] + [f"%s::{FIELD_TYPES.get(field, 'text')}" for field in fields]
+                ) + ")"
+                query = f"""
+                    UPDATE profiles AS p
+                    SET {assignments}, updated_at = CURRENT_TIMESTAMP
+                    FROM (VALUES %s) AS v({columns})
+                    WHERE p.user_id = v.user_id
+                    RETURNING p.user_id
+                """
+                rows = [
+                    (user_id, *[
+                        dumps(updates[user_id][field]) if field == "social_links" else updates[user_id][field]
+                        for field in fields
+                    ])
+                    for user_id in user_ids
+                ]
+                # execute_values sends page_size rows per statement and collects every RETURNING row
+                for row in extras.execute_values(
+                    cursor, query, rows, template=template, page_size=batch_size, fetch=True
+                ):
+                    updated.add(row[0])
+            
+            conn.commit()
+            db_config.wrote(*updated)
+            
+            info("[ProfileRepository]", "Perfiles actualizados en lote", {
+                "count": len(updates),
+                "updated": len(updated)
+            })
+            
+            return updated
+            
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            error("[ProfileRepository]", "Error actualizando perfiles en lote", {
+                "count": len(updates),
+                "error": str(e)
+            })
+            raise
+        finally:
+            if conn:
+                cursor.close()
+                db_config.return_connection(conn)
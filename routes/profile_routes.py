@@ -1,25 +1,129 @@
-from fastapi import APIRouter, Depends
-from typing import Dict, Any
-from controllers.profile_controller import ProfileController
-from models.profile import ProfileUpdate, ProfileResponse
-from middleware.jwt_middleware import verify_token
+from fastapi import APIRouter, Depends, Header, Query, Response
+from typing import Dict, Any, Optional
+from controllers.profile_controller import ProfileController, profile_version_etag
+from models.profile import (
+    ProfileUpdate,
+    ProfilePatch,
+    ProfileResponse,
+    ProfileBatchRequest,
+    ProfileBatchResponse,
+    ProfileBulkUpdateRequest,
+    ProfileBulkUpdateResponse,
+)
+from config.api_config import api_config
+from middleware.jwt_middleware import verify_token, require_scope
+from middleware.etag import profile_etag, none_match
+from serialization.responses import FastJSONResponse
+from metrics.instruments import PROFILE_CACHE_ENTRIES, PROFILE_CACHE_HIT_RATIO
+from metrics.timing import phase
 
 router = APIRouter(prefix="/api/v1/profiles", tags=["Profiles"])
 controller = ProfileController()
 
 
-@router.get("/{user_id}", response_model=ProfileResponse, status_code=200)
-def get_profile(user_id: int, token_data: Dict[str, Any] = Depends(verify_token)):
-    """Get profile for a user"""
-    return controller.get_profile(user_id, token_data)
+def _profile_cache_entries():
+    if controller.cache is None:
+        return {}
+    return {(): len(controller.cache.local)}
 
 
-@router.put("/{user_id}", response_model=ProfileResponse, status_code=200)
-def update_profile(
+def _profile_cache_hit_ratio():
+    if controller.cache is None:
+        return {}
+    return {(tier,): stats["hitRatio"] for tier, stats in controller.cache.stats().items()}
+
+
+PROFILE_CACHE_ENTRIES.set_function(_profile_cache_entries)
+PROFILE_CACHE_HIT_RATIO.set_function(_profile_cache_hit_ratio)
+
+# Clients may keep the body but must revalidate it with If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    """304 without a body"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+@router.post("/batch", response_model=ProfileBatchResponse, response_class=FastJSONResponse, status_code=200)
+async def get_profiles_batch(batch: ProfileBatchRequest, token_data: Dict[str, Any] = Depends(verify_token)):
+    """Get several profiles in one request"""
+    result = await controller.get_profiles(batch.user_ids, token_data)
+    with phase("serialize"):
+        return FastJSONResponse(result.model_dump())
+
+
+@router.post("/bulk", response_model=ProfileBulkUpdateResponse, response_class=FastJSONResponse, status_code=200)
+async def bulk_update_profiles(
+    bulk: ProfileBulkUpdateRequest,
+    token_data: Dict[str, Any] = Depends(require_scope(api_config.bulk_scope))
+):
+    """Update many profiles in one transaction"""
+    result = await controller.bulk_update_profiles(bulk.items, token_data)
+    with phase("serialize"):
+        return FastJSONResponse(result.model_dump())
+
+
+@router.get("/{user_id}", response_model=ProfileResponse, response_class=FastJSONResponse, status_code=200)
+async def get_profile(
+    user_id: int,
+    token_data: Dict[str, Any] = Depends(verify_token),
+    if_none_match: Optional[str] = Header(None),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas")
+):
+    """Get profile for a user, or only ?fields=; 304 when If-None-Match still matches"""
+    projection = controller.parse_fields(fields)
+    if if_none_match:
+        # Version-only lookup: unchanged profiles are never fetched or serialized in full
+        etag = await controller.get_profile_etag(user_id, token_data, projection)
+        if etag and none_match(if_none_match, etag):
+            return not_modified(etag)
+    
+    profile = await controller.get_profile(user_id, token_data, projection)
+    if projection is not None:
+        # Partial response: only the requested fields, read by a narrowed SELECT
+        etag = profile_version_etag(profile["id"], profile["updated_at"], projection)
+        if if_none_match and none_match(if_none_match, etag):
+            return not_modified(etag)
+        with phase("serialize"):
+            body = {field: profile[field] for field in projection}
+            return FastJSONResponse(body, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    
+    etag = profile_etag(profile.id, profile.updated_at)
+    if if_none_match and none_match(if_none_match, etag):
+        return not_modified(etag)
+    # Trusted ProfileRow: encoded in one pass, skipping model_dump and jsonable_encoder
+    with phase("serialize"):
+        return FastJSONResponse(profile, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+@router.put("/{user_id}", response_model=ProfileResponse, response_class=FastJSONResponse, status_code=200)
+async def update_profile(
     user_id: int,
     profile_update: ProfileUpdate,
-    token_data: Dict[str, Any] = Depends(verify_token)
+    token_data: Dict[str, Any] = Depends(verify_token),
+    if_match: Optional[str] = Header(None)
 ):
-    """Update profile for a user"""
-    return controller.update_profile(user_id, profile_update, token_data)
+    """Update profile for a user; with If-Match only if it has not changed (412 otherwise)"""
+    profile = await controller.update_profile(user_id, profile_update, token_data, if_match)
+    with phase("serialize"):
+        return FastJSONResponse(
+            profile,
+            headers={"ETag": profile_etag(profile.id, profile.updated_at)}
+        )
+
 
+@router.patch("/{user_id}", response_model=ProfileResponse, response_class=FastJSONResponse, status_code=200)
+async def patch_profile(
+    user_id: int,
+    profile_patch: ProfilePatch,
+    token_data: Dict[str, Any] = Depends(verify_token),
+    if_match: Optional[str] = Header(None)
+):
+    """Like PUT, but social_links is merged into the stored links (null removes a key)"""
+    profile = await controller.update_profile(user_id, profile_patch, token_data, if_match, merge=True)
+    with phase("serialize"):
+        return FastJSONResponse(
+            profile,
+            headers={"ETag": profile_etag(profile.id, profile.updated_at)}
+        )
@@ -0,0 +1,3 @@
+from .json_backend import BACKEND, dumps, dumps_bytes, loads
+
+__all__ = ["BACKEND", "dumps", "dumps_bytes", "loads"]
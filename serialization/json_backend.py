@@ -0,0 +1,46 @@
+import json
+import os
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Encode the types the stdlib encoder does not know, the same way orjson does"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {field.name: getattr(obj, field.name) for field in fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# JSON_BACKEND=auto picks orjson when installed; JSON_BACKEND=stdlib forces the json module
+if orjson is not None and os.getenv("JSON_BACKEND", "auto").lower() != "stdlib":
+    BACKEND = "orjson"
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Encode obj as compact UTF-8 JSON bytes"""
+        return orjson.dumps(obj)
+
+    def dumps(obj: Any) -> str:
+        """Encode obj as a compact JSON string"""
+        return orjson.dumps(obj).decode("utf-8")
+
+    loads = orjson.loads
+else:
+    BACKEND = "json"
+
+    def dumps(obj: Any) -> str:
+        """Encode obj as a compact JSON string"""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Encode obj as compact UTF-8 JSON bytes"""
+        return dumps(obj).encode("utf-8")
+
+    loads = json.loads
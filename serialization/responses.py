@@ -0,0 +1,15 @@
+from typing import Any
+from fastapi.responses import JSONResponse
+from .json_backend import dumps_bytes
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with the fast backend.
+
+    Returning an instance from an endpoint skips FastAPI's response_model
+    validation and jsonable_encoder pass; content must already hold only
+    JSON-ready values (datetimes are encoded as ISO 8601).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
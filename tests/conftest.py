@@ -7,7 +7,7 @@ from datetime import datetime, timedelta
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
-from jose import jwt
+from jose import jwt, jwk
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -72,7 +72,8 @@ def rsa_keys():
         'private_key': private_key,
         'public_key': public_key,
         'private_pem': private_pem,
-        'public_pem': public_pem
+        'public_pem': public_pem,
+        'verifier': jwk.construct(public_key, 'RS256')
     }
 
 
@@ -0,0 +1,107 @@
+# tests/integration/test_metrics_endpoint.py
+import re
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch, MagicMock, AsyncMock
+from main import app
+
+
+client = TestClient(app)
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text):
+    """Parse the Prometheus text format into {(name, frozenset(labels)): value}"""
+    samples = {}
+    types = {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ", 3)
+            types[name] = kind
+            continue
+        if not line or line.startswith("#"):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"unparseable line: {line!r}"
+        name, labels, value = match.groups()
+        samples[(name, frozenset(LABEL.findall(labels or "")))] = float(value)
+    return types, samples
+
+
+def _value(samples, name, **labels):
+    return samples.get((name, frozenset(labels.items())), 0.0)
+
+
+@pytest.mark.integration
+class TestMetricsEndpoint:
+    """Test GET /metrics"""
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_scrape_after_requests(self, mock_jwt_config, rsa_keys, valid_token, sample_profile_data):
+        """Test request, JWT and query series are exposed and parseable"""
+        from routes.profile_routes import controller
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        mock_repo = MagicMock()
+        mock_repo.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+
+        _, before = parse_metrics(client.get("/metrics").text)
+        with patch.object(controller, 'repository', mock_repo):
+            client.get("/api/v1/profiles/1", headers={"Authorization": f"Bearer {valid_token}"})
+            client.get("/api/v1/profiles/1", headers={"Authorization": f"Bearer {valid_token}"})
+        client.get("/health")
+
+        response = client.get("/metrics")
+        types, samples = parse_metrics(response.text)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert types["http_request_duration_seconds"] == "histogram"
+        assert types["http_requests_in_flight"] == "gauge"
+
+        route = {"method": "GET", "route": "/api/v1/profiles/{user_id}", "status": "200"}
+        assert _value(samples, "http_requests_total", **route) - _value(before, "http_requests_total", **route) == 2
+        assert _value(samples, "http_request_duration_seconds_count", **route) >= 2
+        assert _value(samples, "http_request_duration_seconds_bucket", le="+Inf", **route) == \
+            _value(samples, "http_request_duration_seconds_count", **route)
+        assert _value(samples, "http_requests_total", method="GET", route="/health", status="200") >= 1
+        assert _value(samples, "jwt_verification_seconds_count", cache="miss") >= 1
+        assert _value(samples, "jwt_verification_seconds_count", cache="hit") >= 1
+        assert types["jwt_cache_lookups"] == "gauge"
+        assert _value(samples, "jwt_cache_lookups", result="hit") >= 1
+        assert _value(samples, "jwt_cache_lookups", result="miss") >= 1
+        assert _value(samples, "jwt_cache_entries") >= 1
+        # Only the /metrics scrape itself is in flight
+        assert _value(samples, "http_requests_in_flight") == 1
+
+    def test_unmatched_routes_share_one_label(self):
+        """Test unknown paths do not create a series each"""
+        client.get("/does-not-exist/1")
+        client.get("/does-not-exist/2")
+
+        _, samples = parse_metrics(client.get("/metrics").text)
+
+        assert _value(samples, "http_requests_total", method="GET", route="unmatched", status="404") >= 2
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_profile_cache_series(self, mock_jwt_config, rsa_keys, valid_token, sample_profile_data):
+        """Test the in-process profile cache reports its size and hit ratio"""
+        from routes.profile_routes import controller
+        from cache import LRUCache
+        from repositories.cached_profile_repository import CachedProfileRepository
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        inner = MagicMock()
+        inner.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+        cache = CachedProfileRepository(inner, LRUCache(10, 60))
+
+        with patch.object(controller, 'repository', cache), patch.object(controller, 'cache', cache):
+            for _ in range(4):
+                client.get("/api/v1/profiles/1", headers={"Authorization": f"Bearer {valid_token}"})
+            types, samples = parse_metrics(client.get("/metrics").text)
+
+        assert types["profile_cache_entries"] == "gauge"
+        assert _value(samples, "profile_cache_entries") == 1
+        assert _value(samples, "profile_cache_hit_ratio", tier="local") == 0.75
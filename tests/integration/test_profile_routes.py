@@ -1,9 +1,11 @@
 # tests/integration/test_profile_routes.py
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
-from datetime import datetime
+from unittest.mock import patch, MagicMock, AsyncMock
+from datetime import datetime, timedelta
+from jose import jwt
 from main import app
+from repositories.profile_repository import ProfileNotFoundError, ProfileVersionMismatchError
 
 
 client = TestClient(app)
@@ -18,7 +20,7 @@ class TestProfileRoutes:
     def test_get_profile_success(self, mock_repo_class, mock_jwt_config, rsa_keys, valid_token):
         """Test GET /api/v1/profiles/{user_id} - success"""
         # Setup JWT mock
-        mock_jwt_config.get_public_key.return_value = rsa_keys['public_key']
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
 
         # Setup repository mock
         mock_repo = MagicMock()
@@ -58,7 +60,7 @@ class TestProfileRoutes:
     def test_get_profile_not_found(self, mock_repo_class, mock_jwt_config, rsa_keys, valid_token):
         """Test GET profile when it doesn't exist"""
         # Setup mocks
-        mock_jwt_config.get_public_key.return_value = rsa_keys['public_key']
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
         mock_repo = MagicMock()
         mock_repo_class.return_value = mock_repo
         mock_repo.find_by_user_id.return_value = None
@@ -78,7 +80,7 @@ class TestProfileRoutes:
     def test_get_profile_forbidden_different_user(self, mock_repo_class, mock_jwt_config, rsa_keys, valid_token):
         """Test GET profile for different user - should be forbidden"""
         # Setup mocks
-        mock_jwt_config.get_public_key.return_value = rsa_keys['public_key']
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
         mock_repo = MagicMock()
         mock_repo_class.return_value = mock_repo
 
@@ -103,7 +105,7 @@ class TestProfileRoutes:
     def test_update_profile_success(self, mock_repo_class, mock_jwt_config, rsa_keys, valid_token):
         """Test PUT /api/v1/profiles/{user_id} - success"""
         # Setup mocks
-        mock_jwt_config.get_public_key.return_value = rsa_keys['public_key']
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
         mock_repo = MagicMock()
         mock_repo_class.return_value = mock_repo
 
@@ -152,7 +154,7 @@ class TestProfileRoutes:
     def test_update_profile_forbidden_different_user(self, mock_repo_class, mock_jwt_config, rsa_keys, valid_token):
         """Test PUT profile for different user - should be forbidden"""
         # Setup mocks
-        mock_jwt_config.get_public_key.return_value = rsa_keys['public_key']
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
 
         # Execute - token has userId=1, but updating userId=2
         response = client.put(
@@ -169,10 +171,10 @@ class TestProfileRoutes:
     def test_update_profile_not_found(self, mock_repo_class, mock_jwt_config, rsa_keys, valid_token):
         """Test PUT profile when it doesn't exist"""
         # Setup mocks
-        mock_jwt_config.get_public_key.return_value = rsa_keys['public_key']
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
         mock_repo = MagicMock()
         mock_repo_class.return_value = mock_repo
-        mock_repo.find_by_user_id.return_value = None
+        mock_repo.update.side_effect = ProfileNotFoundError("Profile not found")
 
         # Execute
         response = client.put(
@@ -189,7 +191,7 @@ class TestProfileRoutes:
     def test_update_profile_empty_data(self, mock_repo_class, mock_jwt_config, rsa_keys, valid_token):
         """Test PUT profile with empty data"""
         # Setup mocks
-        mock_jwt_config.get_public_key.return_value = rsa_keys['public_key']
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
         mock_repo = MagicMock()
         mock_repo_class.return_value = mock_repo
 
@@ -209,4 +211,331 @@ class TestProfileRoutes:
 
         # Assert
         assert response.status_code == 400
-        assert "no hay campos" in response.json()["detail"].lower()
\ No newline at end of file
+        assert "no hay campos" in response.json()["detail"].lower()
+
+@pytest.mark.integration
+class TestProfileResponseEncoding:
+    """Test profile responses go out pre-encoded through FastJSONResponse"""
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_get_profile_body_matches_response_model(self, mock_jwt_config, rsa_keys, valid_token, sample_profile_data):
+        """Test the pre-encoded body matches the ProfileResponse schema"""
+        from routes.profile_routes import controller
+        from models.profile import ProfileResponse
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        mock_repo = MagicMock()
+        mock_repo.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+
+        with patch.object(controller, 'repository', mock_repo), \
+                patch('fastapi.routing.serialize_response') as mock_serialize:
+            response = client.get(
+                "/api/v1/profiles/1",
+                headers={"Authorization": f"Bearer {valid_token}"}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        mock_serialize.assert_not_called()
+        expected = ProfileResponse(**sample_profile_data).model_dump(mode="json")
+        assert response.json() == expected
+
+
+@pytest.mark.integration
+class TestProfileBatchRoutes:
+    """Test POST /api/v1/profiles/batch"""
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_batch_lookup(self, mock_jwt_config, rsa_keys, valid_token, sample_profile_data):
+        """Test batch lookup returns per-item results in request order"""
+        from routes.profile_routes import controller
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        mock_repo = MagicMock()
+        mock_repo.find_by_user_ids = AsyncMock(return_value={1: sample_profile_data})
+
+        with patch.object(controller, 'repository', mock_repo):
+            response = client.post(
+                "/api/v1/profiles/batch",
+                headers={"Authorization": f"Bearer {valid_token}"},
+                json={"user_ids": [1, 2]}
+            )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results[0]["status"] == "ok"
+        assert results[0]["profile"]["nickname"] == "testuser"
+        assert results[1] == {"user_id": 2, "status": "forbidden", "profile": None}
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_batch_requires_ids(self, mock_jwt_config, rsa_keys, valid_token):
+        """Test an empty id list is rejected"""
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+
+        response = client.post(
+            "/api/v1/profiles/batch",
+            headers={"Authorization": f"Bearer {valid_token}"},
+            json={"user_ids": []}
+        )
+
+        assert response.status_code == 422
+
+
+@pytest.mark.integration
+class TestProfileBulkRoutes:
+    """Test POST /api/v1/profiles/bulk"""
+
+    @staticmethod
+    def _service_token(rsa_keys, scope, **claims):
+        payload = {
+            "userId": 900,
+            **claims,
+            "sub": "sync-service@example.com",
+            "iss": "ingesis.uniquindio.edu.co",
+            "scope": scope,
+            "exp": datetime.utcnow() + timedelta(hours=1),
+            "iat": datetime.utcnow()
+        }
+        return jwt.encode(payload, rsa_keys['private_pem'], algorithm='RS256')
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_bulk_update(self, mock_jwt_config, rsa_keys):
+        """Test a scoped service token applies a bulk update"""
+        from routes.profile_routes import controller
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        mock_repo = MagicMock()
+        mock_repo.bulk_update = AsyncMock(return_value={1})
+        token = self._service_token(rsa_keys, "profiles:read profiles:bulk_write")
+
+        with patch.object(controller, 'repository', mock_repo):
+            response = client.post(
+                "/api/v1/profiles/bulk",
+                headers={"Authorization": f"Bearer {token}"},
+                json={"items": [
+                    {"user_id": 1, "profile": {"nickname": "uno"}},
+                    {"user_id": 2, "profile": {"country": "Peru"}}
+                ]}
+            )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["updated"] == 1
+        assert body["not_found"] == 1
+        assert body["results"] == [
+            {"user_id": 1, "status": "updated"},
+            {"user_id": 2, "status": "not_found"}
+        ]
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_bulk_update_requires_scope(self, mock_jwt_config, rsa_keys, valid_token):
+        """Test user tokens without the bulk scope are rejected"""
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+
+        response = client.post(
+            "/api/v1/profiles/bulk",
+            headers={"Authorization": f"Bearer {valid_token}"},
+            json={"items": [{"user_id": 1, "profile": {"nickname": "uno"}}]}
+        )
+
+        assert response.status_code == 403
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_bulk_update_with_scope_only_token(self, mock_jwt_config, rsa_keys):
+        """Test a client-credentials token without userId is accepted on its scope"""
+        from routes.profile_routes import controller
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        mock_repo = MagicMock()
+        mock_repo.bulk_update = AsyncMock(return_value={1})
+        token = self._service_token(rsa_keys, "profiles:bulk_write", userId=None)
+
+        with patch.object(controller, 'repository', mock_repo):
+            response = client.post(
+                "/api/v1/profiles/bulk",
+                headers={"Authorization": f"Bearer {token}"},
+                json={"items": [{"user_id": 1, "profile": {"nickname": "uno"}}]}
+            )
+            profile_response = client.get("/api/v1/profiles/1", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+        assert response.json()["updated"] == 1
+        # The same token still cannot act as a user
+        assert profile_response.status_code == 403
+
+
+@pytest.mark.integration
+class TestProfileConditionalRoutes:
+    """Test ETag, If-None-Match and If-Match on profile routes"""
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_get_returns_etag_then_304(self, mock_jwt_config, rsa_keys, valid_token, sample_profile_data):
+        """Test a matching If-None-Match gets 304 without a full read"""
+        from routes.profile_routes import controller
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        mock_repo = MagicMock()
+        mock_repo.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+        mock_repo.find_version = AsyncMock(return_value=(1, sample_profile_data["updated_at"]))
+        headers = {"Authorization": f"Bearer {valid_token}"}
+
+        with patch.object(controller, 'repository', mock_repo):
+            first = client.get("/api/v1/profiles/1", headers=headers)
+            etag = first.headers["ETag"]
+            second = client.get("/api/v1/profiles/1", headers={**headers, "If-None-Match": etag})
+
+        assert first.status_code == 200
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == etag
+        mock_repo.find_by_user_id.assert_awaited_once()
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_get_with_stale_etag_returns_body(self, mock_jwt_config, rsa_keys, valid_token, sample_profile_data):
+        """Test a changed profile is sent in full with its new ETag"""
+        from routes.profile_routes import controller
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        mock_repo = MagicMock()
+        mock_repo.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+        mock_repo.find_version = AsyncMock(return_value=(1, sample_profile_data["updated_at"]))
+
+        with patch.object(controller, 'repository', mock_repo):
+            response = client.get(
+                "/api/v1/profiles/1",
+                headers={"Authorization": f"Bearer {valid_token}", "If-None-Match": '"1-20000101T000000000000"'}
+            )
+
+        assert response.status_code == 200
+        assert response.json()["nickname"] == "testuser"
+        assert response.headers["ETag"] != '"1-20000101T000000000000"'
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_put_with_stale_if_match_returns_412(self, mock_jwt_config, rsa_keys, valid_token):
+        """Test a conditional write against a modified profile"""
+        from routes.profile_routes import controller
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        mock_repo = MagicMock()
+        mock_repo.update = AsyncMock(side_effect=ProfileVersionMismatchError("Profile was modified"))
+
+        with patch.object(controller, 'repository', mock_repo):
+            response = client.put(
+                "/api/v1/profiles/1",
+                headers={"Authorization": f"Bearer {valid_token}", "If-Match": '"1-20000101T000000000000"'},
+                json={"nickname": "nuevo"}
+            )
+
+        assert response.status_code == 412
+
+
+@pytest.mark.integration
+class TestProfileFieldsRoutes:
+    """Test GET /api/v1/profiles/{user_id}?fields="""
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_partial_response(self, mock_jwt_config, rsa_keys, valid_token, sample_profile_data):
+        """Test only the requested fields are returned and passed down to the repository"""
+        from routes.profile_routes import controller
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        mock_repo = MagicMock()
+        mock_repo.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+
+        with patch.object(controller, 'repository', mock_repo):
+            response = client.get(
+                "/api/v1/profiles/1?fields=country,nickname",
+                headers={"Authorization": f"Bearer {valid_token}"}
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {"nickname": "testuser", "country": "Colombia"}
+        mock_repo.find_by_user_id.assert_awaited_once_with(1, ("nickname", "country"))
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_unknown_field_rejected(self, mock_jwt_config, rsa_keys, valid_token):
+        """Test fields outside the whitelist get 400"""
+        from routes.profile_routes import controller
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        mock_repo = MagicMock()
+
+        with patch.object(controller, 'repository', mock_repo):
+            response = client.get(
+                "/api/v1/profiles/1?fields=nickname,password",
+                headers={"Authorization": f"Bearer {valid_token}"}
+            )
+
+        assert response.status_code == 400
+        assert "password" in response.json()["detail"]
+        mock_repo.find_by_user_id.assert_not_called()
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_partial_etag_differs_and_revalidates(self, mock_jwt_config, rsa_keys, valid_token, sample_profile_data):
+        """Test a projection has its own ETag and gets 304 from the version lookup"""
+        from routes.profile_routes import controller
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        mock_repo = MagicMock()
+        mock_repo.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+        mock_repo.find_version = AsyncMock(return_value=(1, sample_profile_data["updated_at"]))
+        headers = {"Authorization": f"Bearer {valid_token}"}
+
+        with patch.object(controller, 'repository', mock_repo):
+            full = client.get("/api/v1/profiles/1", headers=headers)
+            partial = client.get("/api/v1/profiles/1?fields=nickname", headers=headers)
+            revalidated = client.get(
+                "/api/v1/profiles/1?fields=nickname",
+                headers={**headers, "If-None-Match": partial.headers["ETag"]}
+            )
+            other = client.get(
+                "/api/v1/profiles/1",
+                headers={**headers, "If-None-Match": partial.headers["ETag"]}
+            )
+
+        assert partial.headers["ETag"] != full.headers["ETag"]
+        assert revalidated.status_code == 304
+        assert other.status_code == 200
+
+
+@pytest.mark.integration
+class TestProfilePatchRoutes:
+    """Test PATCH /api/v1/profiles/{user_id}"""
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_patch_merges_social_links(self, mock_jwt_config, rsa_keys, valid_token, sample_profile_data):
+        """Test PATCH goes to the merging repository method and returns the new state"""
+        from routes.profile_routes import controller
+
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+        merged = {**sample_profile_data, "social_links": {"github": "https://github.com/test"}}
+        mock_repo = MagicMock()
+        mock_repo.patch = AsyncMock(return_value=merged)
+
+        with patch.object(controller, 'repository', mock_repo):
+            response = client.patch(
+                "/api/v1/profiles/1",
+                headers={"Authorization": f"Bearer {valid_token}"},
+                json={"social_links": {"github": "https://github.com/test", "twitter": None}}
+            )
+
+        assert response.status_code == 200
+        assert response.json()["social_links"] == {"github": "https://github.com/test"}
+        assert "ETag" in response.headers
+        mock_repo.patch.assert_awaited_once_with(
+            1, {"social_links": {"github": "https://github.com/test", "twitter": None}}
+        )
+        mock_repo.update.assert_not_called()
+
+    @patch('middleware.jwt_middleware.jwt_config')
+    def test_put_rejects_null_links(self, mock_jwt_config, rsa_keys, valid_token):
+        """Test null link values are only meaningful for PATCH"""
+        mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+
+        response = client.put(
+            "/api/v1/profiles/1",
+            headers={"Authorization": f"Bearer {valid_token}"},
+            json={"social_links": {"twitter": None}}
+        )
+
+        assert response.status_code == 422
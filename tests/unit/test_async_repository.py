@@ -0,0 +1,179 @@
+# tests/unit/test_async_repository.py
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime
+
+from repositories.async_profile_repository import AsyncProfileRepository
+from controllers.profile_controller import ProfileController
+
+
+def _mock_async_db(mock_db_config, row):
+    mock_conn = MagicMock()
+    mock_conn.fetchrow = AsyncMock(return_value=row)
+    mock_db_config.get_connection = AsyncMock(return_value=mock_conn)
+    mock_db_config.return_connection = AsyncMock()
+    return mock_conn
+
+
+@pytest.mark.unit
+class TestAsyncProfileRepository:
+    """Test AsyncProfileRepository"""
+
+    @pytest.mark.asyncio
+    async def test_find_by_user_id_found(self):
+        """Test finding profile by user_id when it exists"""
+        with patch('repositories.async_profile_repository.db_config') as mock_db_config:
+            now = datetime.utcnow()
+            mock_conn = _mock_async_db(mock_db_config, (
+                1, 1, "https://example.com", "testuser", True,
+                "123 Test St", "Test bio", "Test Org", "Colombia",
+                {"twitter": "https://twitter.com/test"},
+                now, now
+            ))
+
+            repo = AsyncProfileRepository()
+            profile = await repo.find_by_user_id(1)
+
+            assert profile["id"] == 1
+            assert profile["nickname"] == "testuser"
+            assert profile["social_links"] == {"twitter": "https://twitter.com/test"}
+
+            query, user_id = mock_conn.fetchrow.call_args.args
+            assert "WHERE user_id = $1" in query
+            assert user_id == 1
+            mock_db_config.return_connection.assert_awaited_once_with(mock_conn)
+
+    @pytest.mark.asyncio
+    async def test_find_by_user_id_not_found(self):
+        """Test finding profile by user_id when it doesn't exist"""
+        with patch('repositories.async_profile_repository.db_config') as mock_db_config:
+            _mock_async_db(mock_db_config, None)
+
+            repo = AsyncProfileRepository()
+
+            assert await repo.find_by_user_id(999) is None
+
+    @pytest.mark.asyncio
+    async def test_find_by_user_id_with_fields_selects_projection(self):
+        """Test a field list narrows the SELECT to those columns plus the key columns"""
+        with patch('repositories.async_profile_repository.db_config') as mock_db_config:
+            now = datetime.utcnow()
+            mock_conn = _mock_async_db(mock_db_config, (1, 1, "testuser", now))
+
+            repo = AsyncProfileRepository()
+            profile = await repo.find_by_user_id(1, ("nickname",))
+
+            assert profile == {"id": 1, "user_id": 1, "nickname": "testuser", "updated_at": now}
+            query, user_id = mock_conn.fetchrow.call_args.args
+            assert query == "SELECT id, user_id, nickname, updated_at FROM profiles WHERE user_id = $1"
+            assert user_id == 1
+
+    @pytest.mark.asyncio
+    async def test_update_uses_numbered_placeholders(self):
+        """Test update builds $n placeholders in field order"""
+        with patch('repositories.async_profile_repository.db_config') as mock_db_config:
+            now = datetime.utcnow()
+            mock_conn = _mock_async_db(mock_db_config, (
+                1, 1, None, "newname", True, None, None, None, "Argentina",
+                {"x": "y"}, now, now
+            ))
+
+            repo = AsyncProfileRepository()
+            profile = await repo.update(1, {
+                "country": "Argentina",
+                "nickname": "newname",
+                "social_links": {"x": "y"}
+            })
+
+            query, *values = mock_conn.fetchrow.call_args.args
+            assert "nickname = $1" in query
+            assert "country = $2" in query
+            assert "social_links = $3" in query
+            assert "WHERE user_id = $4" in query
+            assert values == ["newname", "Argentina", {"x": "y"}, 1]
+            assert profile["country"] == "Argentina"
+
+    @pytest.mark.asyncio
+    async def test_patch_passes_links_and_removed_keys(self):
+        """Test PATCH hands the links to the jsonb codec and the removed keys as text[]"""
+        with patch('repositories.async_profile_repository.db_config') as mock_db_config:
+            now = datetime.utcnow()
+            mock_conn = _mock_async_db(mock_db_config, (
+                1, 1, None, "nick", True, None, None, None, None,
+                {"twitter": "https://twitter.com/new"}, now, now
+            ))
+
+            repo = AsyncProfileRepository()
+            profile = await repo.patch(1, {"social_links": {"twitter": "https://twitter.com/new", "facebook": None}})
+
+            query, *params = mock_conn.fetchrow.call_args.args
+            assert "|| $1::jsonb) - $2::text[]" in query
+            assert params == [{"twitter": "https://twitter.com/new"}, ["facebook"], 1]
+            assert profile["social_links"] == {"twitter": "https://twitter.com/new"}
+
+    @pytest.mark.asyncio
+    async def test_update_profile_not_found(self):
+        """Test updating profile that doesn't exist"""
+        with patch('repositories.async_profile_repository.db_config') as mock_db_config:
+            mock_conn = _mock_async_db(mock_db_config, None)
+
+            repo = AsyncProfileRepository()
+            with pytest.raises(ValueError, match="Profile not found"):
+                await repo.update(999, {"nickname": "test"})
+
+            mock_db_config.return_connection.assert_awaited_once_with(mock_conn)
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_uses_unnest_per_batch(self):
+        """Test bulk updates send column arrays through unnest in one transaction"""
+        with patch('repositories.async_profile_repository.db_config') as mock_db_config:
+            mock_conn = _mock_async_db(mock_db_config, None)
+            mock_conn.fetch = AsyncMock(side_effect=[[(1,), (2,)], [(3,)]])
+            mock_conn.transaction.return_value.__aenter__ = AsyncMock()
+            mock_conn.transaction.return_value.__aexit__ = AsyncMock(return_value=False)
+
+            repo = AsyncProfileRepository()
+            updated = await repo.bulk_update({
+                1: {"nickname": "a", "is_contact_public": True},
+                2: {"nickname": "b", "is_contact_public": False},
+                3: {"nickname": "c", "is_contact_public": True},
+            }, batch_size=2)
+
+            assert updated == {1, 2, 3}
+            assert mock_conn.fetch.await_count == 2
+            query, *params = mock_conn.fetch.await_args_list[0].args
+            assert "unnest($1::int[], $2::text[], $3::boolean[])" in query
+            assert params == [[1, 2], ["a", "b"], [True, False]]
+            mock_conn.transaction.assert_called_once()
+            mock_db_config.return_connection.assert_awaited_once_with(mock_conn)
+
+
+@pytest.mark.unit
+class TestControllerRepositoryDispatch:
+    """Test ProfileController awaits async repositories and offloads sync ones"""
+
+    @pytest.mark.asyncio
+    async def test_awaits_async_repository(self, sample_profile_data):
+        """Test coroutine methods are awaited directly"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+
+        response = await controller.get_profile(1, {"user_id": 1})
+
+        assert response.user_id == 1
+        controller.repository.find_by_user_id.assert_awaited_once_with(1)
+
+    @pytest.mark.asyncio
+    async def test_runs_sync_repository_in_threadpool(self, sample_profile_data):
+        """Test blocking methods run through run_in_threadpool"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.find_by_user_id.return_value = sample_profile_data
+
+        with patch('repositories.dispatch.run_in_threadpool', new_callable=AsyncMock) as mock_run:
+            mock_run.return_value = sample_profile_data
+            response = await controller.get_profile(1, {"user_id": 1})
+
+        assert response.user_id == 1
+        mock_run.assert_awaited_once_with(controller.repository.find_by_user_id, 1)
@@ -0,0 +1,131 @@
+# tests/unit/test_compression.py
+import gzip
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from cache import LRUCache
+from middleware.compression import CompressionMiddleware, negotiate
+
+brotli = pytest.importorskip("brotli")
+
+BIG = {"biography": "Bio " * 1000}
+
+
+def _client(cache=None, minimum_size=500):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size, cache=cache)
+
+    @app.get("/big")
+    def big():
+        return JSONResponse(BIG, headers={"ETag": '"1-v1"'})
+
+    @app.get("/small")
+    def small():
+        return {"status": "healthy"}
+
+    @app.get("/not-modified")
+    def not_modified():
+        return Response(status_code=304, headers={"ETag": '"1-v1"'})
+
+    @app.get("/binary")
+    def binary():
+        return Response(b"\x00" * 2000, media_type="application/octet-stream")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"chunk " * 200, b"end " * 200]), media_type="text/plain")
+
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestNegotiate:
+    """Test Accept-Encoding negotiation"""
+
+    def test_server_preference_wins(self):
+        """Test br is preferred when the client accepts both"""
+        assert negotiate("gzip, deflate, br", ("br", "gzip")) == "br"
+
+    def test_q_zero_excluded(self):
+        """Test q=0 disables an encoding"""
+        assert negotiate("br;q=0, gzip;q=0.5", ("br", "gzip")) == "gzip"
+
+    def test_wildcard_and_identity(self):
+        """Test * accepts anything and identity-only gets nothing"""
+        assert negotiate("*", ("br", "gzip")) == "br"
+        assert negotiate("identity", ("br", "gzip")) is None
+
+
+@pytest.mark.unit
+class TestCompressionMiddleware:
+    """Test CompressionMiddleware"""
+
+    def test_gzip_large_json(self):
+        """Test large JSON bodies are gzip-compressed with Vary"""
+        response = _client().get("/big", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len("Bio " * 1000)
+        assert response.json() == BIG
+
+    def test_brotli_when_accepted(self):
+        """Test br is negotiated when available"""
+        client = _client()
+        response = client.get("/big", headers={"Accept-Encoding": "br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert response.json() == BIG
+
+    def test_small_response_left_alone(self):
+        """Test the minimum size threshold"""
+        response = _client().get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"status": "healthy"}
+
+    def test_not_modified_and_binary_untouched(self):
+        """Test 304 and non-text types pass through"""
+        client = _client(minimum_size=0)
+
+        assert "content-encoding" not in client.get("/not-modified", headers={"Accept-Encoding": "gzip"}).headers
+        assert "content-encoding" not in client.get("/binary", headers={"Accept-Encoding": "gzip"}).headers
+
+    def test_no_accept_encoding(self):
+        """Test clients without Accept-Encoding get identity"""
+        response = _client().get("/big", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_streaming_response(self):
+        """Test streamed bodies are compressed incrementally"""
+        response = _client().get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text == "chunk " * 200 + "end " * 200
+
+    def test_compressed_bytes_cached_per_etag(self):
+        """Test a hot response is compressed once per ETag and encoding"""
+        cache = LRUCache(10, 60)
+        client = _client(cache=cache)
+
+        with patch.object(CompressionMiddleware, 'compress', autospec=True,
+                          side_effect=lambda self, body, encoding: gzip.compress(body)) as mock_compress:
+            for _ in range(3):
+                response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+                assert response.json() == BIG
+
+        assert mock_compress.call_count == 1
+        assert cache.stats()["hits"] == 2
+
+    def test_compressed_response_gets_its_own_strong_etag(self):
+        """Test the coding is appended to the tag, per encoding"""
+        client = _client()
+
+        assert client.get("/big", headers={"Accept-Encoding": "gzip"}).headers["etag"] == '"1-v1-gzip"'
+        assert client.get("/big", headers={"Accept-Encoding": "br"}).headers["etag"] == '"1-v1-br"'
+        assert client.get("/big", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"1-v1"'
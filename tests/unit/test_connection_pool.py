@@ -0,0 +1,294 @@
+# tests/unit/test_connection_pool.py
+import asyncio
+import pytest
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from config.connection_pool import ConnectionPool, PoolTimeoutError, extensions
+from metrics.instruments import DB_POOL_EXHAUSTED, DB_POOL_TIMEOUTS
+
+
+class FakeConnection:
+    """Minimal stand-in for a psycopg2 connection"""
+
+    def __init__(self):
+        self.closed = 0
+        self.rollbacks = 0
+        self.fail_ping = False
+        self.info = SimpleNamespace(transaction_status=extensions.TRANSACTION_STATUS_IDLE)
+
+    def cursor(self):
+        cursor = MagicMock()
+        if self.fail_ping:
+            cursor.execute.side_effect = Exception("server closed the connection")
+        return cursor
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+def _pool(**kwargs):
+    opened = []
+
+    def connect():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    return ConnectionPool(connect, **kwargs), opened
+
+
+@pytest.mark.unit
+class TestConnectionPool:
+    """Test ConnectionPool"""
+
+    def test_opens_min_size_eagerly(self):
+        """Test min_size connections are opened at creation"""
+        pool, opened = _pool(min_size=2, max_size=4)
+
+        assert len(opened) == 2
+        assert pool.stats()["idle"] == 2
+
+    def test_invalid_sizing_rejected(self):
+        """Test min greater than max is rejected"""
+        with pytest.raises(ValueError):
+            _pool(min_size=5, max_size=2)
+
+    def test_failed_eager_open_closes_opened_connections(self):
+        """Test connections opened before a connect failure are closed"""
+        opened = []
+
+        def connect():
+            if len(opened) == 2:
+                raise Exception("could not connect to server")
+            conn = FakeConnection()
+            opened.append(conn)
+            return conn
+
+        with pytest.raises(Exception, match="could not connect"):
+            ConnectionPool(connect, min_size=3, max_size=5)
+
+        assert len(opened) == 2
+        assert all(conn.closed for conn in opened)
+
+    def test_reuses_returned_connection(self):
+        """Test a returned connection is handed out again"""
+        pool, opened = _pool(min_size=1, max_size=2)
+
+        conn = pool.getconn()
+        pool.putconn(conn)
+
+        assert pool.getconn() is conn
+        assert len(opened) == 1
+        assert pool.stats()["inUse"] == 1
+
+    def test_grows_up_to_max_size(self):
+        """Test new connections are opened until max_size"""
+        pool, opened = _pool(min_size=0, max_size=2)
+
+        pool.getconn()
+        pool.getconn()
+
+        assert len(opened) == 2
+        assert pool.stats()["size"] == 2
+
+    def test_exhausted_pool_times_out(self):
+        """Test callers fail with PoolTimeoutError after the timeout"""
+        pool, _ = _pool(min_size=1, max_size=1, timeout=0.05)
+        pool.getconn()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.getconn()
+
+        stats = pool.stats()
+        assert stats["exhausted"] == 1
+        assert stats["timeouts"] == 1
+
+    def test_exhaustion_and_timeouts_are_counted(self):
+        """Test exhausted waits and timeouts are exported as counters"""
+        pool, _ = _pool(min_size=1, max_size=1, timeout=0.05)
+        exhausted = DB_POOL_EXHAUSTED.labels().value()
+        timeouts = DB_POOL_TIMEOUTS.labels().value()
+        pool.getconn()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.getconn()
+
+        assert DB_POOL_EXHAUSTED.labels().value() - exhausted == 1
+        assert DB_POOL_TIMEOUTS.labels().value() - timeouts == 1
+
+    def test_exhausted_pool_waits_for_release(self):
+        """Test a waiting caller gets the connection released by another thread"""
+        pool, _ = _pool(min_size=1, max_size=1, timeout=2)
+        conn = pool.getconn()
+
+        releaser = threading.Timer(0.05, pool.putconn, args=(conn,))
+        releaser.start()
+        got = pool.getconn()
+        releaser.join()
+
+        assert got is conn
+        stats = pool.stats()
+        assert stats["exhausted"] == 1
+        assert stats["waitTimeMax"] >= 0.04
+
+    def test_rolls_back_open_transaction_on_return(self):
+        """Test connections are returned to the pool idle"""
+        pool, _ = _pool(min_size=1, max_size=1)
+        conn = pool.getconn()
+        conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+
+        pool.putconn(conn)
+
+        assert conn.rollbacks == 1
+        assert pool.stats()["idle"] == 1
+
+    def test_closed_connection_is_discarded(self):
+        """Test a connection closed while checked out is not reused"""
+        pool, opened = _pool(min_size=1, max_size=1)
+        conn = pool.getconn()
+        conn.closed = 1
+
+        pool.putconn(conn)
+        replacement = pool.getconn()
+
+        assert replacement is not conn
+        assert len(opened) == 2
+        assert pool.stats()["discarded"] == 1
+
+    def test_expired_connection_is_recycled(self):
+        """Test connections older than max_lifetime are replaced on checkout"""
+        pool, opened = _pool(min_size=1, max_size=1, max_lifetime=0.01)
+        time.sleep(0.02)
+
+        conn = pool.getconn()
+
+        assert conn is not opened[0]
+        assert opened[0].closed
+        assert pool.stats()["recycled"] == 1
+
+    def test_stale_idle_connection_is_validated(self):
+        """Test a connection failing SELECT 1 is replaced"""
+        pool, opened = _pool(min_size=1, max_size=1, validate_after=0)
+        opened[0].fail_ping = True
+
+        conn = pool.getconn()
+
+        assert conn is not opened[0]
+        assert pool.stats()["discarded"] == 1
+
+    def test_concurrent_checkouts_never_exceed_max_size(self):
+        """Test thread safety under contention"""
+        pool, opened = _pool(min_size=0, max_size=3, timeout=5)
+        peak = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(20):
+                conn = pool.getconn()
+                with lock:
+                    peak.append(pool.stats()["inUse"])
+                pool.putconn(conn)
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(opened) <= 3
+        assert max(peak) <= 3
+        assert pool.stats()["inUse"] == 0
+        assert pool.stats()["checkouts"] == 200
+
+    def test_closeall_rejects_checkouts(self):
+        """Test a closed pool refuses new checkouts"""
+        pool, opened = _pool(min_size=1, max_size=1)
+        pool.closeall()
+
+        assert opened[0].closed
+        with pytest.raises(PoolTimeoutError):
+            pool.getconn()
+
+
+@pytest.mark.unit
+class TestDatabaseConfigPoolSettings:
+    """Test pool sizing comes from the environment"""
+
+    def test_pool_sizing_from_env(self):
+        """Test DB_POOL_* variables configure the pool"""
+        from config.database import DatabaseConfig
+
+        env = {"DB_POOL_MIN_SIZE": "2", "DB_POOL_MAX_SIZE": "7", "DB_POOL_TIMEOUT": "1.5"}
+        with patch.dict('os.environ', env), \
+                patch('config.database.ConnectionPool') as mock_pool:
+            config = DatabaseConfig()
+            asyncio.run(config.connect())
+
+        kwargs = mock_pool.call_args.kwargs
+        assert config.min_connections == 2
+        assert config.max_connections == 7
+        assert kwargs["min_size"] == 2
+        assert kwargs["max_size"] == 7
+        assert kwargs["timeout"] == 1.5
+
+
+class FakeAsyncpgPool:
+    """Stand-in for an asyncpg pool handing out connections by backend pid"""
+
+    def __init__(self, config):
+        self.config = config
+        self.pids = iter(range(100, 200))
+        self.conn = None
+        self.released = []
+
+    async def open(self):
+        conn = MagicMock()
+        conn.get_server_pid.return_value = next(self.pids)
+        conn.is_closed.return_value = False
+        conn.set_type_codec = AsyncMock()
+        conn.close = AsyncMock(side_effect=lambda **kwargs: conn.is_closed.configure_mock(return_value=True))
+        await self.config._init_connection(conn)
+        self.conn = conn
+
+    async def acquire(self, timeout=None):
+        # Like asyncpg, a connection closed before release is reopened on the next acquire
+        if self.conn is None or self.conn.is_closed():
+            await self.open()
+        return self.conn
+
+    async def release(self, conn):
+        self.released.append(conn)
+
+
+@pytest.mark.unit
+class TestAsyncDatabaseConfigLifetime:
+    """Test DB_POOL_MAX_LIFETIME bounds the age of asyncpg connections"""
+
+    @pytest.mark.asyncio
+    async def test_old_connection_is_replaced_on_acquire(self):
+        """Test a connection past its lifetime is closed and a fresh one handed out"""
+        from config.database import AsyncDatabaseConfig
+
+        with patch.dict('os.environ', {"DB_POOL_MAX_LIFETIME": "60", "DB_REPLICA_HOSTS": ""}):
+            config = AsyncDatabaseConfig()
+        config.connection_pool = pool = FakeAsyncpgPool(config)
+
+        with patch('config.database.time.monotonic', return_value=1000.0):
+            first = await config.get_connection()
+        with patch('config.database.time.monotonic', return_value=1030.0):
+            assert await config.get_connection() is first
+
+        with patch('config.database.time.monotonic', return_value=1061.0):
+            fresh = await config.get_connection()
+
+        assert fresh is not first
+        first.close.assert_awaited_once()
+        assert pool.released == [first]
+        assert config._opened == {fresh.get_server_pid(): 1061.0}
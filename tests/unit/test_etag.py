@@ -0,0 +1,74 @@
+# tests/unit/test_etag.py
+import pytest
+from datetime import datetime
+
+from middleware.etag import profile_etag, parse_etag, none_match, if_match_versions, encoded_etag
+
+UPDATED_AT = datetime(2024, 1, 15, 11, 0, 0, 123456)
+
+
+@pytest.mark.unit
+class TestEtag:
+    """Test profile ETag helpers"""
+
+    def test_round_trip(self):
+        """Test the tag encodes id and updated_at to the microsecond"""
+        etag = profile_etag(7, UPDATED_AT)
+
+        assert etag == '"7-20240115T110000123456"'
+        assert parse_etag(etag) == (7, UPDATED_AT)
+
+    def test_changes_with_updated_at(self):
+        """Test a new version gets a new tag"""
+        assert profile_etag(7, UPDATED_AT) != profile_etag(7, UPDATED_AT.replace(microsecond=0))
+
+    def test_weak_and_foreign_tags_not_parsed(self):
+        """Test only strong profile tags are accepted for writes"""
+        assert parse_etag('W/"7-20240115T110000123456"') is None
+        assert parse_etag('"abc"') is None
+        assert parse_etag('7-20240115T110000123456') is None
+
+    def test_none_match(self):
+        """Test If-None-Match lists, weak comparison and wildcard"""
+        etag = profile_etag(7, UPDATED_AT)
+
+        assert none_match(f'"other", {etag}', etag)
+        assert none_match(f"W/{etag}", etag)
+        assert none_match("*", etag)
+        assert not none_match('"7-20240101T000000000000"', etag)
+
+    def test_if_match_versions(self):
+        """Test If-Match yields accepted versions, None for any"""
+        etag = profile_etag(7, UPDATED_AT)
+
+        assert if_match_versions(etag) == [(7, UPDATED_AT)]
+        assert if_match_versions("*") is None
+        assert if_match_versions('W/"weak"') == []
+
+    def test_if_match_keeps_the_profile_id(self):
+        """Test tags of two profiles updated in the same transaction stay distinct versions"""
+        header = f"{profile_etag(7, UPDATED_AT)}, {profile_etag(8, UPDATED_AT)}"
+
+        assert if_match_versions(header) == [(7, UPDATED_AT), (8, UPDATED_AT)]
+
+    def test_variant_tags(self):
+        """Test partial representations get their own tag but parse to the same version"""
+        etag = profile_etag(7, UPDATED_AT, "1c")
+
+        assert etag == '"7-20240115T110000123456-1c"'
+        assert etag != profile_etag(7, UPDATED_AT)
+        assert parse_etag(etag) == (7, UPDATED_AT)
+        assert if_match_versions(etag) == [(7, UPDATED_AT)]
+
+    def test_compressed_tags_revalidate_and_parse(self):
+        """Test a tag with a content-coding suffix still yields 304 and If-Match versions"""
+        etag = profile_etag(7, UPDATED_AT, "1c")
+        gzipped = encoded_etag(etag, "gzip")
+
+        assert gzipped == '"7-20240115T110000123456-1c-gzip"'
+        assert none_match(gzipped, etag)
+        assert none_match(encoded_etag(etag, "br"), gzipped)
+        assert not none_match(gzipped, profile_etag(7, UPDATED_AT))
+        assert parse_etag(gzipped) == (7, UPDATED_AT)
+        assert if_match_versions(gzipped) == [(7, UPDATED_AT)]
+        assert encoded_etag('W/"weak"', "gzip") == 'W/"weak"'
@@ -0,0 +1,82 @@
+# tests/unit/test_json_backend.py
+import pytest
+import importlib
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+from serialization import json_backend
+from serialization.responses import FastJSONResponse
+
+
+@pytest.fixture
+def stdlib_backend():
+    """Reload the backend module with the stdlib fallback forced"""
+    with patch.dict('os.environ', {'JSON_BACKEND': 'stdlib'}):
+        module = importlib.reload(json_backend)
+    yield module
+    importlib.reload(json_backend)
+
+
+@pytest.mark.unit
+class TestJSONBackend:
+    """Test the JSON backend selection and encoding"""
+
+    def test_auto_detects_orjson_when_installed(self):
+        """Test orjson is preferred when importable"""
+        expected = "orjson" if json_backend.orjson is not None else "json"
+        assert json_backend.BACKEND == expected
+
+    def test_stdlib_fallback(self, stdlib_backend):
+        """Test JSON_BACKEND=stdlib forces the json module"""
+        assert stdlib_backend.BACKEND == "json"
+        assert stdlib_backend.loads(stdlib_backend.dumps({"a": 1})) == {"a": 1}
+
+    def test_backends_encode_datetimes_identically(self, stdlib_backend):
+        """Test both backends produce the same document"""
+        payload = {
+            "updated_at": datetime(2024, 1, 15, 10, 30, 0, 123456),
+            "social_links": {"twitter": "https://twitter.com/ñandú"}
+        }
+
+        slow = stdlib_backend.dumps(payload)
+        fast = importlib.reload(json_backend).dumps(payload)
+
+        assert json.loads(fast) == json.loads(slow)
+        assert json.loads(fast)["updated_at"] == "2024-01-15T10:30:00.123456"
+
+    def test_unserializable_object_raises_type_error(self, stdlib_backend):
+        """Test unknown types still fail like json.dumps"""
+        with pytest.raises(TypeError):
+            stdlib_backend.dumps({"obj": object()})
+        with pytest.raises(TypeError):
+            importlib.reload(json_backend).dumps({"obj": object()})
+
+    def test_backends_encode_profile_rows_like_the_model(self, stdlib_backend, sample_profile_data):
+        """Test a ProfileRow encodes to the ProfileResponse document on both backends"""
+        from models.profile import ProfileResponse, ProfileRow
+
+        row = ProfileRow.from_profile(sample_profile_data)
+        expected = ProfileResponse(**sample_profile_data).model_dump(mode="json")
+
+        assert json.loads(stdlib_backend.dumps(row)) == expected
+        assert json.loads(importlib.reload(json_backend).dumps(row)) == expected
+
+    def test_dumps_bytes(self):
+        """Test bytes output for response bodies"""
+        assert json.loads(json_backend.dumps_bytes({"a": [1, 2]})) == {"a": [1, 2]}
+
+
+@pytest.mark.unit
+class TestFastJSONResponse:
+    """Test FastJSONResponse"""
+
+    def test_renders_profile_dict(self, sample_profile_data):
+        """Test datetimes and nested dicts render without jsonable_encoder"""
+        response = FastJSONResponse(sample_profile_data)
+
+        body = json.loads(response.body)
+
+        assert response.media_type == "application/json"
+        assert body["social_links"] == sample_profile_data["social_links"]
+        assert body["created_at"] == sample_profile_data["created_at"].isoformat()
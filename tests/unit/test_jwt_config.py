@@ -0,0 +1,58 @@
+# tests/unit/test_jwt_config.py
+import pytest
+from unittest.mock import patch
+from jose import jwt
+from jose.backends.base import Key
+from config.jwt_config import JWTConfig
+
+
+@pytest.mark.unit
+class TestJWTConfig:
+    """Test JWTConfig"""
+
+    def test_verifier_is_prepared_once(self, rsa_keys, tmp_path):
+        """Test the public key is wrapped in a jose Key at load time"""
+        key_path = tmp_path / "public-key.pem"
+        key_path.write_text(rsa_keys['public_pem'])
+
+        with patch.dict('os.environ', {'PUBLIC_KEY_PATH': str(key_path)}):
+            config = JWTConfig()
+
+        verifier = config.get_verifier()
+        assert isinstance(verifier, Key)
+        assert config.get_verifier() is verifier
+
+    def test_verifier_decodes_token_without_serialization(self, rsa_keys, valid_token, tmp_path):
+        """Test the prepared verifier is accepted directly by jwt.decode"""
+        key_path = tmp_path / "public-key.pem"
+        key_path.write_text(rsa_keys['public_pem'])
+
+        with patch.dict('os.environ', {'PUBLIC_KEY_PATH': str(key_path)}):
+            config = JWTConfig()
+
+        with patch.object(type(rsa_keys['public_key']), 'public_bytes') as mock_public_bytes:
+            payload = jwt.decode(valid_token, config.get_verifier(), algorithms=["RS256"])
+            mock_public_bytes.assert_not_called()
+
+        assert payload["userId"] == 1
+
+    def test_missing_key_file_raises(self, tmp_path):
+        """Test loading a missing key fails loudly"""
+        with patch.dict('os.environ', {'PUBLIC_KEY_PATH': str(tmp_path / "missing.pem")}):
+            config = JWTConfig()
+
+        with pytest.raises(Exception, match="Error loading public key"):
+            config.load()
+        assert not config.is_loaded
+
+    def test_key_not_read_at_construction(self, rsa_keys, tmp_path):
+        """Test the PEM is read by load() or on first use, not at import time"""
+        key_path = tmp_path / "public-key.pem"
+        key_path.write_text(rsa_keys['public_pem'])
+
+        with patch.dict('os.environ', {'PUBLIC_KEY_PATH': str(key_path)}):
+            config = JWTConfig()
+
+        assert not config.is_loaded
+        config.get_verifier()
+        assert config.is_loaded
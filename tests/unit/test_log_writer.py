@@ -0,0 +1,92 @@
+# tests/unit/test_log_writer.py
+import pytest
+import json
+import threading
+import time
+from unittest.mock import patch
+from logger import logger as logger_module
+from logger.logger import format_record, info
+from logger.writer import AsyncLogWriter
+
+
+def _lines(captured):
+    return [json.loads(line) for line in captured.out.strip().splitlines()]
+
+
+@pytest.mark.unit
+class TestAsyncLogWriter:
+    """Test AsyncLogWriter"""
+
+    def test_writes_records_with_same_schema(self, capsys):
+        """Test queued records come out as the usual JSON lines, in order"""
+        writer = AsyncLogWriter(format_record)
+        for i in range(5):
+            writer.submit((time.time(), "info", "TestLogger", f"message {i}", {"n": i}))
+        writer.close()
+
+        lines = _lines(capsys.readouterr())
+
+        assert [line["n"] for line in lines] == [0, 1, 2, 3, 4]
+        assert set(lines[0]) == {"timestamp", "level", "logger", "message", "thread", "n"}
+        assert lines[0]["timestamp"].endswith("Z")
+
+    def test_drop_policy_counts_and_reports_dropped(self, capsys):
+        """Test a full queue drops records and reports it in the next batch"""
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_formatter(*record):
+            started.set()
+            release.wait(2)
+            return format_record(*record)
+
+        writer = AsyncLogWriter(slow_formatter, max_queue=2, policy="drop")
+        writer.submit((time.time(), "info", "T", "first", None))
+        started.wait(2)
+        for i in range(5):
+            writer.submit((time.time(), "info", "T", f"m{i}", None))
+        release.set()
+        writer.close()
+
+        lines = _lines(capsys.readouterr())
+
+        assert writer.dropped == 3
+        assert any(line.get("dropped") == 3 for line in lines)
+
+    def test_block_policy_delivers_everything(self, capsys):
+        """Test the block policy never loses records"""
+        writer = AsyncLogWriter(format_record, max_queue=2, batch_size=1, policy="block")
+        for i in range(50):
+            writer.submit((time.time(), "info", "T", "m", {"n": i}))
+        writer.close()
+
+        lines = _lines(capsys.readouterr())
+
+        assert len(lines) == 50
+        assert writer.dropped == 0
+
+    def test_flush_waits_for_pending_records(self, capsys):
+        """Test flush returns once everything queued is written"""
+        writer = AsyncLogWriter(format_record)
+        writer.submit((time.time(), "warn", "T", "pending", None))
+        writer.flush()
+
+        assert _lines(capsys.readouterr())[0]["message"] == "pending"
+        writer.close()
+
+    def test_invalid_policy_rejected(self):
+        """Test unknown queue policies fail fast"""
+        with pytest.raises(ValueError):
+            AsyncLogWriter(format_record, policy="spill")
+
+    def test_log_uses_writer_when_enabled(self, capsys):
+        """Test log() hands records to the background writer"""
+        writer = AsyncLogWriter(format_record)
+        with patch.object(logger_module, '_writer', writer):
+            info("TestLogger", "queued", {"key": "value"})
+            logger_module.flush()
+
+        writer.close()
+        log_data = _lines(capsys.readouterr())[0]
+        assert log_data["message"] == "queued"
+        assert log_data["key"] == "value"
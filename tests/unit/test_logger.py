@@ -101,4 +101,73 @@ class TestLogger:
         log_data = json.loads(captured.out.strip())
 
         assert isinstance(log_data["thread"], str)
-        assert len(log_data["thread"]) > 0
\ No newline at end of file
+        assert len(log_data["thread"]) > 0
+
+@pytest.mark.unit
+class TestLogLevel:
+    """Test level filtering and lazy metadata"""
+
+    @pytest.fixture(autouse=True)
+    def restore_level(self):
+        from logger import logger as logger_module
+        original = logger_module._min_level
+        yield
+        logger_module._min_level = original
+
+    def test_lines_below_min_level_are_dropped(self, capsys):
+        """Test debug and info are filtered at warn"""
+        from logger.logger import set_level
+        set_level("warn")
+
+        debug("TestLogger", "hidden")
+        info("TestLogger", "hidden")
+        warn("TestLogger", "shown")
+
+        lines = captured_lines(capsys)
+        assert [line["message"] for line in lines] == ["shown"]
+
+    def test_filtered_lines_skip_formatting(self):
+        """Test filtered lines never reach JSON encoding"""
+        from logger.logger import set_level
+        set_level("error")
+
+        with patch('logger.logger.format_record') as mock_format:
+            info("TestLogger", "hidden", {"key": "value"})
+            log("debug", "TestLogger", "hidden")
+
+        mock_format.assert_not_called()
+
+    def test_lazy_metadata_not_evaluated_when_filtered(self):
+        """Test callables passed as meta are only called for emitted lines"""
+        from logger.logger import set_level
+        set_level("info")
+        calls = []
+
+        debug("TestLogger", "hidden", lambda: calls.append(1) or {})
+
+        assert calls == []
+
+    def test_lazy_metadata_evaluated_when_emitted(self, capsys):
+        """Test callable metadata is merged into the line"""
+        info("TestLogger", "shown", lambda: {"userId": 7})
+
+        assert captured_lines(capsys)[0]["userId"] == 7
+
+    def test_is_enabled(self):
+        """Test is_enabled reflects the minimum level"""
+        from logger.logger import set_level, is_enabled
+        set_level("warn")
+
+        assert not is_enabled("info")
+        assert is_enabled("error")
+
+    def test_invalid_level_rejected(self):
+        """Test unknown levels fail fast"""
+        from logger.logger import set_level
+        with pytest.raises(ValueError):
+            set_level("verbose")
+
+
+def captured_lines(capsys):
+    out = capsys.readouterr().out.strip()
+    return [json.loads(line) for line in out.splitlines()] if out else []
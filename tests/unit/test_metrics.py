@@ -0,0 +1,149 @@
+# tests/unit/test_metrics.py
+import pytest
+import threading
+
+from metrics import Registry, observe_query
+from metrics.instruments import DB_QUERY_DURATION, DB_QUERY_ERRORS
+
+
+@pytest.mark.unit
+class TestRegistry:
+    """Test the metrics registry and text exposition"""
+
+    def test_counter_with_labels(self):
+        """Test labelled counters render one series per label set"""
+        registry = Registry()
+        counter = registry.counter("requests_total", "Requests", ("route",))
+        counter.labels("/a").inc()
+        counter.labels("/a").inc(2)
+        counter.labels("/b").inc()
+
+        text = registry.render()
+
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{route="/a"} 3.0' in text
+        assert 'requests_total{route="/b"} 1.0' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket counts, sum and count"""
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 2.0' in text
+        assert 'latency_seconds_bucket{le="1.0"} 3.0' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4.0' in text
+        assert "latency_seconds_sum 3.65" in text
+        assert "latency_seconds_count 4.0" in text
+
+    def test_gauge_inc_dec_and_function(self):
+        """Test gauges track deltas or read a callback at scrape time"""
+        registry = Registry()
+        in_flight = registry.gauge("in_flight", "In flight")
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+        pool = registry.gauge("pool", "Pool", ("state",))
+        pool.set_function(lambda: {("idle",): 3})
+
+        text = registry.render()
+
+        assert "in_flight 1.0" in text
+        assert 'pool{state="idle"} 3.0' in text
+
+    def test_label_values_escaped(self):
+        """Test quotes, backslashes and newlines in label values"""
+        registry = Registry()
+        registry.counter("c", "C", ("path",)).labels('a"b\\c\nd').inc()
+
+        assert 'c{path="a\\"b\\\\c\\nd"} 1.0' in registry.render()
+
+    def test_concurrent_increments_are_not_lost(self):
+        """Test per-thread shards add up under contention"""
+        registry = Registry()
+        counter = registry.counter("hits_total", "Hits")
+        histogram = registry.histogram("obs", "Obs")
+
+        def worker():
+            for _ in range(10000):
+                counter.inc()
+                histogram.observe(0.001)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        text = registry.render()
+        assert "hits_total 80000.0" in text
+        assert "obs_count 80000.0" in text
+
+    def test_finished_threads_do_not_leave_shards(self):
+        """Test shards of ended threads are folded into the total and dropped"""
+        registry = Registry()
+        counter = registry.counter("hits_total", "Hits")
+        histogram = registry.histogram("obs", "Obs")
+        counter.inc()
+
+        def worker():
+            counter.inc()
+            histogram.observe(0.001)
+
+        for _ in range(20):
+            threads = [threading.Thread(target=worker) for _ in range(100)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        shards = counter._default()._shards
+        assert len(shards._all) <= 1
+        assert shards.total() == [2001.0]
+        assert "obs_count 2000.0" in registry.render()
+
+    def test_duplicate_name_rejected(self):
+        """Test metric names are unique per registry"""
+        registry = Registry()
+        registry.counter("x", "X")
+        with pytest.raises(ValueError):
+            registry.gauge("x", "X")
+
+    def test_wrong_label_count_rejected(self):
+        """Test label arity is checked"""
+        counter = Registry().counter("x", "X", ("a", "b"))
+        with pytest.raises(ValueError):
+            counter.labels("only-one")
+
+
+@pytest.mark.unit
+class TestObserveQuery:
+    """Test observe_query"""
+
+    def test_sync_method_timed_and_errors_counted(self):
+        """Test sync repository methods record latency and failures"""
+        @observe_query("test_sync_method")
+        def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            failing()
+
+        assert DB_QUERY_ERRORS.labels("test_sync_method").value() == 1
+        assert DB_QUERY_DURATION.labels("test_sync_method").snapshot()[-1] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_method_stays_a_coroutine_function(self):
+        """Test wrapped async methods are still awaited by the dispatcher"""
+        import inspect
+
+        @observe_query("test_async_method")
+        async def lookup():
+            return 42
+
+        assert inspect.iscoroutinefunction(lookup)
+        assert await lookup() == 42
+        assert DB_QUERY_DURATION.labels("test_async_method").snapshot()[-1] == 1
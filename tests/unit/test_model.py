@@ -2,7 +2,7 @@
 import pytest
 from datetime import datetime
 from pydantic import ValidationError
-from models.profile import ProfileUpdate, ProfileResponse, ErrorResponse
+from models.profile import ProfileUpdate, ProfileResponse, ProfileRow, ErrorResponse
 
 
 @pytest.mark.unit
@@ -141,6 +141,35 @@ class TestProfileResponse:
         assert isinstance(response.updated_at, datetime)
 
 
+@pytest.mark.unit
+class TestProfileRow:
+    """Test the trusted ProfileRow"""
+
+    def test_from_profile_keeps_values(self, sample_profile_data):
+        """Test a repository dict maps onto attributes unchanged"""
+        row = ProfileRow.from_profile(sample_profile_data)
+
+        assert row.id == 1
+        assert row.nickname == "testuser"
+        assert row.social_links is sample_profile_data["social_links"]
+        assert row.updated_at == sample_profile_data["updated_at"]
+
+    def test_has_no_instance_dict(self, sample_profile_data):
+        """Test rows use __slots__"""
+        row = ProfileRow.from_profile(sample_profile_data)
+
+        assert not hasattr(row, "__dict__")
+
+    def test_fields_match_profile_response(self):
+        """Test both types describe the same response"""
+        assert list(ProfileRow.__dataclass_fields__) == list(ProfileResponse.model_fields)
+
+    def test_unknown_column_raises(self, sample_profile_data):
+        """Test rows reject keys outside the response"""
+        with pytest.raises(TypeError):
+            ProfileRow.from_profile({**sample_profile_data, "password": "x"})
+
+
 @pytest.mark.unit
 class TestErrorResponse:
     """Test ErrorResponse model"""
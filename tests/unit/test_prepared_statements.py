@@ -0,0 +1,192 @@
+# tests/unit/test_prepared_statements.py
+import pytest
+from unittest.mock import MagicMock, patch
+
+from config.prepared_statements import PreparedStatements
+from repositories import async_profile_repository
+from repositories.profile_repository import FIND_BY_USER_ID, ProfileRepository, update_statement
+
+
+def _db_error(pgcode, message):
+    error = Exception(message)
+    error.pgcode = pgcode
+    return error
+
+
+def _statements():
+    statements = PreparedStatements()
+    statements.register("find_one", "SELECT * FROM profiles WHERE user_id = %s AND country = %s")
+    return statements
+
+
+@pytest.mark.unit
+class TestPreparedStatements:
+    """Test PreparedStatements"""
+
+    def test_prepares_once_per_connection(self):
+        """Test PREPARE runs on first checkout only"""
+        statements = _statements()
+        conn = MagicMock()
+
+        statements.prepare(conn)
+        statements.prepare(conn)
+
+        cursor = conn.cursor.return_value
+        cursor.execute.assert_called_once_with(
+            "PREPARE find_one AS SELECT * FROM profiles WHERE user_id = $1 AND country = $2"
+        )
+        conn.commit.assert_called_once()
+        assert statements.prepare_count == 1
+
+    def test_execute_sql_after_prepare(self):
+        """Test prepared connections get EXECUTE, others the plain query"""
+        statements = _statements()
+        prepared, fresh = MagicMock(), MagicMock()
+        statements.prepare(prepared)
+
+        assert statements.sql(prepared, "find_one") == "EXECUTE find_one (%s, %s)"
+        assert statements.sql(fresh, "find_one").startswith("SELECT")
+
+    def test_statement_registered_later_is_prepared_on_next_checkout(self):
+        """Test connections opened before registration catch up"""
+        statements = _statements()
+        conn = MagicMock()
+        statements.prepare(conn)
+        statements.register("count_all", "SELECT count(*) FROM profiles")
+
+        statements.prepare(conn)
+
+        assert conn.cursor.return_value.execute.call_args.args[0] == "PREPARE count_all AS SELECT count(*) FROM profiles"
+        assert statements.sql(conn, "count_all") == "EXECUTE count_all"
+
+    def test_prepare_failure_disables_and_falls_back(self):
+        """Test a server that rejects PREPARE keeps working with plain queries"""
+        statements = _statements()
+        conn = MagicMock()
+        conn.cursor.return_value.execute.side_effect = _db_error("42P05", 'prepared statement "find_one" already exists')
+
+        statements.prepare(conn)
+
+        assert statements.enabled is False
+        conn.rollback.assert_called_once()
+        assert statements.sql(conn, "find_one").startswith("SELECT")
+
+    def test_transient_failure_skips_only_that_connection(self):
+        """Test an error unrelated to pooling leaves other connections prepared"""
+        statements = _statements()
+        statements.register("count_all", "SELECT count(*) FROM profiles")
+        broken, healthy = MagicMock(), MagicMock()
+        broken.cursor.return_value.execute.side_effect = [None, _db_error("57014", "canceling statement due to statement timeout")]
+
+        statements.prepare(broken)
+        statements.prepare(healthy)
+
+        assert statements.enabled is True
+        broken.rollback.assert_called_once()
+        assert statements.sql(broken, "find_one").startswith("EXECUTE")
+        assert statements.sql(broken, "count_all").startswith("SELECT")
+        assert statements.sql(healthy, "count_all") == "EXECUTE count_all"
+
+        broken.cursor.return_value.execute.side_effect = None
+        statements.prepare(broken)
+        assert broken.cursor.return_value.execute.call_args.args[0].startswith("PREPARE count_all")
+        assert statements.sql(broken, "count_all") == "EXECUTE count_all"
+
+    def test_disabled_never_prepares(self):
+        """Test DB_PREPARED_STATEMENTS=false"""
+        statements = PreparedStatements(enabled=False)
+        statements.register("find_one", "SELECT 1")
+        conn = MagicMock()
+
+        statements.prepare(conn)
+
+        conn.cursor.assert_not_called()
+
+
+@pytest.mark.unit
+class TestRepositoryStatements:
+    """Test repositories reuse compiled SQL"""
+
+    def test_find_by_user_id_executes_registered_statement(self):
+        """Test the lookup goes through the prepared statement registry"""
+        with patch('repositories.profile_repository.db_config') as mock_db_config:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_conn.cursor.return_value = mock_cursor
+            mock_cursor.fetchone.return_value = None
+            mock_db_config.get_connection.return_value = mock_conn
+            mock_db_config.statements.sql.return_value = f"EXECUTE {FIND_BY_USER_ID} (%s)"
+
+            ProfileRepository().find_by_user_id(7)
+
+            mock_db_config.statements.sql.assert_called_once_with(mock_conn, FIND_BY_USER_ID)
+            mock_cursor.execute.assert_called_once_with(f"EXECUTE {FIND_BY_USER_ID} (%s)", (7,))
+
+    def test_lost_statement_is_retried_as_plain_query(self):
+        """Test an EXECUTE landing on a backend without the statement turns preparing off and still answers"""
+        statements = PreparedStatements()
+        statements.register(FIND_BY_USER_ID, "SELECT * FROM profiles WHERE user_id = %s")
+        conn, cursor = MagicMock(), MagicMock()
+        conn.cursor.return_value = cursor
+        statements.prepare(conn)
+        cursor.execute.reset_mock()
+        cursor.execute.side_effect = [_db_error("26000", f'prepared statement "{FIND_BY_USER_ID}" does not exist'), None]
+        cursor.fetchone.return_value = None
+
+        with patch('repositories.profile_repository.db_config') as mock_db_config:
+            mock_db_config.statements = statements
+            mock_db_config.get_connection.return_value = conn
+            assert ProfileRepository().find_by_user_id(7) is None
+
+        assert statements.enabled is False
+        conn.rollback.assert_called_once()
+        assert [c.args for c in cursor.execute.call_args_list] == [
+            (f"EXECUTE {FIND_BY_USER_ID} (%s)", (7,)),
+            ("SELECT * FROM profiles WHERE user_id = %s", (7,)),
+        ]
+
+    def test_other_execute_errors_are_raised(self):
+        """Test only a lost statement is retried"""
+        statements = _statements()
+        conn = MagicMock()
+
+        assert statements.lost(conn, _db_error("57014", "canceling statement")) is False
+        assert statements.enabled is True
+        conn.rollback.assert_not_called()
+
+    def test_update_statement_is_memoized(self):
+        """Test the UPDATE text is built once per set of keys, in column order"""
+        query, fields = update_statement(("social_links", "nickname"))
+
+        assert update_statement(("social_links", "nickname"))[0] is query
+        assert fields == ("nickname", "social_links")
+        assert "nickname = %s, social_links = %s::jsonb" in query
+
+    def test_update_statement_rejects_unknown_keys_only(self):
+        """Test keys outside UPDATABLE_FIELDS never reach the SQL"""
+        with pytest.raises(ValueError):
+            update_statement(("id",))
+
+    def test_async_update_statement_numbers_placeholders(self):
+        """Test the asyncpg UPDATE text numbers the user_id after the fields"""
+        query, fields = async_profile_repository.update_statement(("country", "nickname"))
+
+        assert fields == ("nickname", "country")
+        assert "nickname = $1, country = $2" in query
+        assert "WHERE user_id = $3" in query
+
+    def test_merge_update_statement_merges_and_removes_links(self):
+        """Test merge mode updates social_links with || and - in the same UPDATE"""
+        query, fields = update_statement(("social_links", "nickname"), True, True)
+
+        assert fields == ("nickname", "social_links")
+        assert "(COALESCE(social_links, '{}'::jsonb) || %s::jsonb) - %s::text[]" in query
+        assert "WHERE user_id = %s AND (id, updated_at) IN (SELECT * FROM unnest(%s::int[], %s::timestamp[]))" in query
+
+    def test_async_merge_update_statement_numbers_placeholders(self):
+        """Test social_links takes two numbered parameters in merge mode"""
+        query, _ = async_profile_repository.update_statement(("social_links", "country"), True, True)
+
+        assert "country = $1" in query
+        assert "(COALESCE(social_links, '{}'::jsonb) || $2::jsonb) - $3::text[]" in query
+        assert "WHERE user_id = $4 AND (id, updated_at) IN (SELECT * FROM unnest($5::int[], $6::timestamp[]))" in query
@@ -0,0 +1,339 @@
+# tests/unit/test_profile_cache.py
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from cache import LRUCache, CacheBackend
+from config.replicas import start_request, end_request
+from repositories.cached_profile_repository import CachedProfileRepository
+
+
+class InMemorySharedBackend(CacheBackend):
+    """Local stand-in for a shared cache such as Redis"""
+
+    def __init__(self):
+        self.store = {}
+        self.fail = False
+
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError("shared cache down")
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl):
+        if self.fail:
+            raise ConnectionError("shared cache down")
+        self.store[key] = value
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+    async def size(self):
+        return len(self.store)
+
+
+@pytest.mark.unit
+class TestLRUCache:
+    """Test LRUCache"""
+
+    def test_set_and_get(self):
+        """Test stored values are returned and counted as hits"""
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats()["hitRatio"] == 0.5
+
+    def test_expired_entry_is_a_miss(self):
+        """Test TTL expiry"""
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1, ttl=-1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        """Test LRU eviction order"""
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.evictions == 1
+
+    def test_delete(self):
+        """Test single entry removal"""
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.delete("a")
+
+        assert cache.get("a") is None
+
+
+@pytest.mark.unit
+class TestCachedProfileRepository:
+    """Test CachedProfileRepository"""
+
+    @pytest.mark.asyncio
+    async def test_second_read_is_served_from_local_cache(self, sample_profile_data):
+        """Test read-through caching of find_by_user_id"""
+        inner = MagicMock()
+        inner.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+        repo = CachedProfileRepository(inner, LRUCache(10, 60))
+
+        assert await repo.find_by_user_id(1) == sample_profile_data
+        assert await repo.find_by_user_id(1) == sample_profile_data
+
+        inner.find_by_user_id.assert_awaited_once_with(1)
+        assert repo.stats()["local"]["hits"] == 1
+        assert repo.stats()["local"]["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_profile_is_not_cached(self):
+        """Test None results always go back to the repository"""
+        inner = MagicMock()
+        inner.find_by_user_id = AsyncMock(return_value=None)
+        repo = CachedProfileRepository(inner, LRUCache(10, 60))
+
+        assert await repo.find_by_user_id(1) is None
+        assert await repo.find_by_user_id(1) is None
+
+        assert inner.find_by_user_id.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sync_repository_runs_in_threadpool(self, sample_profile_data):
+        """Test wrapping the blocking psycopg2 repository"""
+        inner = MagicMock()
+        inner.find_by_user_id.return_value = sample_profile_data
+        repo = CachedProfileRepository(inner, LRUCache(10, 60))
+
+        assert await repo.find_by_user_id(1) == sample_profile_data
+        inner.find_by_user_id.assert_called_once_with(1)
+
+    @pytest.mark.asyncio
+    async def test_update_writes_through(self, sample_profile_data):
+        """Test update replaces the cached entry with the returned row"""
+        updated = {**sample_profile_data, "nickname": "newname"}
+        inner = MagicMock()
+        inner.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+        inner.update = AsyncMock(return_value=updated)
+        shared = InMemorySharedBackend()
+        repo = CachedProfileRepository(inner, LRUCache(10, 60), shared)
+
+        await repo.find_by_user_id(1)
+        await repo.update(1, {"nickname": "newname"})
+
+        assert (await repo.find_by_user_id(1))["nickname"] == "newname"
+        assert shared.store["profile:v1:1"]["nickname"] == "newname"
+        inner.find_by_user_id.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_update_invalidates(self, sample_profile_data):
+        """Test entries are dropped when the write fails"""
+        inner = MagicMock()
+        inner.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+        inner.update = AsyncMock(side_effect=ValueError("Profile not found"))
+        shared = InMemorySharedBackend()
+        repo = CachedProfileRepository(inner, LRUCache(10, 60), shared)
+
+        await repo.find_by_user_id(1)
+        with pytest.raises(ValueError):
+            await repo.update(1, {"nickname": "x"})
+
+        assert len(repo.local) == 0
+        assert shared.store == {}
+
+    @pytest.mark.asyncio
+    async def test_shared_backend_fills_local_tier(self, sample_profile_data):
+        """Test a shared hit avoids the database and warms the local LRU"""
+        inner = MagicMock()
+        inner.find_by_user_id = AsyncMock()
+        shared = InMemorySharedBackend()
+        shared.store["profile:v1:1"] = sample_profile_data
+        repo = CachedProfileRepository(inner, LRUCache(10, 60), shared)
+
+        assert await repo.find_by_user_id(1) == sample_profile_data
+        assert await repo.find_by_user_id(1) == sample_profile_data
+
+        inner.find_by_user_id.assert_not_awaited()
+        assert repo.stats()["shared"]["hits"] == 1
+        assert repo.stats()["local"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_backend_failure_falls_back_to_repository(self, sample_profile_data):
+        """Test an unavailable shared cache never fails the read"""
+        inner = MagicMock()
+        inner.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+        shared = InMemorySharedBackend()
+        shared.fail = True
+        repo = CachedProfileRepository(inner, LRUCache(10, 60), shared)
+
+        assert await repo.find_by_user_id(1) == sample_profile_data
+        assert repo.stats()["shared"]["errors"] == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_lookup_queries_only_misses(self, sample_profile_data):
+        """Test find_by_user_ids serves cached ids and fetches the rest in one call"""
+        cached = {**sample_profile_data, "user_id": 1}
+        fetched = {**sample_profile_data, "id": 2, "user_id": 2}
+        inner = MagicMock()
+        inner.find_by_user_ids = AsyncMock(return_value={2: fetched})
+        repo = CachedProfileRepository(inner, LRUCache(10, 60))
+        repo.local.set("profile:v1:1", cached)
+
+        profiles = await repo.find_by_user_ids([1, 2, 3])
+
+        assert profiles == {1: cached, 2: fetched}
+        inner.find_by_user_ids.assert_awaited_once_with([2, 3])
+        assert repo.local.get("profile:v1:2") == fetched
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_invalidates_touched_profiles(self, sample_profile_data):
+        """Test every profile in a bulk update is dropped from both tiers"""
+        inner = MagicMock()
+        inner.bulk_update = AsyncMock(return_value={1})
+        shared = InMemorySharedBackend()
+        repo = CachedProfileRepository(inner, LRUCache(10, 60), shared)
+        repo.local.set("profile:v1:1", sample_profile_data)
+        repo.local.set("profile:v1:5", sample_profile_data)
+        shared.store["profile:v1:1"] = sample_profile_data
+
+        assert await repo.bulk_update({1: {"nickname": "x"}}, 100) == {1}
+
+        inner.bulk_update.assert_awaited_once_with({1: {"nickname": "x"}}, 100)
+        assert repo.local.get("profile:v1:1") is None
+        assert repo.local.get("profile:v1:5") == sample_profile_data
+        assert shared.store == {}
+
+    @pytest.mark.asyncio
+    async def test_projection_served_from_cached_full_row(self, sample_profile_data):
+        """Test a cached full row answers any field list without a query"""
+        inner = MagicMock()
+        inner.find_by_user_id = AsyncMock(return_value=sample_profile_data)
+        repo = CachedProfileRepository(inner, LRUCache(10, 60))
+
+        await repo.find_by_user_id(1)
+        profile = await repo.find_by_user_id(1, ("nickname",))
+
+        assert profile["nickname"] == "testuser"
+        inner.find_by_user_id.assert_awaited_once_with(1)
+
+    @pytest.mark.asyncio
+    async def test_projection_is_cached_apart_from_full_rows(self, sample_profile_data):
+        """Test partial rows stay local, under their own key, and never answer full reads"""
+        partial = {"id": 1, "user_id": 1, "nickname": "testuser", "updated_at": sample_profile_data["updated_at"]}
+        inner = MagicMock()
+        inner.find_by_user_id = AsyncMock(side_effect=[partial, sample_profile_data])
+        shared = InMemorySharedBackend()
+        repo = CachedProfileRepository(inner, LRUCache(10, 60), shared)
+
+        assert await repo.find_by_user_id(1, ("nickname",)) == partial
+        assert await repo.find_by_user_id(1, ("nickname",)) == partial
+        assert repo.local.get("profile:v1:1") is None
+        assert shared.store == {}
+
+        assert await repo.find_by_user_id(1) == sample_profile_data
+        assert inner.find_by_user_id.await_args_list[0].args == (1, ("nickname",))
+        assert inner.find_by_user_id.await_args_list[1].args == (1,)
+
+    @pytest.mark.asyncio
+    async def test_update_drops_cached_projections(self, sample_profile_data):
+        """Test a write never leaves a stale partial row behind"""
+        partial = {"id": 1, "user_id": 1, "nickname": "testuser", "updated_at": sample_profile_data["updated_at"]}
+        inner = MagicMock()
+        inner.find_by_user_id = AsyncMock(return_value=partial)
+        inner.update = AsyncMock(return_value={**sample_profile_data, "nickname": "newname"})
+        repo = CachedProfileRepository(inner, LRUCache(10, 60))
+
+        await repo.find_by_user_id(1, ("nickname",))
+        await repo.update(1, {"nickname": "newname"})
+
+        assert repo.local.get("profile:v1:fields:1") is None
+        assert (await repo.find_by_user_id(1, ("nickname",)))["nickname"] == "newname"
+
+    @pytest.mark.asyncio
+    async def test_patch_writes_through(self, sample_profile_data):
+        """Test the merged row returned by patch replaces the cached entry"""
+        merged = {**sample_profile_data, "social_links": {"github": "https://github.com/test"}}
+        inner = MagicMock()
+        inner.patch = AsyncMock(return_value=merged)
+        repo = CachedProfileRepository(inner, LRUCache(10, 60))
+
+        await repo.patch(1, {"social_links": {"github": "https://github.com/test", "twitter": None}})
+
+        inner.patch.assert_awaited_once_with(1, {"social_links": {"github": "https://github.com/test", "twitter": None}}, None)
+        assert repo.local.get("profile:v1:1") == merged
+
+    @pytest.mark.asyncio
+    async def test_read_overlapping_a_write_does_not_store_stale_row(self, sample_profile_data):
+        """Test a read that started before a write cannot overwrite the written row"""
+        v1 = sample_profile_data
+        v2 = {**sample_profile_data, "nickname": "v2"}
+        release = asyncio.Event()
+
+        async def slow_find(user_id, fields=None):
+            await release.wait()
+            return v1
+
+        inner = MagicMock()
+        inner.find_by_user_id = slow_find
+        inner.update = AsyncMock(return_value=v2)
+        shared = InMemorySharedBackend()
+        repo = CachedProfileRepository(inner, LRUCache(10, 60), shared)
+
+        read = asyncio.ensure_future(repo.find_by_user_id(1))
+        await asyncio.sleep(0)
+        await repo.update(1, {"nickname": "v2"})
+        release.set()
+
+        assert await read == v1
+        assert repo.local.get("profile:v1:1") == v2
+        assert shared.store["profile:v1:1"] == v2
+        assert repo._readers == {} and repo._generations == {}
+
+    @pytest.mark.asyncio
+    async def test_read_overlapping_an_invalidation_is_not_stored(self, sample_profile_data):
+        """Test rows read before a bulk update are not cached after it"""
+        release = asyncio.Event()
+
+        async def slow_find(user_id, fields=None):
+            await release.wait()
+            return sample_profile_data
+
+        inner = MagicMock()
+        inner.find_by_user_id = slow_find
+        inner.bulk_update = AsyncMock(return_value={1})
+        repo = CachedProfileRepository(inner, LRUCache(10, 60))
+
+        full = asyncio.ensure_future(repo.find_by_user_id(1))
+        partial = asyncio.ensure_future(repo.find_by_user_id(1, ("nickname",)))
+        await asyncio.sleep(0)
+        await repo.bulk_update({1: {"nickname": "x"}})
+        release.set()
+        await asyncio.gather(full, partial)
+
+        assert repo.local.get("profile:v1:1") is None
+        assert repo.local.get("profile:v1:fields:1") is None
+
+    @pytest.mark.asyncio
+    async def test_client_that_wrote_elsewhere_skips_local_copy(self, sample_profile_data):
+        """Test a read-your-writes request reads the database and refreshes this worker's copy"""
+        updated = {**sample_profile_data, "nickname": "renamed"}
+        inner = MagicMock()
+        inner.find_by_user_id = AsyncMock(side_effect=[sample_profile_data, updated])
+        inner.find_version = AsyncMock(return_value=(1, updated["updated_at"]))
+        repo = CachedProfileRepository(inner, LRUCache(10, 60))
+        await repo.find_by_user_id(1)
+
+        _, token = start_request(primary=True)
+        try:
+            assert await repo.find_by_user_id(1) == updated
+            assert await repo.find_version(1) == (1, updated["updated_at"])
+        finally:
+            end_request(token)
+
+        assert await repo.find_by_user_id(1) == updated
+        assert inner.find_by_user_id.await_count == 2
@@ -0,0 +1,308 @@
+# tests/unit/test_profile_controller.py
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from datetime import datetime
+from fastapi import HTTPException
+
+from config.cache_config import CacheConfig
+from controllers.profile_controller import ProfileController
+from repositories.cached_profile_repository import CachedProfileRepository
+from models.profile import ProfileUpdate, ProfileBulkUpdateItem
+from repositories.profile_repository import ProfileRepository, ProfileVersionMismatchError
+from middleware.etag import profile_etag
+
+
+def _controller_with_db(mock_db_config, row):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_db_config.get_connection.return_value = mock_conn
+    mock_cursor.fetchone.return_value = row
+
+    controller = ProfileController()
+    controller.repository = ProfileRepository()
+    return controller, mock_conn, mock_cursor
+
+
+@pytest.mark.unit
+class TestUpdateProfile:
+    """Test ProfileController.update_profile"""
+
+    @pytest.mark.asyncio
+    async def test_update_runs_single_statement(self):
+        """Test a successful update costs one query and one pool checkout"""
+        with patch('repositories.profile_repository.db_config') as mock_db_config:
+            now = datetime.utcnow()
+            controller, mock_conn, mock_cursor = _controller_with_db(mock_db_config, (
+                1, 1, None, "newname", True, None, None, None, None, {}, now, now
+            ))
+
+            response = await controller.update_profile(1, ProfileUpdate(nickname="newname"), {"user_id": 1})
+
+            assert response.nickname == "newname"
+            assert mock_cursor.execute.call_count == 1
+            assert "UPDATE profiles" in mock_cursor.execute.call_args.args[0]
+            assert mock_db_config.get_connection.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_update_missing_profile_returns_404(self):
+        """Test an UPDATE that returns no row maps to 404"""
+        with patch('repositories.profile_repository.db_config') as mock_db_config:
+            controller, mock_conn, mock_cursor = _controller_with_db(mock_db_config, None)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.update_profile(999, ProfileUpdate(nickname="x"), {"user_id": 999})
+
+            assert exc_info.value.status_code == 404
+            assert mock_cursor.execute.call_count == 1
+            mock_conn.rollback.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_empty_update_runs_no_query(self):
+        """Test an empty payload is rejected before touching the database"""
+        with patch('repositories.profile_repository.db_config') as mock_db_config:
+            controller, mock_conn, mock_cursor = _controller_with_db(mock_db_config, None)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.update_profile(1, ProfileUpdate(), {"user_id": 1})
+
+            assert exc_info.value.status_code == 400
+            mock_db_config.get_connection.assert_not_called()
+
+
+@pytest.mark.unit
+class TestGetProfile:
+    """Test ProfileController.get_profile"""
+
+    @pytest.mark.asyncio
+    async def test_coalesce_timeout_returns_503(self):
+        """Test a shared lookup that outlives the timeout is reported as overload, not a 500"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.find_by_user_id = AsyncMock(side_effect=asyncio.TimeoutError())
+
+        with pytest.raises(HTTPException) as exc_info:
+            await controller.get_profile(1, {"user_id": 1})
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers == {"Retry-After": "1"}
+
+
+@pytest.mark.unit
+class TestGetProfiles:
+    """Test ProfileController.get_profiles"""
+
+    @pytest.mark.asyncio
+    async def test_results_follow_request_order_with_markers(self, sample_profile_data):
+        """Test per-item ok / forbidden markers in request order"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.find_by_user_ids = AsyncMock(return_value={1: sample_profile_data})
+
+        response = await controller.get_profiles([2, 1, 3], {"user_id": 1})
+
+        assert [(item.user_id, item.status) for item in response.results] == [
+            (2, "forbidden"), (1, "ok"), (3, "forbidden")
+        ]
+        assert response.results[1].profile.nickname == "testuser"
+        controller.repository.find_by_user_ids.assert_awaited_once_with([1])
+
+    @pytest.mark.asyncio
+    async def test_missing_profile_marked_not_found(self):
+        """Test allowed ids without a row are marked not_found"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.find_by_user_ids = AsyncMock(return_value={})
+
+        response = await controller.get_profiles([1], {"user_id": 1})
+
+        assert response.results[0].status == "not_found"
+        assert response.results[0].profile is None
+
+    @pytest.mark.asyncio
+    async def test_all_forbidden_skips_database(self):
+        """Test no query runs when nothing is authorized"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.find_by_user_ids = AsyncMock()
+
+        response = await controller.get_profiles([5, 6], {"user_id": 1})
+
+        assert {item.status for item in response.results} == {"forbidden"}
+        controller.repository.find_by_user_ids.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_too_many_ids_rejected(self):
+        """Test the configurable batch limit"""
+        controller = ProfileController()
+
+        with patch('controllers.profile_controller.api_config') as mock_api_config:
+            mock_api_config.batch_max_ids = 2
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.get_profiles([1, 2, 3], {"user_id": 1})
+
+        assert exc_info.value.status_code == 400
+
+
+@pytest.mark.unit
+class TestBulkUpdateProfiles:
+    """Test ProfileController.bulk_update_profiles"""
+
+    @staticmethod
+    def _items(*pairs):
+        return [ProfileBulkUpdateItem(user_id=uid, profile=profile) for uid, profile in pairs]
+
+    @pytest.mark.asyncio
+    async def test_requires_bulk_scope(self):
+        """Test ordinary user tokens cannot use the bulk endpoint"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.bulk_update = AsyncMock()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await controller.bulk_update_profiles(
+                self._items((1, ProfileUpdate(nickname="x"))), {"user_id": 1, "claims": {}}
+            )
+
+        assert exc_info.value.status_code == 403
+        controller.repository.bulk_update.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_per_item_results_and_counts(self):
+        """Test updated / not_found / invalid markers in request order"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.bulk_update = AsyncMock(return_value={1})
+        token_data = {"user_id": 0, "claims": {"scope": "profiles:bulk_write"}}
+
+        response = await controller.bulk_update_profiles(self._items(
+            (1, ProfileUpdate(nickname="first")),
+            (2, ProfileUpdate(country="Peru")),
+            (3, ProfileUpdate()),
+            (1, ProfileUpdate(country="Chile")),
+        ), token_data)
+
+        assert [(r.user_id, r.status) for r in response.results] == [
+            (1, "updated"), (2, "not_found"), (3, "invalid"), (1, "updated")
+        ]
+        assert (response.updated, response.not_found, response.invalid) == (2, 1, 1)
+        updates, batch_size = controller.repository.bulk_update.await_args.args
+        assert updates == {1: {"nickname": "first", "country": "Chile"}, 2: {"country": "Peru"}}
+
+    @pytest.mark.asyncio
+    async def test_too_many_items_rejected(self):
+        """Test the configurable bulk size limit"""
+        controller = ProfileController()
+        token_data = {"user_id": 0, "claims": {"scopes": ["profiles:bulk_write"]}}
+
+        with patch('controllers.profile_controller.api_config') as mock_api_config:
+            mock_api_config.bulk_scope = "profiles:bulk_write"
+            mock_api_config.bulk_max_items = 1
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.bulk_update_profiles(self._items(
+                    (1, ProfileUpdate(nickname="a")), (2, ProfileUpdate(nickname="b"))
+                ), token_data)
+
+        assert exc_info.value.status_code == 400
+
+
+@pytest.mark.unit
+class TestConditionalRequests:
+    """Test ETag support in ProfileController"""
+
+    @pytest.mark.asyncio
+    async def test_get_profile_etag_uses_version_lookup(self, sample_profile_data):
+        """Test the ETag comes from find_version, not the full row"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.find_version = AsyncMock(return_value=(1, sample_profile_data["updated_at"]))
+        controller.repository.find_by_user_id = AsyncMock()
+
+        etag = await controller.get_profile_etag(1, {"user_id": 1})
+
+        assert etag == profile_etag(1, sample_profile_data["updated_at"])
+        controller.repository.find_by_user_id.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_update_with_if_match_passes_versions(self, sample_profile_data):
+        """Test If-Match becomes an expected updated_at for the UPDATE"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.update = AsyncMock(return_value=sample_profile_data)
+        etag = profile_etag(1, datetime(2024, 1, 15, 11, 0))
+
+        await controller.update_profile(1, ProfileUpdate(nickname="x"), {"user_id": 1}, etag)
+
+        controller.repository.update.assert_awaited_once_with(1, {"nickname": "x"}, [(1, datetime(2024, 1, 15, 11, 0))])
+
+    @pytest.mark.asyncio
+    async def test_update_version_mismatch_returns_412(self):
+        """Test a stale If-Match fails with 412"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.update = AsyncMock(side_effect=ProfileVersionMismatchError("Profile was modified"))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await controller.update_profile(
+                1, ProfileUpdate(nickname="x"), {"user_id": 1}, profile_etag(1, datetime(2024, 1, 1))
+            )
+
+        assert exc_info.value.status_code == 412
+
+    @pytest.mark.asyncio
+    async def test_unparseable_if_match_returns_412_without_query(self):
+        """Test weak or foreign tags can never match a write"""
+        controller = ProfileController()
+        controller.repository = MagicMock()
+        controller.repository.update = AsyncMock()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await controller.update_profile(1, ProfileUpdate(nickname="x"), {"user_id": 1}, 'W/"1-x"')
+
+        assert exc_info.value.status_code == 412
+        controller.repository.update.assert_not_awaited()
+
+
+class SharedProfileTable:
+    """One database seen by every worker"""
+
+    def __init__(self, row):
+        self.row = row
+
+    async def find_by_user_id(self, user_id, fields=None):
+        return self.row
+
+    async def update(self, user_id, update_data, expected_versions=None):
+        self.row = {**self.row, **update_data}
+        return self.row
+
+
+@pytest.mark.unit
+class TestProfileCacheWorkers:
+    """Test the in-process profile cache is only used with a single worker"""
+
+    def _workers(self, count, table):
+        with patch.dict('os.environ', {"WEB_CONCURRENCY": str(count), "PROFILE_CACHE_SIZE": "100"}):
+            config = CacheConfig()
+        with patch('controllers.profile_controller.cache_config', config), \
+                patch('controllers.profile_controller.ProfileRepository', return_value=table):
+            return ProfileController(), ProfileController()
+
+    @pytest.mark.asyncio
+    async def test_write_on_one_worker_is_read_by_another(self, sample_profile_data):
+        """Test a worker never serves a row another worker has since updated"""
+        table = SharedProfileTable(sample_profile_data)
+        worker_a, worker_b = self._workers(2, table)
+
+        assert (await worker_b.repository.find_by_user_id(1))["nickname"] == sample_profile_data["nickname"]
+        await worker_a.repository.update(1, {"nickname": "renamed"})
+
+        assert (await worker_b.repository.find_by_user_id(1))["nickname"] == "renamed"
+        assert not isinstance(worker_b.repository, CachedProfileRepository)
+
+    def test_single_worker_keeps_the_local_tier(self, sample_profile_data):
+        """Test one worker still caches in process"""
+        worker, _ = self._workers(1, SharedProfileTable(sample_profile_data))
+
+        assert isinstance(worker.repository, CachedProfileRepository)
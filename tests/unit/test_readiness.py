@@ -0,0 +1,76 @@
+# tests/unit/test_readiness.py
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from health import ReadinessMonitor
+
+
+def _db(ready=True, in_use=1, max_size=4, ping_error=None):
+    return SimpleNamespace(
+        is_ready=ready,
+        pool_stats=lambda: {"inUse": in_use, "maxSize": max_size} if ready else {},
+        ping=AsyncMock(side_effect=ping_error)
+    )
+
+
+def _monitor(db, key_loaded=True, saturation_checks=2):
+    return ReadinessMonitor(db, SimpleNamespace(is_loaded=key_loaded), timeout=1.0,
+                            saturation_checks=saturation_checks)
+
+
+@pytest.mark.unit
+class TestReadinessMonitor:
+    """Test the background readiness checks"""
+
+    def test_not_ready_before_first_check(self):
+        """Test the monitor starts not ready"""
+        assert _monitor(_db()).ready is False
+
+    @pytest.mark.asyncio
+    async def test_ready_when_all_checks_pass(self):
+        """Test key loaded, pool open and SELECT 1 answered make the pod ready"""
+        db = _db()
+        monitor = _monitor(db)
+
+        assert await monitor.check() is True
+        assert monitor.checks["database"]["status"] == "UP"
+        db.ping.assert_awaited_once_with(1.0)
+
+    @pytest.mark.asyncio
+    async def test_pool_not_initialized(self):
+        """Test no ping is attempted before the pool is open"""
+        db = _db(ready=False)
+        monitor = _monitor(db)
+
+        assert await monitor.check() is False
+        assert monitor.checks["pool"]["status"] == "DOWN"
+        db.ping.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_database_down(self):
+        """Test a failing SELECT 1 marks the pod not ready"""
+        monitor = _monitor(_db(ping_error=ConnectionError("refused")))
+
+        assert await monitor.check() is False
+        assert monitor.checks["database"] == {"status": "DOWN", "error": "refused"}
+
+    @pytest.mark.asyncio
+    async def test_key_not_loaded(self):
+        """Test a missing public key marks the pod not ready"""
+        monitor = _monitor(_db(), key_loaded=False)
+
+        assert await monitor.check() is False
+        assert monitor.checks["publicKey"]["status"] == "DOWN"
+
+    @pytest.mark.asyncio
+    async def test_saturated_pool_after_consecutive_checks(self):
+        """Test a full pool only fails readiness when it stays full"""
+        db = _db(in_use=4, max_size=4)
+        monitor = _monitor(db, saturation_checks=2)
+
+        assert await monitor.check() is True
+        assert await monitor.check() is False
+
+        db.pool_stats = lambda: {"inUse": 1, "maxSize": 4}
+        assert await monitor.check() is True
@@ -0,0 +1,231 @@
+# tests/unit/test_replicas.py
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config.replicas import LAG_QUERY, ReplicaSet, parse_hosts, start_request, end_request
+from config.database import DatabaseConfig
+from middleware.read_your_writes import ReadYourWritesMiddleware
+
+
+def _replica(host, lag=0.0, ready=True):
+    replica = SimpleNamespace(host=host, port="5432", is_ready=ready)
+    replica.fetch_value = AsyncMock(side_effect=lag if isinstance(lag, Exception) else None, return_value=lag)
+    replica.connect = AsyncMock()
+    return replica
+
+
+@pytest.mark.unit
+class TestReplicaSet:
+    """Test lag-aware replica routing"""
+
+    def test_parse_hosts(self):
+        """Test host[:port] lists with the primary's port as default"""
+        assert parse_hosts("r1, r2:6432,", "5432") == [("r1", "5432"), ("r2", "6432")]
+
+    def test_primary_until_a_replica_is_checked(self):
+        """Test reads go to the primary while no replica is known healthy"""
+        primary = object()
+        replicas = ReplicaSet([_replica("r1")])
+
+        assert replicas.pick(primary, (1,)) is primary
+
+    @pytest.mark.asyncio
+    async def test_round_robin_over_healthy_replicas(self):
+        """Test reads alternate between replicas within the lag limit"""
+        r1, r2, lagging = _replica("r1"), _replica("r2"), _replica("r3", lag=30.0)
+        replicas = ReplicaSet([r1, r2, lagging], max_lag=1.0)
+        await replicas.check()
+
+        picks = [replicas.pick(object(), (1,)) for _ in range(4)]
+
+        assert picks == [r1, r2, r1, r2]
+        assert replicas.lags["r3:5432"] == 30.0
+
+    @pytest.mark.asyncio
+    async def test_unreachable_replica_is_excluded(self):
+        """Test a replica failing the lag query receives no reads"""
+        primary = object()
+        replicas = ReplicaSet([_replica("r1", lag=ConnectionError("down"))])
+        await replicas.check()
+
+        assert replicas.pick(primary, (1,)) is primary
+        assert replicas.stats() == [{"replica": "r1:5432", "lag": None, "healthy": False}]
+
+    @pytest.mark.asyncio
+    async def test_replica_not_streaming_is_excluded(self):
+        """Test a replica whose WAL receiver is disconnected (NULL lag) receives no reads"""
+        primary = object()
+        replicas = ReplicaSet([_replica("r1", lag=None)])
+        await replicas.check()
+
+        assert replicas.pick(primary, (1,)) is primary
+        assert replicas.stats() == [{"replica": "r1:5432", "lag": None, "healthy": False}]
+
+    def test_lag_query_requires_a_streaming_wal_receiver(self):
+        """Test the lag query does not report 0 for a replica that stopped receiving WAL"""
+        assert "pg_stat_wal_receiver" in LAG_QUERY
+        assert "status = 'streaming'" in LAG_QUERY
+
+    @pytest.mark.asyncio
+    async def test_unresponsive_replica_times_out_without_stalling_others(self):
+        """Test a replica whose connect or lag query hangs is dropped within the timeout"""
+        async def hang(*args, **kwargs):
+            await asyncio.sleep(3600)
+
+        primary, healthy = object(), _replica("r1")
+        stuck_query, stuck_connect = _replica("r2"), _replica("r3", ready=False)
+        stuck_query.fetch_value = AsyncMock(side_effect=hang)
+        stuck_connect.connect = AsyncMock(side_effect=hang)
+        replicas = ReplicaSet([stuck_query, stuck_connect, healthy], timeout=0.05)
+        replicas._healthy = [stuck_query]
+
+        await asyncio.wait_for(replicas.check(), 1)
+
+        assert [r["healthy"] for r in replicas.stats()] == [False, False, True]
+        assert replicas.pick(primary, (1,)) is healthy
+
+    @pytest.mark.asyncio
+    async def test_replica_pool_opened_by_check(self):
+        """Test a replica that is not connected yet gets one connection attempt per check"""
+        replica = _replica("r1", ready=False)
+        await ReplicaSet([replica]).check()
+
+        replica.connect.assert_awaited_once_with(retry=False)
+
+    @pytest.mark.asyncio
+    async def test_read_your_writes(self):
+        """Test users that just wrote read from the primary"""
+        primary, replica = object(), _replica("r1")
+        replicas = ReplicaSet([replica], sticky_seconds=60)
+        await replicas.check()
+
+        replicas.wrote([7])
+
+        assert replicas.pick(primary, (7,)) is primary
+        assert replicas.pick(primary, (8,)) is replica
+        assert replicas.pick(primary, (8, 7)) is primary
+
+    @pytest.mark.asyncio
+    async def test_client_that_wrote_elsewhere_reads_from_primary(self):
+        """Test a request flagged by the cookie reads every user from the primary"""
+        primary, replica = object(), _replica("r1")
+        replicas = ReplicaSet([replica])
+        await replicas.check()
+
+        state, token = start_request(primary=True)
+        try:
+            assert replicas.pick(primary, (8,)) is primary
+            replicas.wrote([8])
+            assert state["wrote"] is True
+        finally:
+            end_request(token)
+
+        assert replicas.pick(primary, (9,)) is replica
+
+
+@pytest.mark.unit
+class TestDatabaseConfigReadRouting:
+    """Test DatabaseConfig routes reads to replica pools"""
+
+    @pytest.mark.asyncio
+    async def test_reads_use_replica_pool_and_return_there(self):
+        """Test get_connection(read_for=...) borrows from a healthy replica's pool"""
+        primary_pool, replica_pool = MagicMock(name="primary"), MagicMock(name="replica")
+        pools = iter([primary_pool, replica_pool])
+
+        with patch.dict('os.environ', {"DB_REPLICA_HOSTS": "replica1:5433"}), \
+                patch('config.database.ConnectionPool', side_effect=lambda *a, **k: next(pools)):
+            config = DatabaseConfig()
+            await config.connect()
+            replica = config.replicas.replicas[0]
+            with patch.object(replica, 'fetch_value', AsyncMock(return_value=0.0)):
+                await config.replicas.check()
+
+        conn = config.get_connection(read_for=(1,))
+        assert conn is replica_pool.getconn.return_value
+        config.return_connection(conn)
+        replica_pool.putconn.assert_called_once_with(conn)
+
+        assert config.get_connection() is primary_pool.getconn.return_value
+
+        config.wrote(1)
+        assert config.get_connection(read_for=(1,)) is primary_pool.getconn.return_value
+
+    def test_no_replicas_configured(self):
+        """Test every read stays on the primary without DB_REPLICA_HOSTS"""
+        with patch.dict('os.environ', {"DB_REPLICA_HOSTS": ""}):
+            config = DatabaseConfig()
+
+        assert config.replicas.replicas == []
+
+    def test_replicas_share_the_primary_statement_registry(self):
+        """Test replicas reuse the primary's prepared statements even while none are registered"""
+        with patch.dict('os.environ', {"DB_REPLICA_HOSTS": "r1:5433,r2"}):
+            config = DatabaseConfig()
+
+        assert len(config.statements) == 0
+        assert [replica.statements for replica in config.replicas.replicas] == [config.statements] * 2
+        assert all(replica.statements is config.statements for replica in config.replicas.replicas)
+
+
+def _cookie_client(replicas, primary):
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=5)
+
+    @app.put("/write")
+    def write():
+        replicas.wrote([1])
+        return {"ok": True}
+
+    @app.get("/read/{user_id}")
+    def read(user_id: int):
+        return {"primary": replicas.pick(primary, (user_id,)) is primary}
+
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestReadYourWritesMiddleware:
+    """Test read-your-writes across workers through the last_write cookie"""
+
+    @pytest.mark.asyncio
+    async def test_write_sets_cookie_and_later_reads_use_primary(self):
+        """Test a write response sets the cookie and a worker that never saw the write honours it"""
+        primary, writer, reader = object(), ReplicaSet([_replica("r1")]), ReplicaSet([_replica("r2")])
+        await writer.check()
+        await reader.check()
+
+        response = _cookie_client(writer, primary).put("/write")
+        cookie = response.headers["set-cookie"]
+        assert cookie.startswith("last_write=")
+        assert "Max-Age=5" in cookie
+        until = float(cookie.split(";")[0].split("=")[1])
+        assert time.time() < until <= time.time() + 5
+
+        other_worker = _cookie_client(reader, primary)
+        assert other_worker.get("/read/2", headers={"Cookie": f"last_write={until}"}).json() == {"primary": True}
+        assert other_worker.get("/read/2").json() == {"primary": False}
+
+    @pytest.mark.asyncio
+    async def test_reads_do_not_set_cookie(self):
+        """Test responses without a write leave the client's cookie alone"""
+        replicas = ReplicaSet([_replica("r1")])
+        await replicas.check()
+
+        response = _cookie_client(replicas, object()).get("/read/1")
+        assert "set-cookie" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_expired_or_invalid_cookie_is_ignored(self):
+        """Test a cookie past its time or not a number routes to the replica"""
+        replicas = ReplicaSet([_replica("r1")])
+        await replicas.check()
+        client = _cookie_client(replicas, object())
+
+        for value in (str(time.time() - 1), "garbage"):
+            assert client.get("/read/1", headers={"Cookie": f"last_write={value}"}).json() == {"primary": False}
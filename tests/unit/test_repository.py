@@ -5,6 +5,7 @@ from datetime import datetime
 
 # Import will work because psycopg2 is mocked in conftest.py
 from repositories.profile_repository import ProfileRepository
+from serialization.json_backend import dumps
 
 
 @pytest.mark.unit
@@ -189,4 +190,200 @@ class TestProfileRepository:
             with pytest.raises(Exception, match="Database error"):
                 repo.update(1, {"nickname": "test"})
 
-            mock_conn.rollback.assert_called_once()
\ No newline at end of file
+            mock_conn.rollback.assert_called_once()
+    def test_find_by_user_ids_single_query(self):
+        """Test batch lookup runs one ANY(%s) query and keys rows by user_id"""
+        with patch('repositories.profile_repository.db_config') as mock_db_config:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_conn.cursor.return_value = mock_cursor
+            mock_db_config.get_connection.return_value = mock_conn
+
+            now = datetime.utcnow()
+            mock_cursor.fetchall.return_value = [
+                (10, 3, None, "three", False, None, None, None, None, None, now, now),
+                (11, 1, None, "one", True, None, None, None, None, {}, now, now),
+            ]
+
+            # Execute
+            repo = ProfileRepository()
+            profiles = repo.find_by_user_ids([1, 2, 3])
+
+            # Assert
+            assert set(profiles) == {1, 3}
+            assert profiles[3]["nickname"] == "three"
+            assert profiles[3]["social_links"] == {}
+
+            mock_cursor.execute.assert_called_once()
+            query, params = mock_cursor.execute.call_args.args
+            assert "user_id = ANY(%s)" in query
+            assert params == ([1, 2, 3],)
+            mock_db_config.return_connection.assert_called_once_with(mock_conn)
+
+    def test_bulk_update_groups_by_fields_in_one_transaction(self):
+        """Test bulk updates share statements per field set and commit once"""
+        with patch('repositories.profile_repository.db_config') as mock_db_config, \
+                patch('repositories.profile_repository.extras') as mock_extras:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_conn.cursor.return_value = mock_cursor
+            mock_db_config.get_connection.return_value = mock_conn
+            mock_extras.execute_values.side_effect = [[(1,), (3,)], [(2,)]]
+
+            # Execute
+            repo = ProfileRepository()
+            updated = repo.bulk_update({
+                1: {"nickname": "one"},
+                2: {"social_links": {"github": "https://github.com/two"}},
+                3: {"nickname": "three"},
+                4: {"nickname": "four"},
+            }, batch_size=100)
+
+            # Assert
+            assert updated == {1, 2, 3}
+            assert mock_extras.execute_values.call_count == 2
+
+            first, second = mock_extras.execute_values.call_args_list
+            assert "FROM (VALUES %s) AS v(user_id, nickname)" in first.args[1]
+            assert first.args[2] == [(1, "one"), (3, "three"), (4, "four")]
+            assert first.kwargs["page_size"] == 100
+            assert second.kwargs["template"] == "(%s::int, %s::jsonb)"
+            assert second.args[2] == [(2, dumps({"github": "https://github.com/two"}))]
+
+            mock_conn.commit.assert_called_once()
+            mock_db_config.return_connection.assert_called_once_with(mock_conn)
+
+    def test_bulk_update_rolls_back_everything_on_error(self):
+        """Test a failing batch leaves no partial writes"""
+        with patch('repositories.profile_repository.db_config') as mock_db_config, \
+                patch('repositories.profile_repository.extras') as mock_extras:
+            mock_conn = MagicMock()
+            mock_conn.cursor.return_value = MagicMock()
+            mock_db_config.get_connection.return_value = mock_conn
+            mock_extras.execute_values.side_effect = [[(1,)], Exception("deadlock detected")]
+
+            # Execute
+            repo = ProfileRepository()
+            with pytest.raises(Exception):
+                repo.bulk_update({1: {"nickname": "one"}, 2: {"country": "Peru"}})
+
+            # Assert
+            mock_conn.commit.assert_not_called()
+            mock_conn.rollback.assert_called_once()
+
+    def test_conditional_update_adds_version_check(self):
+        """Test If-Match versions are checked by the UPDATE itself"""
+        with patch('repositories.profile_repository.db_config') as mock_db_config:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_conn.cursor.return_value = mock_cursor
+            mock_db_config.get_connection.return_value = mock_conn
+
+            now = datetime.utcnow()
+            mock_cursor.fetchone.return_value = (1, 1, None, "new", True, None, None, None, None, {}, now, now)
+
+            # Execute
+            repo = ProfileRepository()
+            repo.update(1, {"nickname": "new"}, [(1, now), (2, now)])
+
+            # Assert
+            query, params = mock_cursor.execute.call_args.args
+            assert "WHERE user_id = %s AND (id, updated_at) IN (SELECT * FROM unnest(%s::int[], %s::timestamp[]))" in query
+            assert params == ["new", 1, [1, 2], [now, now]]
+            mock_conn.commit.assert_called_once()
+
+    def test_conditional_update_version_mismatch(self):
+        """Test an existing profile at another version raises ProfileVersionMismatchError"""
+        from repositories.profile_repository import ProfileVersionMismatchError
+
+        with patch('repositories.profile_repository.db_config') as mock_db_config:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_conn.cursor.return_value = mock_cursor
+            mock_db_config.get_connection.return_value = mock_conn
+            mock_cursor.fetchone.side_effect = [None, (1, datetime.utcnow())]
+
+            # Execute
+            repo = ProfileRepository()
+            with pytest.raises(ProfileVersionMismatchError):
+                repo.update(1, {"nickname": "new"}, [(1, datetime(2020, 1, 1))])
+
+            # Assert
+            mock_conn.rollback.assert_called_once()
+
+    def test_find_by_user_id_with_fields_selects_projection(self):
+        """Test a field list narrows the SELECT to those columns plus id, user_id and updated_at"""
+        with patch('repositories.profile_repository.db_config') as mock_db_config:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_conn.cursor.return_value = mock_cursor
+            mock_db_config.get_connection.return_value = mock_conn
+            mock_db_config.statements.__contains__.return_value = False
+            mock_db_config.statements.__len__.return_value = 0
+
+            now = datetime.utcnow()
+            mock_cursor.fetchone.return_value = (1, 1, "testuser", "Colombia", now)
+
+            # Execute
+            repo = ProfileRepository()
+            profile = repo.find_by_user_id(1, ("nickname", "country"))
+
+            # Assert
+            assert profile == {"id": 1, "user_id": 1, "nickname": "testuser", "country": "Colombia", "updated_at": now}
+            name, sql = mock_db_config.statements.register.call_args.args
+            assert sql == "SELECT id, user_id, nickname, country, updated_at FROM profiles WHERE user_id = %s"
+            mock_db_config.statements.sql.assert_called_once_with(mock_conn, name)
+
+    def test_projection_runs_plain_query_when_registry_is_full(self):
+        """Test projections past MAX_PREPARED_STATEMENTS are not prepared"""
+        from repositories.profile_repository import MAX_PREPARED_STATEMENTS
+
+        with patch('repositories.profile_repository.db_config') as mock_db_config:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_conn.cursor.return_value = mock_cursor
+            mock_db_config.get_connection.return_value = mock_conn
+            mock_db_config.statements.__contains__.return_value = False
+            mock_db_config.statements.__len__.return_value = MAX_PREPARED_STATEMENTS
+            mock_cursor.fetchone.return_value = (1, 1, None, datetime.utcnow())
+
+            # Execute
+            repo = ProfileRepository()
+            profile = repo.find_by_user_id(1, ("social_links",))
+
+            # Assert
+            assert profile["social_links"] == {}
+            mock_db_config.statements.register.assert_not_called()
+            query, params = mock_cursor.execute.call_args.args
+            assert query == "SELECT id, user_id, social_links, updated_at FROM profiles WHERE user_id = %s"
+            assert params == (1,)
+
+    def test_patch_merges_social_links_in_one_update(self):
+        """Test PATCH sends the links to set and the keys to remove to a single UPDATE ... RETURNING"""
+        with patch('repositories.profile_repository.db_config') as mock_db_config:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_conn.cursor.return_value = mock_cursor
+            mock_db_config.get_connection.return_value = mock_conn
+
+            now = datetime.utcnow()
+            mock_cursor.fetchone.return_value = (
+                1, 1, None, "nick", True, None, None, None, None,
+                {"github": "https://github.com/test", "twitter": "https://twitter.com/new"}, now, now
+            )
+
+            # Execute
+            repo = ProfileRepository()
+            profile = repo.patch(1, {
+                "social_links": {"twitter": "https://twitter.com/new", "facebook": None}
+            })
+
+            # Assert
+            query, params = mock_cursor.execute.call_args.args
+            assert "|| %s::jsonb) - %s::text[]" in query
+            assert "RETURNING" in query
+            assert params == [dumps({"twitter": "https://twitter.com/new"}), ["facebook"], 1]
+            assert profile["social_links"]["github"] == "https://github.com/test"
+            mock_cursor.execute.assert_called_once()
+            mock_conn.commit.assert_called_once()
+            mock_db_config.wrote.assert_called_once_with(1)
@@ -0,0 +1,69 @@
+# tests/unit/test_server_config.py
+import pytest
+from unittest.mock import patch
+
+from config.server_config import ServerConfig
+from config.database import DatabaseConfig, split_connections
+
+
+@pytest.mark.unit
+class TestServerConfig:
+    """Test the production launcher settings"""
+
+    def test_workers_default_to_available_cpus(self):
+        """Test one worker per CPU when WEB_CONCURRENCY is unset"""
+        with patch.dict('os.environ', {}, clear=True), \
+                patch('config.server_config.available_cpus', return_value=6):
+            config = ServerConfig()
+
+        assert config.workers == 6
+
+    def test_uvicorn_options_from_env(self):
+        """Test SERVER_* variables reach uvicorn"""
+        env = {
+            "WEB_CONCURRENCY": "3",
+            "SERVER_LOOP": "asyncio",
+            "SERVER_HTTP": "h11",
+            "SERVER_BACKLOG": "4096",
+            "SERVER_KEEP_ALIVE": "15",
+            "SERVER_LIMIT_CONCURRENCY": "500"
+        }
+        with patch.dict('os.environ', env):
+            options = ServerConfig().uvicorn_options()
+
+        assert options["workers"] == 3
+        assert options["loop"] == "asyncio"
+        assert options["http"] == "h11"
+        assert options["backlog"] == 4096
+        assert options["timeout_keep_alive"] == 15
+        assert options["limit_concurrency"] == 500
+        assert options["limit_max_requests"] is None
+
+    def test_auto_prefers_fast_implementations(self):
+        """Test auto selects uvloop and httptools when installed"""
+        with patch.dict('os.environ', {"SERVER_LOOP": "auto", "SERVER_HTTP": "auto"}), \
+                patch('config.server_config._installed', return_value=True):
+            config = ServerConfig()
+
+        assert (config.loop, config.http) == ("uvloop", "httptools")
+
+
+@pytest.mark.unit
+class TestPerWorkerPoolSizing:
+    """Test the connection budget is divided across workers"""
+
+    def test_split_connections(self):
+        """Test the per-worker share never exceeds the pool cap or drops below 1"""
+        assert split_connections(20, 20, 4) == 5
+        assert split_connections(10, 100, 4) == 10
+        assert split_connections(20, 3, 8) == 1
+
+    def test_database_config_uses_worker_share(self):
+        """Test each worker's pool is sized from DB_MAX_CONNECTIONS_TOTAL"""
+        env = {"WEB_CONCURRENCY": "4", "DB_MAX_CONNECTIONS_TOTAL": "40", "DB_POOL_MAX_SIZE": "20",
+               "DB_POOL_MIN_SIZE": "15"}
+        with patch.dict('os.environ', env):
+            config = DatabaseConfig()
+
+        assert config.max_connections == 10
+        assert config.min_connections == 10
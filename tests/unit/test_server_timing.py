@@ -0,0 +1,98 @@
+# tests/unit/test_server_timing.py
+import time
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics.timing import start_request, end_request, record, phase, server_timing_header
+from middleware.server_timing import ServerTimingMiddleware
+
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+
+    @app.get("/async")
+    async def async_endpoint():
+        record("db", 0.002)
+        with phase("serialize"):
+            return {"ok": True}
+
+    @app.get("/sync")
+    def sync_endpoint():
+        # Runs in the threadpool: the copied context still points at the request's phases
+        record("db_wait", 0.001)
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def _parse(header):
+    phases = {}
+    for part in header.split(","):
+        name, _, dur = part.strip().partition(";dur=")
+        phases[name] = float(dur)
+    return phases
+
+
+@pytest.mark.unit
+class TestRequestTiming:
+    """Test per-request phase recording"""
+
+    def test_record_outside_request_is_noop(self):
+        """Test recording without an active request does nothing"""
+        record("db", 1.0)
+        with phase("serialize"):
+            pass
+
+    def test_record_accumulates(self):
+        """Test repeated phases add up"""
+        phases = {}
+        token = start_request(phases)
+        try:
+            record("db", 0.001)
+            record("db", 0.002)
+            with phase("serialize"):
+                time.sleep(0.001)
+        finally:
+            end_request(token)
+
+        assert phases["db"] == pytest.approx(0.003)
+        assert phases["serialize"] > 0
+
+    def test_header_in_milliseconds(self):
+        """Test Server-Timing value formatting"""
+        assert server_timing_header({"auth": 0.0015, "total": 0.01}) == "auth;dur=1.500, total;dur=10.000"
+
+
+@pytest.mark.unit
+class TestServerTimingMiddleware:
+    """Test the Server-Timing middleware"""
+
+    def test_async_endpoint_phases(self):
+        """Test phases recorded in the endpoint reach the header"""
+        response = _client().get("/async")
+
+        phases = _parse(response.headers["server-timing"])
+        assert phases["db"] == pytest.approx(2.0)
+        assert "serialize" in phases
+        assert phases["total"] >= 0
+
+    def test_threadpool_phases(self):
+        """Test phases recorded from sync code in the threadpool are kept"""
+        response = _client().get("/sync")
+
+        assert _parse(response.headers["server-timing"])["db_wait"] == pytest.approx(1.0)
+
+    def test_access_log_line(self):
+        """Test one access log line with the phases per request"""
+        with patch("middleware.server_timing.info") as mock_info:
+            _client().get("/async")
+
+        logger, message, meta = mock_info.call_args[0]
+        line = meta()
+        assert logger == "[HTTP]"
+        assert line["status"] == 200
+        assert line["route"] == "/async"
+        assert line["timingMs"]["db"] == pytest.approx(2.0)
@@ -0,0 +1,263 @@
+# tests/unit/test_single_flight.py
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from cache import SingleFlight
+from config.replicas import start_request, end_request
+from repositories.coalescing_profile_repository import CoalescingProfileRepository
+
+
+class SlowRepository:
+    """Repository whose lookups block until released"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def find_by_user_id(self, user_id, fields=None):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def _started():
+    """Let the tasks run up to their first suspension point"""
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    """Test SingleFlight"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Test callers arriving while a call runs get its result"""
+        flight = SingleFlight(timeout=1)
+        release = asyncio.Event()
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "value"
+
+        tasks = [asyncio.ensure_future(flight.do("k", fn)) for _ in range(5)]
+        await _started()
+        release.set()
+
+        assert await asyncio.gather(*tasks) == ["value"] * 5
+        assert calls == 1
+        assert flight.stats() == {"inFlight": 0, "calls": 1, "coalesced": 4, "timeouts": 0}
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_caller(self):
+        """Test a failing call raises in the first caller and in every joiner"""
+        flight = SingleFlight(timeout=1)
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            raise ValueError("db down")
+
+        tasks = [asyncio.ensure_future(flight.do("k", fn)) for _ in range(3)]
+        await _started()
+        release.set()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert "k" not in flight
+
+    @pytest.mark.asyncio
+    async def test_joiner_times_out(self):
+        """Test joiners stop waiting after the timeout while the call goes on"""
+        flight = SingleFlight(timeout=0.05)
+        release = asyncio.Event()
+        done = []
+
+        async def fn():
+            await release.wait()
+            done.append("value")
+            return "value"
+
+        first = asyncio.ensure_future(flight.do("k", fn))
+        await _started()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do("k", fn)
+        assert flight.coalesced == 1
+
+        release.set()
+        with pytest.raises(asyncio.TimeoutError):
+            await first
+        await asyncio.sleep(0)
+        assert done == ["value"]
+        assert flight.timeouts == 2
+
+    @pytest.mark.asyncio
+    async def test_first_caller_times_out(self):
+        """Test the caller that started the call is bound by the timeout too"""
+        flight = SingleFlight(timeout=0.01)
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "value"
+
+        first = asyncio.ensure_future(flight.do("k", fn))
+        await _started()
+        second = asyncio.ensure_future(flight.do("k", fn))
+
+        with pytest.raises(asyncio.TimeoutError):
+            await first
+        assert "k" in flight
+
+        release.set()
+        with pytest.raises(asyncio.TimeoutError):
+            await second
+        assert flight.timeouts == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_call(self):
+        """Test the first caller going away leaves the shared call running"""
+        flight = SingleFlight(timeout=1)
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "value"
+
+        first = asyncio.ensure_future(flight.do("k", fn))
+        second = asyncio.ensure_future(flight.do("k", fn))
+        await _started()
+        first.cancel()
+        release.set()
+
+        assert await second == "value"
+
+    @pytest.mark.asyncio
+    async def test_new_call_after_completion(self):
+        """Test results are not cached once the call finishes"""
+        flight = SingleFlight(timeout=1)
+        fn = AsyncMock(side_effect=["a", "b"])
+
+        assert await flight.do("k", fn) == "a"
+        assert await flight.do("k", fn) == "b"
+        assert flight.coalesced == 0
+
+
+@pytest.mark.unit
+class TestCoalescingProfileRepository:
+    """Test CoalescingProfileRepository"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_query(self, sample_profile_data):
+        """Test N concurrent reads of one profile run a single query"""
+        inner = SlowRepository(result=sample_profile_data)
+        repo = CoalescingProfileRepository(inner, SingleFlight(timeout=1))
+        before = repo._coalesced.value()
+
+        tasks = [asyncio.ensure_future(repo.find_by_user_id(1)) for _ in range(10)]
+        await _started()
+        inner.release.set()
+
+        assert await asyncio.gather(*tasks) == [sample_profile_data] * 10
+        assert inner.calls == 1
+        assert repo._coalesced.value() - before == 9
+
+    @pytest.mark.asyncio
+    async def test_different_keys_are_not_coalesced(self, sample_profile_data):
+        """Test other users and other field lists run their own query"""
+        inner = SlowRepository(result=sample_profile_data)
+        repo = CoalescingProfileRepository(inner, SingleFlight(timeout=1))
+
+        tasks = [
+            asyncio.ensure_future(repo.find_by_user_id(1)),
+            asyncio.ensure_future(repo.find_by_user_id(2)),
+            asyncio.ensure_future(repo.find_by_user_id(1, ("nickname",))),
+        ]
+        await _started()
+        inner.release.set()
+        await asyncio.gather(*tasks)
+
+        assert inner.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_error_propagates_to_all_waiters(self):
+        """Test every coalesced reader sees the query's error"""
+        inner = SlowRepository(error=RuntimeError("connection lost"))
+        repo = CoalescingProfileRepository(inner, SingleFlight(timeout=1))
+
+        tasks = [asyncio.ensure_future(repo.find_by_user_id(1)) for _ in range(3)]
+        await _started()
+        inner.release.set()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert [type(result) for result in results] == [RuntimeError] * 3
+        assert inner.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_write_detaches_in_flight_reads(self, sample_profile_data):
+        """Test reads after a write do not join a lookup that started before it"""
+        inner = SlowRepository(result=sample_profile_data)
+        inner.update = AsyncMock(return_value=sample_profile_data)
+        repo = CoalescingProfileRepository(inner, SingleFlight(timeout=1))
+
+        stale = asyncio.ensure_future(repo.find_by_user_id(1))
+        await _started()
+        await repo.update(1, {"nickname": "new"})
+        fresh = asyncio.ensure_future(repo.find_by_user_id(1))
+        await _started()
+        inner.release.set()
+        await asyncio.gather(stale, fresh)
+
+        assert inner.calls == 2
+        inner.update.assert_awaited_once_with(1, {"nickname": "new"}, None)
+
+    @pytest.mark.asyncio
+    async def test_slow_query_times_out_for_the_first_reader(self):
+        """Test a lone reader stops waiting after the timeout and is counted"""
+        inner = SlowRepository()
+        repo = CoalescingProfileRepository(inner, SingleFlight(timeout=0.01))
+        before = repo._timeouts.value()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await repo.find_by_user_id(1)
+
+        assert repo._timeouts.value() - before == 1
+        inner.release.set()
+
+    @pytest.mark.asyncio
+    async def test_client_that_wrote_recently_does_not_join(self, sample_profile_data):
+        """Test a read-your-writes request runs its own query instead of joining one in flight"""
+        inner = SlowRepository(result=sample_profile_data)
+        repo = CoalescingProfileRepository(inner, SingleFlight(timeout=1))
+
+        earlier = asyncio.ensure_future(repo.find_by_user_id(1))
+        await _started()
+        _, token = start_request(primary=True)
+        try:
+            own = asyncio.ensure_future(repo.find_by_user_id(1))
+        finally:
+            end_request(token)
+        await _started()
+        inner.release.set()
+        await asyncio.gather(earlier, own)
+
+        assert inner.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_sync_repository_runs_in_threadpool(self, sample_profile_data):
+        """Test wrapping the blocking psycopg2 repository"""
+        inner = MagicMock()
+        inner.find_by_user_id.return_value = sample_profile_data
+        repo = CoalescingProfileRepository(inner, SingleFlight(timeout=1))
+
+        assert await repo.find_by_user_id(1) == sample_profile_data
+        inner.find_by_user_id.assert_called_once_with(1)
@@ -0,0 +1,85 @@
+# tests/unit/test_startup.py
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+from config.database import DatabaseConfig
+
+
+@pytest.mark.unit
+class TestLazyDatabaseStartup:
+    """Test the pool is opened from the lifespan with async retries"""
+
+    def test_construction_does_not_connect(self):
+        """Test creating the config opens no connection"""
+        with patch('config.database.ConnectionPool') as mock_pool:
+            config = DatabaseConfig()
+
+        mock_pool.assert_not_called()
+        assert not config.is_ready
+
+    @pytest.mark.asyncio
+    async def test_connect_retries_with_backoff(self):
+        """Test failed attempts are retried with doubling, capped delays"""
+        env = {"DB_CONNECT_RETRY_DELAY": "1", "DB_CONNECT_MAX_DELAY": "3"}
+        with patch.dict('os.environ', env):
+            config = DatabaseConfig()
+
+        attempts = [Exception("down")] * 3
+
+        async def open_pool():
+            if attempts:
+                raise attempts.pop()
+            config.connection_pool = object()
+
+        with patch.object(config, '_open_pool', side_effect=open_pool), \
+                patch('config.database.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            await config.connect()
+
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 2, 3]
+        assert config.is_ready
+
+    @pytest.mark.asyncio
+    async def test_ping_reuses_dedicated_connection(self):
+        """Test readiness pings open their own connection once, outside the pool"""
+        config = DatabaseConfig()
+        conn = MagicMock(closed=False)
+
+        with patch.object(config, '_connect', return_value=conn) as mock_connect:
+            await config.ping(1.0)
+            await config.ping(1.0)
+
+        mock_connect.assert_called_once()
+        assert conn.cursor.return_value.__enter__.return_value.execute.call_count == 2
+
+
+@pytest.mark.unit
+class TestReadinessEndpoint:
+    """Test /health/ready serves the last background check"""
+
+    def test_not_ready_while_pool_is_down(self):
+        """Test 503 with the failing checks while not ready, liveness still 200"""
+        from main import app, readiness
+        client = TestClient(app)
+
+        checks = {"database": {"status": "DOWN", "reason": "pool not initialized"}}
+        with patch.object(readiness, 'ready', False), patch.object(readiness, 'checks', checks):
+            ready = client.get("/health/ready")
+        live = client.get("/health/live")
+
+        assert ready.status_code == 503
+        assert ready.json()["status"] == "NOT_READY"
+        assert ready.json()["checks"] == checks
+        assert live.status_code == 200
+
+    def test_ready_once_checked(self):
+        """Test 200 once a background check passed"""
+        from main import app, readiness
+        client = TestClient(app)
+
+        with patch.object(readiness, 'ready', True), patch.object(readiness, 'checked_at', 1700000000.0):
+            response = client.get("/health/ready")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "READY"
+        assert response.json()["checkedAt"].startswith("2023-11-14T")
@@ -0,0 +1,110 @@
+# tests/unit/test_token_cache.py
+import pytest
+import time
+from unittest.mock import patch
+from fastapi.security import HTTPAuthorizationCredentials
+from middleware.token_cache import TokenCache
+from middleware import jwt_middleware
+
+
+@pytest.mark.unit
+class TestTokenCache:
+    """Test TokenCache"""
+
+    def test_get_missing_counts_miss(self):
+        """Test lookup of unknown digest"""
+        cache = TokenCache(max_size=2)
+
+        assert cache.get(TokenCache.digest("token")) is None
+        assert cache.misses == 1
+        assert cache.hits == 0
+
+    def test_put_and_get_counts_hit(self):
+        """Test cached claims are returned"""
+        cache = TokenCache(max_size=2)
+        key = TokenCache.digest("token")
+        cache.put(key, {"user_id": 1}, time.time() + 60)
+
+        assert cache.get(key) == {"user_id": 1}
+        assert cache.hits == 1
+
+    def test_entry_expires_at_token_exp(self):
+        """Test entries are dropped once the token expires"""
+        cache = TokenCache(max_size=2)
+        key = TokenCache.digest("token")
+        cache.put(key, {"user_id": 1}, time.time() - 1)
+
+        assert cache.get(key) is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Test least recently used entry is evicted first"""
+        cache = TokenCache(max_size=2)
+        a, b, c = (TokenCache.digest(t) for t in ("a", "b", "c"))
+        cache.put(a, {"user_id": 1}, time.time() + 60)
+        cache.put(b, {"user_id": 2}, time.time() + 60)
+        cache.get(a)
+        cache.put(c, {"user_id": 3}, time.time() + 60)
+
+        assert cache.get(b) is None
+        assert cache.get(a) == {"user_id": 1}
+        assert cache.evictions == 1
+
+    def test_disabled_cache_stores_nothing(self):
+        """Test max_size=0 disables caching"""
+        cache = TokenCache(max_size=0)
+        cache.put(TokenCache.digest("a"), {"user_id": 1}, time.time() + 60)
+
+        assert not cache.enabled
+        assert len(cache) == 0
+
+    def test_stats(self):
+        """Test stats snapshot"""
+        cache = TokenCache(max_size=2)
+        key = TokenCache.digest("token")
+        cache.put(key, {"user_id": 1}, time.time() + 60)
+        cache.get(key)
+        cache.get(TokenCache.digest("other"))
+
+        stats = cache.stats()
+
+        assert stats["size"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hitRatio"] == 0.5
+
+
+@pytest.mark.unit
+class TestVerifyTokenCache:
+    """Test verify_token uses the verified-token cache"""
+
+    def test_repeated_token_skips_signature_check(self, rsa_keys, valid_token):
+        """Test second verification is served from the cache"""
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=valid_token)
+
+        with patch('middleware.jwt_middleware.jwt_config') as mock_jwt_config, \
+                patch('middleware.jwt_middleware.token_cache', TokenCache(max_size=8)) as cache:
+            mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+
+            first = jwt_middleware.verify_token(credentials)
+            with patch('middleware.jwt_middleware.jwt.decode') as mock_decode:
+                second = jwt_middleware.verify_token(credentials)
+                mock_decode.assert_not_called()
+
+        assert first == second
+        assert first["user_id"] == 1
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_invalid_token_is_not_cached(self, rsa_keys, invalid_issuer_token):
+        """Test rejected tokens never enter the cache"""
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=invalid_issuer_token)
+
+        with patch('middleware.jwt_middleware.jwt_config') as mock_jwt_config, \
+                patch('middleware.jwt_middleware.token_cache', TokenCache(max_size=8)) as cache:
+            mock_jwt_config.get_verifier.return_value = rsa_keys['verifier']
+
+            with pytest.raises(Exception):
+                jwt_middleware.verify_token(credentials)
+
+        assert len(cache) == 0